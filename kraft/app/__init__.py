@@ -34,3 +34,6 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 from .app import Application
+from .lock import Lockfile
+from .lock import save_workdir_lockfile
+from .lock import workdir_lockfile
@@ -43,6 +43,7 @@ import click
 import requests
 import six
 
+from .lock import config_lockfile
 import kraft.util as util
 from kraft.arch import Architecture
 from kraft.component import Component
@@ -154,19 +155,42 @@ class Application(Component):
     @classmethod  # noqa: C901
     @click.pass_context
     def from_workdir(ctx, cls, workdir=None, force_init=False, use_versions=[]):
+        """
+        Load the application in a working directory, pinning its components
+        to the versions in its lockfile if it is up-to-date.
+
+        Args:
+            workdir (str):  The working directory of the application.
+            force_init (bool):  Whether to ignore the versions of components.
+            use_versions (list):  Versions of components to use instead.
+        """
         if workdir is None:
             workdir = ctx.obj.workdir
 
-        config = load_config(
-            find_config(workdir, None, ctx.obj.env),
-            use_versions=use_versions
-        )
+        details = find_config(workdir, None, ctx.obj.env)
 
-        return cls(
-            config=config,
-            localdir=workdir,
-            ignore_version=force_init,
-        )
+        # Pin the components to the lockfile next to the Kraftfile, unless it
+        # is out-of-date or other versions were explicitly requested
+        lockfile = None
+        if len(use_versions) == 0:
+            lockfile = config_lockfile(details.config_files)
+
+        previous = ctx.obj.lockfile
+        ctx.obj.lockfile = lockfile
+
+        try:
+            config = load_config(details, use_versions=use_versions)
+
+            app = cls(
+                config=config,
+                localdir=workdir,
+                ignore_version=force_init,
+            )
+
+        finally:
+            ctx.obj.lockfile = previous
+
+        return app
 
     @property
     def components(self):
@@ -0,0 +1,394 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import hashlib
+import os
+
+import click
+import yaml
+from git import GitCommandError
+from git import InvalidGitRepositoryError
+from git import NoSuchPathError
+from git import Repo as GitRepo
+
+from kraft.cache import remote_cache
+from kraft.config import find_config
+from kraft.const import GIT_SHA_PATTERN
+from kraft.const import KRAFT_LOCKFILE
+from kraft.error import KraftFileNotFound
+from kraft.logger import logger
+from kraft.manifest import ManifestItem
+from kraft.manifest import ManifestItemDistribution
+from kraft.manifest import ManifestItemVersion
+from kraft.types import ComponentType
+from kraft.util import atomic_write
+
+LOCKFILE_VERSION = 1
+
+
+def kraftfile_digest(filenames=None):
+    """
+    Digest the contents of the Kraftfile(s) of an application, such that a
+    lockfile can be recognised as out-of-date once they are edited.
+
+    Args:
+        filenames (list):  The paths to the Kraftfile(s).
+
+    Returns:
+        str: The SHA256 hex digest of the files in the given order.
+    """
+    digest = hashlib.sha256()
+
+    for filename in filenames or list():
+        with open(filename, "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+def pinned_sha(git=None, ref=None, localdir=None):
+    """
+    Resolve the git SHA of a version, which for tags is only their name, to
+    the commit it currently points to, peeling annotated tags.
+
+    Args:
+        git (str):  The remote of the component.
+        ref (str):  The SHA or tag of the version.
+        localdir (str):  Where the component was downloaded to, whose tags
+            are consulted before those of the remote.
+
+    Returns:
+        str: The SHA of the commit or None if it could not be resolved.
+    """
+    if ref is None or GIT_SHA_PATTERN.match(ref) is not None:
+        return ref
+
+    tag = "refs/tags/%s" % ref
+
+    if localdir is not None:
+        try:
+            return GitRepo(localdir).git.rev_parse(
+                "--verify", "--quiet", "%s^{commit}" % tag
+            )
+        except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError):
+            pass
+
+    if git is None:
+        return None
+
+    try:
+        refs = remote_cache().ls_remote(git)
+    except GitCommandError as e:
+        logger.debug("Could not list the refs of %s: %s" % (git, e))
+        return None
+
+    shas = dict()
+    for line in refs.splitlines():
+        sha, _, name = line.partition("\t")
+        shas[name] = sha
+
+    return shas.get(tag + "^{}", shas.get(tag, None))
+
+
+class Lockfile(object):
+    """
+    The lockfile pins the exact version, commit and tarball of the core,
+    architectures, platforms and libraries an application was resolved to,
+    and of the libraries these depend on, such that they can be retrieved
+    again without consulting the cache.
+    """
+
+    _digest = None
+    @property
+    def digest(self): return self._digest
+
+    _components = None
+    @property
+    def components(self): return self._components
+
+    _items = None
+
+    def __init__(self, digest=None, components=None):
+        self._digest = digest
+        self._components = components if components is not None else list()
+        self._items = dict()
+
+    @classmethod
+    def from_components(cls, components=None, digest=None, dependencies=None):
+        """
+        Pin the resolved versions of the components of an application, and of
+        the components they depend on, to the commits they point to.
+
+        Args:
+            components (list):  The components of the application.
+            digest (str):  The digest of the Kraftfile(s).
+            dependencies (list):  Tuples of the manifest item, version and
+                local directory of each component which the components of
+                the application depend on, e.g. as their Config.uk selects.
+
+        Returns:
+            Lockfile: The lockfile, or None if the core or any of the libraries
+                could not be resolved to a version of a manifest item and its
+                commit.
+        """
+        pinned = list()
+
+        for component in components or list():
+            # Internal architectures and platforms ship with the core
+            if component.manifest is None and \
+                    component.type in (ComponentType.ARCH, ComponentType.PLAT):
+                continue
+
+            pinned.append((
+                component.manifest, component.version, component.localdir
+            ))
+
+        entries = list()
+        keys = set()
+
+        for manifest, version, localdir in pinned + list(dependencies or list()):
+            if manifest is None or not isinstance(version, ManifestItemVersion):
+                return None
+
+            key = (manifest.type.shortname, manifest.name)
+            if key in keys:
+                continue
+            keys.add(key)
+
+            git_sha = pinned_sha(manifest.git, version.git_sha, localdir)
+            if git_sha is None and version.git_sha is not None:
+                logger.debug("Could not resolve %s to a commit" % manifest)
+                return None
+
+            dist = None
+            for name, d in manifest.dists.items():
+                if d.versions.get(version.version, None) is version \
+                        or d.latest is version:
+                    dist = name
+                    break
+
+            entries.append({
+                "type": manifest.type.shortname,
+                "name": manifest.name,
+                "provider": manifest.provider.name
+                if manifest.provider is not None else None,
+                "git": manifest.git,
+                "dist": dist,
+                "version": version.version,
+                "git_sha": git_sha,
+                "tarball": version.tarball,
+                "tarball_checksum": version.tarball_checksum
+            })
+
+        return cls(digest=digest, components=entries)
+
+    @classmethod
+    def load(cls, path=None):
+        """
+        Returns:
+            Lockfile: The lockfile at path, or None if it does not exist or
+                cannot be read.
+        """
+        if path is None or not os.path.isfile(path):
+            return None
+
+        try:
+            with open(path, "r") as f:
+                data = yaml.safe_load(f)
+
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning("Could not read %s: %s" % (path, e))
+            return None
+
+        if not isinstance(data, dict) \
+                or data.get("version", None) != LOCKFILE_VERSION \
+                or not isinstance(data.get("components", None), list):
+            logger.warning("Ignoring unsupported lockfile: %s" % path)
+            return None
+
+        return cls(
+            digest=data.get("kraftfile", None),
+            components=data["components"]
+        )
+
+    def save(self, path=None):
+        with atomic_write(path, mode="w") as f:
+            yaml.safe_dump({
+                "version": LOCKFILE_VERSION,
+                "kraftfile": self._digest,
+                "components": self._components
+            }, f, default_flow_style=False, sort_keys=False)
+
+    def is_valid(self, digest=None):
+        """
+        Returns:
+            bool: Whether the lockfile was written for the Kraftfile(s) with the
+                given digest.
+        """
+        return self._digest is not None and self._digest == digest
+
+    def item(self, type=None, name=None):
+        """
+        Synthesise the manifest item of a pinned component, holding only the
+        version it was resolved to.
+
+        Args:
+            type (str):  The short name of the type of the component.
+            name (str):  The name of the component.
+
+        Returns:
+            ManifestItem: The manifest item, or None if it was not pinned.
+        """
+        if (type, name) in self._items:
+            return self._items[(type, name)]
+
+        item = None
+        for entry in self._components:
+            if entry.get("type", None) != type or entry.get("name", None) != name:
+                continue
+
+            dist = ManifestItemDistribution(name=entry.get("dist", None)
+                                            or entry.get("version", None))
+            dist.add_version(ManifestItemVersion(
+                version=entry.get("version", None),
+                git_sha=entry.get("git_sha", None),
+                tarball=entry.get("tarball", None),
+                tarball_checksum=entry.get("tarball_checksum", None)
+            ))
+
+            item = ManifestItem(
+                name=name,
+                type=type,
+                git=entry.get("git", None),
+                provider=entry.get("provider", None)
+            )
+            item.add_distribution(dist)
+            break
+
+        self._items[(type, name)] = item
+        return item
+
+    def items(self, type=None):
+        """
+        Returns:
+            list: The manifest items of all pinned components, or only of
+                those of the component type with the provided short name.
+        """
+        return [
+            self.item(entry.get("type", None), entry.get("name", None))
+            for entry in self._components
+            if type is None or entry.get("type", None) == type
+        ]
+
+
+def lockfile_path(config_files=None):
+    """
+    Returns:
+        str: The path of the lockfile next to the first Kraftfile.
+    """
+    return os.path.join(
+        os.path.dirname(os.path.abspath(config_files[0].filename)),
+        KRAFT_LOCKFILE
+    )
+
+
+def config_lockfile(config_files=None):
+    """
+    Returns:
+        Lockfile: The lockfile next to the Kraftfile(s) if it is still valid
+            for their contents, otherwise None.
+    """
+    if not config_files or config_files[0].filename is None:
+        return None
+
+    lockfile = Lockfile.load(lockfile_path(config_files))
+    digest = kraftfile_digest([f.filename for f in config_files])
+    if lockfile is not None and not lockfile.is_valid(digest):
+        logger.debug("Ignoring out-of-date %s" % KRAFT_LOCKFILE)
+        return None
+
+    return lockfile
+
+
+@click.pass_context
+def workdir_lockfile(ctx, workdir=None):
+    """
+    Returns:
+        Lockfile: The valid lockfile of the application at workdir or None.
+    """
+    try:
+        details = find_config(workdir, None, ctx.obj.env)
+    except KraftFileNotFound:
+        return None
+
+    return config_lockfile(details.config_files)
+
+
+@click.pass_context
+def save_workdir_lockfile(ctx, workdir=None, components=None,
+                          dependencies=None):
+    """
+    Pin the components of the application at workdir, and the components
+    they depend on, in the lockfile next to its Kraftfile.
+
+    Args:
+        workdir (str):  The working directory of the application.
+        components (list):  The components of the application.
+        dependencies (list):  See Lockfile.from_components().
+
+    Returns:
+        Lockfile: The lockfile which was written or None.
+    """
+    try:
+        details = find_config(workdir, None, ctx.obj.env)
+    except KraftFileNotFound:
+        return None
+
+    config_files = details.config_files
+    if not config_files or config_files[0].filename is None:
+        return None
+
+    lockfile = Lockfile.from_components(
+        components,
+        kraftfile_digest([f.filename for f in config_files]),
+        dependencies
+    )
+
+    if lockfile is not None:
+        path = lockfile_path(config_files)
+        logger.debug("Writing %s..." % path)
+        lockfile.save(path)
+
+    return lockfile
@@ -0,0 +1,126 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import time
+
+from kraft.logger import logger
+from kraft.manifest import Manifest
+
+
+class CacheBatch(object):
+    """
+    A cache batch collects the items of a single origin in memory and writes
+    them into the cache once, when the batch is committed, rather than every
+    time an item is added.  The batch can optionally be flushed periodically
+    so that progress survives an interrupted update.  Flushing does not mark
+    the origin as refreshed; only committing does.
+
+    Batches are used as context managers: the batch is committed when the
+    block exits normally and flushed if it exits with an exception.
+    """
+
+    _cache = None
+
+    _origin = None
+    @property
+    def origin(self): return self._origin
+
+    _manifest = None
+    @property
+    def manifest(self): return self._manifest
+
+    _flush_interval = None
+    _last_flush = None
+    _dirty = False
+
+    def __init__(self, cache=None, origin=None, manifest=None,
+                 flush_interval=None):
+        if cache is None:
+            raise ValueError("expected cache")
+        if origin is None:
+            raise ValueError("expected origin")
+
+        self._cache = cache
+        self._origin = origin
+        self._flush_interval = flush_interval
+
+        if manifest is None:
+            manifest = cache.get(origin)
+        if manifest is None:
+            manifest = Manifest(
+                manifest=origin
+            )
+
+        self._manifest = manifest
+        self._last_flush = time.time()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.flush()
+
+        return False
+
+    def add_item(self, item=None):
+        self._manifest.add_item(item)
+        self._dirty = True
+
+        if self._flush_interval is not None and \
+                time.time() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the items collected so far into the cache without marking the
+        origin as refreshed.
+        """
+        if not self._dirty:
+            return
+
+        logger.debug("Flushing %s into cache..." % self._manifest)
+        self._cache.save(self._origin, self._manifest, touch=False)
+        self._last_flush = time.time()
+        self._dirty = False
+
+    def commit(self):
+        """
+        Write the manifest into the cache and mark the origin as refreshed.
+        """
+        self._cache.save(self._origin, self._manifest)
+        self._last_flush = time.time()
+        self._dirty = False
@@ -0,0 +1,316 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import threading
+import time
+from datetime import datetime
+
+import six
+from fcache.cache import FileCache
+
+from .batch import CacheBatch
+from .index import CacheIndex
+from .store import MANIFEST_STORE_FILENAME
+from .store import MANIFEST_STORE_LOCKFILE
+from .store import ManifestStore
+from kraft import __program__
+from kraft.logger import logger
+from kraft.manifest import Manifest
+from kraft.util import FileLock
+
+
+class Cache(object):
+    _cache = None
+    _cachedir = None
+    _cache_lock = None
+    @property
+    def cache_lock(self): return self._cache_lock
+
+    def __init__(self, environment):
+        """
+        Initializes the cache so that kraft does not have to constantly
+        retrieve informational lists about unikraft, its available
+        architectures, platforms, libraries and supported applications.
+        """
+
+        self._cachedir = environment.get('UK_CACHEDIR')
+
+        # Other kraft processes may share the same cache directory.  Readers
+        # hold this lock shared and writers hold it exclusively.
+        self._lock = FileLock(
+            os.path.join(self._cachedir, MANIFEST_STORE_LOCKFILE)
+        )
+
+        # Initiaize a cache instance
+        with self._lock.exclusive():
+            self._cache = ManifestStore(
+                os.path.join(self._cachedir, MANIFEST_STORE_FILENAME)
+            )
+
+            self._cache_lock = threading.Lock()
+            self._index = CacheIndex(self._cache)
+
+            if len(self._cache) == 0:
+                self.migrate_legacy_cache()
+
+    def migrate_legacy_cache(self):
+        """
+        Import manifests from the pickle-based file cache which was used by
+        previous versions of kraft.
+        """
+        legacy_cachedir = os.path.join(self._cachedir, "cache")
+        if not os.path.isdir(legacy_cachedir):
+            return
+
+        logger.debug("Migrating %s into %s..." % (
+            legacy_cachedir, self._cache.path
+        ))
+
+        try:
+            legacy = FileCache(
+                app_cache_dir=self._cachedir,
+                appname=__program__,
+                flag='rs'
+            )
+
+            for origin in legacy:
+                manifest = legacy[origin]
+
+                # Carry over how old the legacy manifest was
+                refreshed = [
+                    item.last_checked_epoch
+                    for _, item in manifest.items()
+                    if item.last_checked_epoch is not None
+                ]
+
+                self.save(
+                    origin,
+                    manifest,
+                    refreshed=max(refreshed) if len(refreshed) > 0 else None
+                )
+
+        except Exception as e:
+            logger.warn("Could not migrate legacy cache: %s" % e)
+
+    @property
+    def cache(self):
+        ret = None
+        with self._cache_lock:
+            ret = self._cache
+        return ret
+
+    def get(self, origin=None):
+        ret = None
+        if not isinstance(origin, six.string_types):
+            return ret
+
+        with self._lock.shared():
+            if origin in self._cache:
+                logger.debug("Retrieving %s from cache..." % origin)
+                with self._cache_lock:
+                    ret = self._cache.load(origin)
+
+        return ret
+
+    @property
+    def index(self):
+        return self._index
+
+    def find_item_by_name(self, type=None, name=None):
+        items = self.find_items_by_name(type=type, name=name)
+        if len(items) > 0:
+            return items[0]
+
+        return None
+
+    def find_items_by_name(self, type=None, name=None):
+        if name is None:
+            return list()
+
+        with self._lock.shared():
+            return self._index.find(type=type, name=name)
+
+    def find_items_by_type(self, type=None):
+        if type is None:
+            return list()
+
+        with self._lock.shared():
+            return self._index.find_by_type(type)
+
+    def find_item_by_localdir(self, localdir=None):
+        if localdir is None:
+            return None
+
+        with self._lock.shared():
+            return self._index.find_by_localdir(localdir)
+
+    def all(self):
+        with self._lock.shared():
+            return self.cache.origins()
+
+    def batch(self, origin, manifest=None, flush_interval=None):
+        """
+        Begin a batch of saves for the provided origin.
+
+        Args:
+            origin (str):  The origin of the manifest.
+            manifest (Manifest):  The manifest to add items to.  Defaults to
+                the cached manifest of the origin.
+            flush_interval (int):  If set, the number of seconds after which
+                items added to the batch are written into the cache.
+
+        Returns:
+            CacheBatch: The batch, which is committed into the cache when used
+                as a context manager.
+        """
+        return CacheBatch(
+            cache=self,
+            origin=origin,
+            manifest=manifest,
+            flush_interval=flush_interval
+        )
+
+    def save(self, origin, manifest, refreshed=None, touch=True):
+        if not isinstance(origin, six.string_types):
+            raise TypeError("origin is not string")
+        if not isinstance(manifest, Manifest):
+            raise TypeError("Invalid manifest")
+
+        with self._lock.exclusive(), self._cache_lock:
+            logger.debug("Saving %s into cache..." % manifest)
+            self._cache.save(
+                origin,
+                manifest,
+                refreshed=refreshed,
+                touch=touch
+            )
+            self._index.invalidate()
+
+    def sync(self):
+        # Each save is committed to the store in its own transaction so there
+        # is nothing left to write back to the filesystem.
+        logger.debug("Synchronizing cache with filesystem...")
+
+    def purge(self):
+        logger.debug("Purging cache...")
+
+        with self._lock.exclusive(), self._cache_lock:
+            self._cache.clear()
+            self._index.invalidate()
+
+    def is_stale(self, ttl=None):
+        """
+        Determine if the list of remote repositories is stale.  Return a boolean
+        value if at least one repository is marked as stale.
+
+        Args:
+            ttl (int):  The number of seconds after which a cached origin is
+                considered stale.  If unset, only an empty cache is stale.
+        """
+
+        logger.debug("Checking cache for staleness...")
+
+        if len(self.all()) == 0:
+            return True
+
+        if ttl is None:
+            return False
+
+        return len(self.stale_origins(ttl=ttl)) > 0
+
+    def last_refreshed(self, origin=None):
+        """
+        Returns:
+            datetime: When the origin was last refreshed, or None if it never
+                has been.
+        """
+        with self._lock.shared():
+            freshness = self._cache.freshness()
+
+        refreshed, _ = freshness.get(origin, (None, None))
+        if refreshed is None:
+            return None
+
+        return datetime.fromtimestamp(refreshed)
+
+    def stale_origins(self, origins=None, ttl=None, retry=None):
+        """
+        Determine which origins have not been refreshed within the provided
+        time-to-live.  Origins which are not in the cache at all are always
+        stale.
+
+        Args:
+            origins (list):  The origins to check.  Defaults to all cached
+                origins.
+            ttl (int):  The number of seconds after which an origin is stale.
+                A value of zero or less disables the check.
+            retry (int):  If set, omit origins which were already scheduled
+                for a refresh within this number of seconds.
+
+        Returns:
+            list: The stale origins.
+        """
+        with self._lock.shared():
+            freshness = self._cache.freshness()
+
+        if origins is None:
+            origins = list(freshness.keys())
+
+        if ttl is None or ttl <= 0:
+            return [origin for origin in origins if origin not in freshness]
+
+        now = time.time()
+        stale = list()
+
+        for origin in origins:
+            refreshed, attempted = freshness.get(origin, (None, None))
+
+            if refreshed is not None and now - refreshed <= ttl:
+                continue
+
+            if retry is not None and attempted is not None \
+                    and now - attempted <= retry:
+                continue
+
+            stale.append(origin)
+
+        return stale
+
+    def mark_refreshing(self, origins=None):
+        """
+        Record that a refresh has been scheduled for the provided origins.
+        """
+        with self._lock.exclusive(), self._cache_lock:
+            self._cache.mark_attempted(origins)
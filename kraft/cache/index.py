@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+
+import click
+
+
+class CacheIndex(object):
+    """
+    The cache index holds secondary, in-memory lookup tables over every
+    manifest item known to the cache so that components can be resolved by
+    their type and name, by their name alone, or by their location on disk
+    without scanning every origin.  The index is built lazily on first use
+    from a single pass over the manifest store.
+    """
+
+    _store = None
+
+    _by_type_name = None
+    _by_name = None
+    _by_localdir = None
+    _localdir_workdir = None
+
+    def __init__(self, store=None):
+        if store is None:
+            raise ValueError("expected store")
+
+        self._store = store
+        self._lock = threading.RLock()
+
+    def _build(self):
+        """
+        Returns:
+            tuple: The tables of items by their type and name and by their
+                name, which remain valid after the index is invalidated.
+        """
+        with self._lock:
+            if self._by_type_name is not None:
+                return self._by_type_name, self._by_name
+
+            by_type_name = dict()
+            by_name = dict()
+
+            for item in self._store.find_items():
+                key = (item.type.shortname, item.name)
+                by_type_name.setdefault(key, list()).append(item)
+                by_name.setdefault(item.name, list()).append(item)
+
+            self._by_name = by_name
+            self._by_type_name = by_type_name
+
+            return by_type_name, by_name
+
+    @click.pass_context
+    def _build_localdir(ctx, self):
+        # Resolved local directories depend on the current working directory,
+        # so rebuild this table whenever it changes.
+        workdir = ctx.obj.workdir
+
+        with self._lock:
+            _, by_name = self._build()
+
+            if self._by_localdir is not None and \
+                    self._localdir_workdir == workdir:
+                return self._by_localdir
+
+            by_localdir = dict()
+            for items in by_name.values():
+                for item in items:
+                    # Do not use item.localdir as it memorizes the resolved
+                    # path on the item itself.
+                    localdir = item._localdir
+                    if localdir is None:
+                        localdir = item.type.localdir(item.name)
+                    by_localdir.setdefault(localdir, item)
+
+            self._by_localdir = by_localdir
+            self._localdir_workdir = workdir
+
+            return by_localdir
+
+    def find(self, type=None, name=None):
+        """
+        Find manifest items by their name and, optionally, their type.
+
+        Args:
+            type (str):  The short name of the component type, e.g. lib.
+            name (str):  The name of the component.
+
+        Returns:
+            list: All matching manifest items.
+        """
+        by_type_name, by_name = self._build()
+
+        if type is None:
+            return list(by_name.get(name, list()))
+
+        return list(by_type_name.get((type, name), list()))
+
+    def find_by_type(self, type=None):
+        """
+        Returns:
+            list: All manifest items of the component type with the provided
+                short name.
+        """
+        by_type_name, _ = self._build()
+
+        return [item for (t, _), items in by_type_name.items()
+                if t == type for item in items]
+
+    def find_by_localdir(self, localdir=None):
+        return self._build_localdir().get(localdir, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._by_type_name = None
+            self._by_name = None
+            self._by_localdir = None
+            self._localdir_workdir = None
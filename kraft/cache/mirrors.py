@@ -0,0 +1,213 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import hashlib
+import os
+import threading
+
+from git import GitCommandError
+from git.cmd import Git
+
+from kraft.const import UNIKRAFT_MIRRORSDIR
+from kraft.logger import logger
+from kraft.util import FileLock
+
+GIT_MIRRORS_DIRNAME = "remotes"
+GIT_MIRRORS_REFSPECS = [
+    "+refs/heads/*:refs/heads/*",
+    "+refs/tags/*:refs/tags/*",
+]
+
+
+def is_bare_repository(path=None):
+    return path is not None \
+        and os.path.isfile(os.path.join(path, "HEAD")) \
+        and os.path.isdir(os.path.join(path, "objects"))
+
+
+class GitMirrors(object):
+    """
+    The git mirrors keep one bare repository per remote which the checkouts
+    of its components borrow their objects from through git's alternates,
+    such that each remote is only fetched once per process and its objects
+    are only stored once however many checkouts there are.
+
+    Objects are never pruned from a mirror as checkouts may still refer to
+    them.  Remotes which already are local bare repositories, such as the
+    mirrors restored from a bundle, are used as they are.
+    """
+
+    _path = None
+    @property
+    def path(self): return self._path
+
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._url_locks = dict()
+        self._mirrors = dict()
+
+    def mirror_path(self, url=None):
+        """
+        Args:
+            url (str):  The URL of the remote.
+
+        Returns:
+            str: The bare repository which mirrors the remote.
+        """
+        if is_bare_repository(url):
+            return url
+
+        return os.path.join(self._path, "%s.git" % hashlib.sha1(
+            url.encode("utf-8")
+        ).hexdigest())
+
+    def _fetch(self, url=None, path=None):
+        with FileLock("%s.lock" % path).exclusive():
+            if not is_bare_repository(path):
+                Git().init("--bare", "--quiet", path)
+                Git(path).remote("add", "origin", url)
+
+            disable_pruning(path)
+
+            Git(path).fetch("--quiet", "origin", *GIT_MIRRORS_REFSPECS)
+
+    def update(self, url=None):
+        """
+        Bring the mirror of a remote up to date, unless this process already
+        has done so.
+
+        Args:
+            url (str):  The URL of the remote.
+
+        Returns:
+            str: The bare repository which mirrors the remote or None if
+                there is no mirror of it.
+        """
+        if url is None or self._path is None:
+            return None
+
+        if is_bare_repository(url):
+            return url
+
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+
+        with url_lock:
+            if url in self._mirrors:
+                return self._mirrors[url]
+
+            path = self.mirror_path(url)
+
+            try:
+                self._fetch(url, path)
+                logger.debug("Updated the mirror of %s in %s" % (url, path))
+
+            except GitCommandError as e:
+                logger.warning("Could not update the mirror of %s: %s" % (url, e))
+
+                # A mirror which is merely stale still saves fetching what
+                # it already has
+                if not is_bare_repository(path):
+                    path = None
+
+            self._mirrors[url] = path
+
+            return path
+
+
+def disable_pruning(path=None):
+    """
+    Stop git from ever pruning the objects of a mirror, which checkouts may
+    borrow even once none of the mirror's refs reach them any longer.
+
+    Args:
+        path (str):  The bare repository of the mirror.
+    """
+    git = Git(path)
+
+    if git.config("--get", "gc.pruneExpire", with_exceptions=False) != "never":
+        git.config("gc.auto", "0")
+        git.config("gc.pruneExpire", "never")
+
+
+def add_alternate(git_dir=None, mirror=None):
+    """
+    Let a repository borrow the objects of a mirror, as `git clone
+    --reference` would.
+
+    Args:
+        git_dir (str):  The git directory of the repository.
+        mirror (str):  The bare repository to borrow objects from.
+    """
+    objects = os.path.abspath(os.path.join(mirror, "objects"))
+    alternates = os.path.join(git_dir, "objects", "info", "alternates")
+
+    if os.path.exists(alternates):
+        with open(alternates, "r") as f:
+            if objects in f.read().splitlines():
+                return
+
+    if not os.path.isdir(os.path.dirname(alternates)):
+        os.makedirs(os.path.dirname(alternates), exist_ok=True)
+
+    with open(alternates, "a") as f:
+        f.write("%s\n" % objects)
+
+
+_git_mirrors = None
+_git_mirrors_lock = threading.Lock()
+
+
+def git_mirrors():
+    """
+    Returns:
+        GitMirrors: The git mirrors of this process, kept in the cache
+            directory if one has been set up.
+    """
+    global _git_mirrors
+
+    with _git_mirrors_lock:
+        if _git_mirrors is None:
+            path = None
+            if os.environ.get('UK_CACHEDIR', None) is not None:
+                path = os.path.join(
+                    os.environ['UK_CACHEDIR'],
+                    UNIKRAFT_MIRRORSDIR,
+                    GIT_MIRRORS_DIRNAME
+                )
+
+            _git_mirrors = GitMirrors(path)
+
+        return _git_mirrors
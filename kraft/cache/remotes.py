@@ -0,0 +1,209 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import os
+import threading
+import time
+
+from git.cmd import Git
+
+from kraft.const import REMOTE_PROVIDER_TTL
+from kraft.const import REMOTE_REFS_TTL
+from kraft.logger import logger
+from kraft.util import atomic_write
+from kraft.util import FileLock
+
+REMOTE_CACHE_FILENAME = "remotes.json"
+REMOTE_CACHE_LOCKFILE = "remotes.lock"
+
+
+class RemoteCache(object):
+    """
+    The remote cache remembers which provider serves an origin and which
+    refs the remote of an origin advertises, such that each origin only has
+    to be classified once rather than by every provider which is asked.
+
+    Providers are remembered on disk for provider_ttl seconds and shared
+    with other kraft processes.  The output of `git ls-remote` is only
+    remembered by this process for refs_ttl seconds: remembering it any
+    longer would hide refs pushed since from the next update.
+    """
+
+    _path = None
+    @property
+    def path(self): return self._path
+
+    def __init__(self, path=None, provider_ttl=REMOTE_PROVIDER_TTL,
+                 refs_ttl=REMOTE_REFS_TTL, clock=time.time):
+        self._path = path
+        self._provider_ttl = provider_ttl
+        self._refs_ttl = refs_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._providers = None
+        self._refs = dict()
+        self._refs_locks = dict()
+
+        self._file_lock = None
+        if path is not None:
+            self._file_lock = FileLock(os.path.join(
+                os.path.dirname(path), REMOTE_CACHE_LOCKFILE
+            ))
+
+    def _read(self):
+        if self._path is None or not os.path.exists(self._path):
+            return dict()
+
+        try:
+            with self._file_lock.shared():
+                with open(self._path, "r") as f:
+                    return json.load(f)
+
+        except (IOError, ValueError) as e:
+            logger.debug("Ignoring unreadable %s: %s" % (self._path, e))
+            return dict()
+
+    def _load(self):
+        if self._providers is None:
+            self._providers = self._read()
+
+        return self._providers
+
+    def provider(self, kind=None, origin=None):
+        """
+        Args:
+            kind (str):  The kind of provider, e.g. "list" or "lib".
+            origin (str):  The origin.
+
+        Returns:
+            str: The name of the provider of the origin or None if it is not
+                known or has expired.
+        """
+        with self._lock:
+            entry = self._load().get("%s:%s" % (kind, origin), None)
+
+        if entry is None or self._clock() - entry[1] > self._provider_ttl:
+            return None
+
+        return entry[0]
+
+    def set_provider(self, kind=None, origin=None, provider=None):
+        key = "%s:%s" % (kind, origin)
+        entry = [provider, self._clock()]
+
+        with self._lock:
+            self._load()[key] = entry
+
+        if self._path is None:
+            return
+
+        # Merge with what other processes have remembered in the meantime
+        with self._file_lock.exclusive():
+            providers = self._read()
+            providers[key] = entry
+
+            now = self._clock()
+            providers = {
+                k: v for k, v in providers.items()
+                if now - v[1] <= self._provider_ttl
+            }
+
+            with atomic_write(self._path, mode="w") as f:
+                json.dump(providers, f)
+
+    def ls_remote(self, origin=None):
+        """
+        List the refs of the remote, at most once per refs_ttl seconds.  If
+        several threads ask for the same origin at once, only one of them
+        contacts the remote.
+
+        Returns:
+            str: The output of `git ls-remote`.
+
+        Raises:
+            GitCommandError: If the refs could not be listed.
+        """
+        with self._lock:
+            lock = self._refs_locks.setdefault(origin, threading.Lock())
+
+        with lock:
+            refs = self.refs(origin)
+            if refs is None:
+                refs = Git().ls_remote(origin)
+                self.set_refs(origin, refs)
+
+        return refs
+
+    def refs(self, origin=None):
+        """
+        Returns:
+            str: The remembered output of `git ls-remote` or None.
+        """
+        with self._lock:
+            entry = self._refs.get(origin, None)
+
+        if entry is None or self._clock() - entry[1] > self._refs_ttl:
+            return None
+
+        return entry[0]
+
+    def set_refs(self, origin=None, refs=None):
+        with self._lock:
+            self._refs[origin] = (refs, self._clock())
+
+
+_remote_cache = None
+_remote_cache_lock = threading.Lock()
+
+
+def remote_cache():
+    """
+    Returns:
+        RemoteCache: The remote cache of this process, kept in the cache
+            directory if one has been set up.
+    """
+    global _remote_cache
+
+    with _remote_cache_lock:
+        if _remote_cache is None:
+            path = None
+            if os.environ.get('UK_CACHEDIR', None) is not None:
+                path = os.path.join(
+                    os.environ['UK_CACHEDIR'], REMOTE_CACHE_FILENAME
+                )
+
+            _remote_cache = RemoteCache(path)
+
+        return _remote_cache
@@ -0,0 +1,554 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import functools
+import os
+import sqlite3
+import threading
+import time
+
+import six
+
+from kraft.manifest import epoch_seconds
+from kraft.manifest import Manifest
+from kraft.manifest import ManifestItem
+from kraft.manifest import ManifestItemDistribution
+from kraft.manifest import ManifestItemVersion
+
+MANIFEST_STORE_FILENAME = "manifests.db"
+MANIFEST_STORE_LOCKFILE = "manifests.lock"
+MANIFEST_STORE_TIMEOUT = 60
+MANIFEST_STORE_SCHEMA_VERSION = 4
+
+MANIFEST_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifests (
+    origin            TEXT PRIMARY KEY,
+    manifest_checksum TEXT,
+    last_refreshed    REAL,
+    last_attempted    REAL
+);
+
+CREATE TABLE IF NOT EXISTS items (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin            TEXT NOT NULL
+                      REFERENCES manifests(origin) ON DELETE CASCADE,
+    name              TEXT NOT NULL,
+    type              TEXT,
+    description       TEXT,
+    provider          TEXT,
+    git               TEXT,
+    localdir          TEXT,
+    manifest          TEXT,
+    manifest_checksum TEXT,
+    last_checked      INTEGER,
+    fingerprint       TEXT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS items_origin_name ON items(origin, name);
+CREATE INDEX IF NOT EXISTS items_type_name ON items(type, name);
+CREATE INDEX IF NOT EXISTS items_localdir ON items(localdir);
+CREATE INDEX IF NOT EXISTS items_git ON items(git);
+
+CREATE TABLE IF NOT EXISTS distributions (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id           INTEGER NOT NULL
+                      REFERENCES items(id) ON DELETE CASCADE,
+    name              TEXT NOT NULL,
+    manifest          TEXT,
+    manifest_checksum TEXT
+);
+
+CREATE INDEX IF NOT EXISTS distributions_item ON distributions(item_id);
+
+CREATE TABLE IF NOT EXISTS versions (
+    dist_id           INTEGER NOT NULL
+                      REFERENCES distributions(id) ON DELETE CASCADE,
+    version           TEXT,
+    git_sha           TEXT,
+    timestamp         INTEGER,
+    tarball           TEXT,
+    tarball_size      INTEGER,
+    tarball_checksum  TEXT,
+    listed            INTEGER NOT NULL DEFAULT 1,
+    latest            INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS versions_dist ON versions(dist_id);
+"""
+
+
+def _migrate_epoch_timestamps(conn=None):
+    """
+    Convert the dates which were stored as formatted strings into seconds
+    since the epoch, such that they need not be parsed on every load.  The
+    columns keep their TEXT affinity, hence the seconds are read back as
+    strings of digits, which epoch_seconds() converts cheaply.
+    """
+    for table, column in (("items", "last_checked"), ("versions", "timestamp")):
+        rows = conn.execute(
+            "SELECT rowid, %s FROM %s WHERE %s IS NOT NULL" % (
+                column, table, column
+            )
+        ).fetchall()
+
+        conn.executemany(
+            "UPDATE %s SET %s = ? WHERE rowid = ?" % (table, column),
+            [(epoch_seconds(row[1]), row[0]) for row in rows]
+        )
+
+
+# Statements, or functions given the connection, which bring a store of the
+# given version up to the next one
+MANIFEST_STORE_MIGRATIONS = {
+    1: [
+        "ALTER TABLE manifests ADD COLUMN last_refreshed REAL",
+        "ALTER TABLE manifests ADD COLUMN last_attempted REAL",
+    ],
+    2: [
+        "ALTER TABLE items ADD COLUMN fingerprint TEXT",
+    ],
+    3: [
+        _migrate_epoch_timestamps,
+    ],
+}
+
+# Columns of the items table which can be used to look up manifest items
+MANIFEST_STORE_ITEM_FILTERS = (
+    "origin", "name", "type", "localdir", "git"
+)
+
+
+class ManifestStore(object):
+    """
+    The manifest store persists manifests in an SQLite database rather than
+    as a single serialized object per origin.  Items, their distributions and
+    versions are kept in separate, indexed tables which allows components to
+    be looked up without having to deserialize every known origin.
+    """
+
+    _path = None
+    @property
+    def path(self): return self._path
+
+    _conn = None
+    _lock = None
+
+    def __init__(self, path=None):
+        if path is None:
+            raise ValueError("expected path")
+
+        self._path = path
+
+        dirname = os.path.dirname(path)
+        if len(dirname) > 0 and not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path,
+            timeout=MANIFEST_STORE_TIMEOUT,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+
+        # Write-ahead logging lets other processes keep reading whilst a
+        # writer commits, and each commit is atomic.
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._migrate()
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+        # An unversioned store is either new or empty, so simply create it
+        if version > 0:
+            while version < MANIFEST_STORE_SCHEMA_VERSION:
+                for statement in MANIFEST_STORE_MIGRATIONS[version]:
+                    if callable(statement):
+                        statement(self._conn)
+                    else:
+                        self._conn.execute(statement)
+                version += 1
+
+        self._conn.executescript(MANIFEST_STORE_SCHEMA)
+        self._conn.execute(
+            "PRAGMA user_version = %d" % MANIFEST_STORE_SCHEMA_VERSION
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM manifests"
+            ).fetchone()[0]
+
+    def __contains__(self, origin):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM manifests WHERE origin = ?", (origin,)
+            ).fetchone() is not None
+
+    def __iter__(self):
+        return iter(self.origins())
+
+    def origins(self):
+        with self._lock:
+            return [row["origin"] for row in self._conn.execute(
+                "SELECT origin FROM manifests ORDER BY rowid"
+            )]
+
+    def load(self, origin=None):
+        """
+        Load the manifest for the provided origin including all of its items.
+
+        Args:
+            origin (str):  The origin of the manifest.
+
+        Returns:
+            Manifest: The manifest or None if the origin is not known.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM manifests WHERE origin = ?", (origin,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            manifest = Manifest(
+                manifest=row["origin"],
+                manifest_checksum=row["manifest_checksum"]
+            )
+
+            manifest.add_item(self._load_items("i.origin = ?", (origin,)))
+
+        return manifest
+
+    def find_items(self, limit=None, **filters):
+        """
+        Retrieve manifest items which match all of the provided filters.
+
+        Args:
+            limit (int):  The maximum number of items to return.
+            filters:  Any of the indexed columns: origin, name, type, localdir
+                or git.
+
+        Returns:
+            list: The matching manifest items in the order they were saved.
+        """
+        where = list()
+        params = list()
+
+        for col, val in filters.items():
+            if col not in MANIFEST_STORE_ITEM_FILTERS:
+                raise ValueError("cannot filter manifest items by %s" % col)
+            if val is None:
+                continue
+            where.append("i.%s = ?" % col)
+            params.append(val)
+
+        if len(where) == 0:
+            where.append("1")
+
+        with self._lock:
+            return self._load_items(" AND ".join(where), params, limit=limit)
+
+    def _load_items(self, where="1", params=(), limit=None):
+        items_sql = "SELECT i.* FROM items i WHERE %s ORDER BY i.id" % where
+        if limit is not None:
+            items_sql += " LIMIT %d" % int(limit)
+
+        # Distributions and their versions are only loaded once an item's
+        # dists are first accessed, as most commands only use a few items
+        return [ManifestItem(
+            name=row["name"],
+            type=row["type"],
+            description=row["description"],
+            provider=row["provider"],
+            git=row["git"],
+            localdir=row["localdir"],
+            manifest=row["manifest"],
+            manifest_checksum=row["manifest_checksum"],
+            last_checked=row["last_checked"],
+            fingerprint=row["fingerprint"],
+            dists=None,
+            loader=functools.partial(self._load_item_dists, row["origin"])
+        ) for row in self._conn.execute(items_sql, params)]
+
+    def _load_item_dists(self, origin=None, item=None):
+        """
+        Load the distributions of a manifest item as they are currently saved
+        for its origin.
+
+        Returns:
+            dict: The distributions of the item by their name.
+        """
+        with self._lock:
+            if self._conn is None:
+                raise ValueError("manifest store is closed")
+
+            # Read the distributions and versions from the same snapshot
+            begin = not self._conn.in_transaction
+            if begin:
+                self._conn.execute("BEGIN")
+
+            try:
+                dists = self._load_dists(
+                    "i.origin = ? AND i.name = ?", (origin, item.name)
+                )
+            finally:
+                if begin:
+                    self._conn.execute("COMMIT")
+
+        for _, item_dists in dists.items():
+            return item_dists
+
+        return dict()
+
+    def _load_dists(self, where="1", params=()):
+        """
+        Returns:
+            dict: The distributions, by their name, of each of the matching
+                items by the item's id.
+        """
+        by_item = dict()
+        dists = dict()
+        for row in self._conn.execute(
+                "SELECT d.* FROM distributions d JOIN items i "
+                "ON i.id = d.item_id WHERE %s ORDER BY d.id" % where, params):
+            dist = ManifestItemDistribution(
+                name=row["name"],
+                manifest=row["manifest"],
+                manifest_checksum=row["manifest_checksum"]
+            )
+            dists[row["id"]] = dist
+
+            item_dists = by_item.setdefault(row["item_id"], dict())
+            if dist.name not in item_dists:
+                item_dists[dist.name] = dist
+
+        if len(dists) == 0:
+            return by_item
+
+        latest = dict()
+        for row in self._conn.execute(
+                "SELECT * FROM versions WHERE dist_id IN (%s) ORDER BY rowid"
+                % ",".join(str(d) for d in dists.keys())):
+            dist = dists[row["dist_id"]]
+            version = ManifestItemVersion(
+                version=row["version"],
+                git_sha=row["git_sha"],
+                timestamp=row["timestamp"],
+                tarball=row["tarball"],
+                tarball_size=row["tarball_size"],
+                tarball_checksum=row["tarball_checksum"]
+            )
+
+            if row["listed"]:
+                dist.add_version(version)
+            if row["latest"]:
+                latest[row["dist_id"]] = version
+
+        # Restore the latest versions as they were saved rather than as
+        # add_version() would determine them
+        for dist_id, version in latest.items():
+            dists[dist_id].latest = version
+
+        return by_item
+
+    def freshness(self):
+        """
+        Returns:
+            dict: The time, in seconds since the epoch, at which each origin
+                was last refreshed and last scheduled for a refresh.
+        """
+        with self._lock:
+            return {row["origin"]: (
+                row["last_refreshed"],
+                row["last_attempted"]
+            ) for row in self._conn.execute(
+                "SELECT origin, last_refreshed, last_attempted FROM manifests"
+            )}
+
+    def mark_attempted(self, origins=None, attempted=None):
+        if attempted is None:
+            attempted = time.time()
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO manifests (origin) VALUES (?)",
+                [(origin,) for origin in origins]
+            )
+            self._conn.executemany(
+                "UPDATE manifests SET last_attempted = ? WHERE origin = ?",
+                [(attempted, origin) for origin in origins]
+            )
+
+    def save(self, origin=None, manifest=None, refreshed=None, touch=True):
+        """
+        Replace the stored manifest of the provided origin within a single
+        transaction.
+
+        Args:
+            origin (str):  The origin of the manifest.
+            manifest (Manifest):  The manifest to save.
+            refreshed (float):  The time, in seconds since the epoch, at which
+                the manifest was retrieved from its origin.  Defaults to now.
+            touch (bool):  Whether to update the time at which the origin was
+                refreshed at all.
+        """
+        if not isinstance(origin, six.string_types):
+            raise TypeError("origin is not string")
+        if not isinstance(manifest, Manifest):
+            raise TypeError("Invalid manifest")
+
+        if refreshed is None:
+            refreshed = time.time()
+
+        # Load any distributions which have not been accessed yet before the
+        # rows they would be loaded from are replaced.  Loading takes the lock
+        # of the items' loader before this store's
+        for _, item in manifest.items():
+            item.dists
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "DELETE FROM items WHERE origin = ?", (origin,)
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO manifests (origin) VALUES (?)",
+                    (origin,)
+                )
+                self._conn.execute(
+                    "UPDATE manifests SET manifest_checksum = ? "
+                    "WHERE origin = ?", (
+                        manifest.manifest_checksum,
+                        origin
+                    )
+                )
+
+                if touch:
+                    self._conn.execute(
+                        "UPDATE manifests SET last_refreshed = ? "
+                        "WHERE origin = ?", (
+                            refreshed,
+                            origin
+                        )
+                    )
+
+                for _, item in manifest.items():
+                    self._save_item(origin, item)
+
+                self._conn.execute("COMMIT")
+
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _save_item(self, origin=None, item=None):
+        _type = item._type
+        if _type is not None and not isinstance(_type, six.string_types):
+            _type = _type.shortname
+
+        provider = item._provider
+        if provider is not None and not isinstance(provider, six.string_types):
+            provider = provider.name
+
+        item_id = self._conn.execute(
+            "INSERT INTO items (origin, name, type, description, provider, "
+            "git, localdir, manifest, manifest_checksum, last_checked, "
+            "fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                origin,
+                item.name,
+                _type,
+                item.description,
+                provider,
+                item.git,
+                item._localdir,
+                item.manifest,
+                item.manifest_checksum,
+                item.last_checked_epoch,
+                item.fingerprint
+            )
+        ).lastrowid
+
+        for _, dist in item.dists.items():
+            dist_id = self._conn.execute(
+                "INSERT INTO distributions (item_id, name, manifest, "
+                "manifest_checksum) VALUES (?, ?, ?, ?)", (
+                    item_id,
+                    dist.name,
+                    dist.manifest,
+                    dist.manifest_checksum
+                )
+            ).lastrowid
+
+            latest = dist._latest
+            versions = list(dist.versions.values())
+            if latest is not None and latest not in versions:
+                versions.append(latest)
+
+            self._conn.executemany(
+                "INSERT INTO versions (dist_id, version, git_sha, timestamp, "
+                "tarball, tarball_size, tarball_checksum, listed, latest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [(
+                    dist_id,
+                    version.version,
+                    version.git_sha,
+                    version.epoch,
+                    version.tarball,
+                    version.tarball_size,
+                    version.tarball_checksum,
+                    1 if version.version in dist.versions else 0,
+                    1 if version is latest else 0
+                ) for version in versions]
+            )
+
+    def delete(self, origin=None):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM manifests WHERE origin = ?", (origin,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM manifests")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -34,6 +34,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 from .build import cmd_build
+from .cache import grp_cache
 from .clean import cmd_clean
 from .configure import cmd_configure
 from .fetch import cmd_fetch
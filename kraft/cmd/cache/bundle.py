@@ -0,0 +1,378 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+from git import GitCommandError
+from git import InvalidGitRepositoryError
+from git import NoSuchPathError
+from git import Repo as GitRepo
+
+from kraft.cache import disable_pruning
+from kraft.cmd.list.provider.git import git_refs
+from kraft.cmd.list.provider.index import index_from_manifests
+from kraft.cmd.list.provider.index import load_index
+from kraft.cmd.list.provider.index import manifests_from_index
+from kraft.cmd.list.provider.tarball import tarball_filename
+from kraft.const import UNIKRAFT_CACHEDIR
+from kraft.const import UNIKRAFT_MIRRORSDIR
+from kraft.error import KraftError
+from kraft.logger import logger
+from kraft.types import break_component_naming_format
+from kraft.types import str_to_component_type
+from kraft.util import atomic_write
+
+BUNDLE_INDEX = "index.json"
+BUNDLE_GIT_DIRNAME = "git"
+BUNDLE_ARCHIVES_DIRNAME = "archives"
+BUNDLE_GIT_EXT = ".bundle"
+
+
+def bundle_cachedir(ctx):
+    return ctx.obj.env.get('UK_CACHEDIR', os.path.join(
+        ctx.obj.workdir,
+        UNIKRAFT_CACHEDIR
+    ))
+
+
+def bundle_mirror_path(ctx, type=None, name=None):
+    """
+    Returns:
+        str: The bare repository which a component's git bundle is restored
+            into.
+    """
+    return os.path.join(
+        bundle_cachedir(ctx),
+        UNIKRAFT_MIRRORSDIR,
+        type.shortname,
+        "%s.git" % name
+    )
+
+
+def bundle_select_items(manifests=None, names=None):
+    """
+    Select the items whose sources should be bundled, once per component even
+    if several origins provide it.
+
+    Args:
+        manifests (list):  The manifests to select from.
+        names (list):  Component names, e.g. lib/newlib.  Defaults to all.
+
+    Returns:
+        list: The selected manifest items.
+    """
+    wanted = list()
+    for fullname in names or list():
+        type, name, _, _ = break_component_naming_format(fullname)
+        wanted.append((type, name))
+
+    selected = dict()
+    for manifest in manifests:
+        for _, item in manifest.items():
+            if len(wanted) > 0 and not any(
+                    item.name == name and (type is None or type == item.type)
+                    for type, name in wanted):
+                continue
+
+            selected.setdefault((item.type.shortname, item.name), item)
+
+    return list(selected.values())
+
+
+def bundle_item_archives(cachedir=None, item=None):
+    """
+    Returns:
+        list: The tarballs of the item's versions which have been downloaded
+            into the cache directory.
+    """
+    archives = set()
+    for _, dist in item.dists.items():
+        for version in list(dist.versions.values()) + [dist.latest]:
+            if version is None or version.tarball is None:
+                continue
+
+            path = os.path.join(cachedir, tarball_filename(
+                item.name, version.version, version.tarball
+            ))
+            if os.path.isfile(path):
+                archives.add(path)
+
+    return sorted(archives)
+
+
+def bundle_add_bytes(tar=None, arcname=None, data=None):
+    info = tarfile.TarInfo(arcname)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def bundle_add_checkout(tar=None, arcname=None, localdir=None, tmpdir=None):
+    """
+    Add every branch, remote branch and tag of a checkout to the archive as a
+    git bundle.  Symbolic refs are left out as they cannot be restored.
+
+    Returns:
+        bool: Whether the checkout was added.
+    """
+    try:
+        repo = GitRepo(localdir)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        return False
+
+    refs = [name for name, _, _ in git_refs(repo)]
+    if len(refs) == 0:
+        return False
+
+    # Only one bundle is kept on disk at a time
+    path = os.path.join(tmpdir, os.path.basename(arcname))
+    try:
+        repo.git.bundle("create", path, *refs)
+        tar.add(path, arcname=arcname)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    return True
+
+
+def write_bundle(ctx, fileobj=None, manifests=None, names=None,
+                 sources=True):
+    """
+    Write the manifests, and the sources of the selected components, as a
+    single gzip-compressed tar stream.  The manifests are written first such
+    that the stream can be imported in a single pass.
+
+    Args:
+        ctx (Context):  The click context.
+        fileobj (file):  The binary file to write the stream to.
+        manifests (list):  The manifests to export.
+        names (list):  The components whose sources to include.  Defaults to
+            all components which have been pulled.
+        sources (bool):  Whether to include sources at all.
+
+    Returns:
+        tuple: The number of checkouts and archives included.
+    """
+    cachedir = bundle_cachedir(ctx)
+    checkouts = 0
+    archives = 0
+
+    with tarfile.open(fileobj=fileobj, mode="w|gz") as tar:
+        bundle_add_bytes(tar, BUNDLE_INDEX, json.dumps(
+            index_from_manifests(manifests), sort_keys=True
+        ).encode("utf-8"))
+
+        if not sources:
+            return checkouts, archives
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            for item in bundle_select_items(manifests, names):
+                arcname = "/".join([
+                    BUNDLE_GIT_DIRNAME,
+                    item.type.shortname,
+                    item.name + BUNDLE_GIT_EXT
+                ])
+
+                try:
+                    if bundle_add_checkout(tar, arcname, item.localdir, tmpdir):
+                        logger.info("Bundled %s from %s" % (item, item.localdir))
+                        checkouts += 1
+
+                except GitCommandError as e:
+                    logger.warning("Could not bundle %s: %s" % (item, e))
+
+                for path in bundle_item_archives(cachedir, item):
+                    tar.add(path, arcname="/".join([
+                        BUNDLE_ARCHIVES_DIRNAME,
+                        os.path.basename(path)
+                    ]))
+                    archives += 1
+
+        finally:
+            shutil.rmtree(tmpdir)
+
+    return checkouts, archives
+
+
+def restore_git_bundle(ctx, f=None, type=None, name=None):
+    """
+    Restore a git bundle into the component's bare mirror, such that its
+    remote branches become the mirror's branches and it can be fetched from
+    like the original remote.
+
+    Returns:
+        str: The path of the mirror.
+    """
+    mirror = bundle_mirror_path(ctx, type, name)
+
+    try:
+        repo = GitRepo(mirror)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        repo = GitRepo.init(mirror, bare=True, mkdir=True)
+
+    # Checkouts may borrow the mirror's objects
+    disable_pruning(mirror)
+
+    fd, path = tempfile.mkstemp(dir=os.path.dirname(mirror), suffix=BUNDLE_GIT_EXT)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(f, out)
+
+        repo.git.fetch(path, "+refs/remotes/origin/*:refs/heads/*")
+        repo.git.fetch(path, "+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+    finally:
+        os.remove(path)
+
+    return mirror
+
+
+def restore_archive(ctx, f=None, filename=None):
+    path = os.path.join(bundle_cachedir(ctx), filename)
+
+    with atomic_write(path) as out:
+        shutil.copyfileobj(f, out)
+
+    return path
+
+
+def parse_git_member(member=None):
+    """
+    Returns:
+        tuple: The component type and name of a git bundle in the archive, or
+            None if the member is not one.
+    """
+    parts = member.name.split("/")
+    if len(parts) != 3 or parts[0] != BUNDLE_GIT_DIRNAME \
+            or not parts[2].endswith(BUNDLE_GIT_EXT):
+        return None
+
+    type = str_to_component_type(parts[1])
+    name = parts[2][:-len(BUNDLE_GIT_EXT)]
+    if type is None or name in ("", ".", ".."):
+        return None
+
+    return type, name
+
+
+def read_bundle(ctx, fileobj=None):
+    """
+    Restore a stream written by write_bundle() in a single pass, without
+    holding any of its sources in memory.  Git bundles are restored into
+    bare mirrors and archives into the cache directory, and the manifests
+    are rewritten to retrieve components from these local copies.
+
+    Args:
+        ctx (Context):  The click context.
+        fileobj (file):  The binary file to read the stream from.
+
+    Returns:
+        list: The rewritten manifests.
+
+    Raises:
+        KraftError: If the stream does not start with an index.
+    """
+    manifests = None
+    mirrors = dict()
+    archives = dict()
+
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+
+            if manifests is None:
+                if member.name != BUNDLE_INDEX:
+                    raise KraftError("Not a kraft cache bundle")
+
+                manifests = manifests_from_index(load_index(
+                    tar.extractfile(member).read()
+                ))
+                continue
+
+            component = parse_git_member(member)
+            if component is not None:
+                type, name = component
+                mirrors[(type.shortname, name)] = restore_git_bundle(
+                    ctx, tar.extractfile(member), type, name
+                )
+                logger.info("Restored %s/%s" % (type.shortname, name))
+                continue
+
+            parts = member.name.split("/")
+            if len(parts) == 2 and parts[0] == BUNDLE_ARCHIVES_DIRNAME \
+                    and parts[1] not in ("", ".", ".."):
+                archives[parts[1]] = restore_archive(
+                    ctx, tar.extractfile(member), parts[1]
+                )
+                continue
+
+            logger.warning("Ignoring unknown bundle member: %s" % member.name)
+
+    if manifests is None:
+        raise KraftError("Not a kraft cache bundle")
+
+    for manifest in manifests:
+        for _, item in manifest.items():
+            bundle_rewrite_item(item, mirrors, archives)
+
+    return manifests
+
+
+def bundle_rewrite_item(item=None, mirrors=None, archives=None):
+    """
+    Point the item at the local copies of its sources.
+    """
+    mirror = mirrors.get((item.type.shortname, item.name), None)
+    if mirror is not None:
+        item._git = mirror
+
+    for _, dist in item.dists.items():
+        for version in list(dist.versions.values()) + [dist.latest]:
+            if version is None or version.tarball is None:
+                continue
+
+            path = archives.get(tarball_filename(
+                item.name, version.version, version.tarball
+            ), None)
+            if path is not None:
+                version._tarball = "file://%s" % path
@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+
+import click
+
+from .bundle import write_bundle
+from kraft.logger import logger
+from kraft.util import atomic_write
+
+
+@click.pass_context
+def kraft_cache_export(ctx, output=None, names=None, sources=True):
+    """
+    Export the cached manifests and the sources of pulled components into a
+    single compressed archive.
+
+    Args:
+        output (str):  The path to write the archive to, or None for stdout.
+        names (list):  The components whose sources to include.  Defaults to
+            all components which have been pulled.
+        sources (bool):  Whether to include sources at all.
+    """
+    manifests = list()
+    for origin in ctx.obj.cache.all():
+        manifest = ctx.obj.cache.get(origin)
+        if manifest is not None and len(manifest.items()) > 0:
+            manifests.append(manifest)
+
+    if output is None:
+        checkouts, archives = write_bundle(
+            ctx, sys.stdout.buffer, manifests, names, sources
+        )
+    else:
+        with atomic_write(output) as f:
+            checkouts, archives = write_bundle(
+                ctx, f, manifests, names, sources
+            )
+
+    logger.info("Exported %d origins, %d checkouts and %d archives" % (
+        len(manifests), checkouts, archives
+    ))
+
+
+@click.command('export', short_help='Export the cache for offline use.')
+@click.option(
+    '--output', '-o', 'output',
+    help='Path to write the archive to.  Defaults to stdout.',
+    type=click.Path(dir_okay=False),
+    default=None
+)
+@click.option(
+    '--sources/--no-sources', 'sources',
+    help='Include the sources of pulled components.',
+    default=True
+)
+@click.argument('name', nargs=-1)
+@click.pass_context
+def cmd_cache_export(ctx, output=None, sources=True, name=None):
+    """
+    Export all known components, along with the sources of the named, or
+    otherwise all pulled, components into a single .tar.gz archive.  Each
+    checkout is included as a git bundle and each downloaded tarball as is.
+
+        $ kraft cache export -o kraft-cache.tar.gz lib/newlib app/helloworld
+
+    The archive can then be restored on a host without network access with
+    kraft cache import.
+    """
+
+    try:
+        kraft_cache_export(
+            output=output,
+            names=list(name),
+            sources=sources
+        )
+
+    except Exception as e:
+        logger.critical(str(e))
+
+        if ctx.obj.verbose:
+            import traceback
+            logger.critical(traceback.format_exc())
+
+        sys.exit(1)
@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+
+import click
+
+from .bundle import read_bundle
+from kraft.logger import logger
+
+
+@click.pass_context
+def kraft_cache_import(ctx, input=None):
+    """
+    Restore an archive written by kraft cache export.  The manifests it
+    contains are saved as freshly refreshed, such that no update is
+    attempted, and point at the sources restored from it.
+
+    Args:
+        input (str):  The path of the archive, or None for stdin.
+    """
+    if input is None:
+        manifests = read_bundle(ctx, sys.stdin.buffer)
+    else:
+        with open(input, "rb") as f:
+            manifests = read_bundle(ctx, f)
+
+    for manifest in manifests:
+        ctx.obj.cache.save(manifest.manifest, manifest)
+
+    logger.info("Imported %d origins" % len(manifests))
+
+
+@click.command('import', short_help='Import a cache exported elsewhere.')
+@click.argument('input', required=False, type=click.Path(dir_okay=False))
+@click.pass_context
+def cmd_cache_import(ctx, input=None):
+    """
+    Import an archive written by kraft cache export, read from the provided
+    path or otherwise stdin.  Components are subsequently pulled from the
+    sources restored from the archive:
+
+        $ kraft cache import kraft-cache.tar.gz
+
+        $ kraft list pull lib/newlib
+    """
+
+    try:
+        kraft_cache_import(input=input)
+
+    except Exception as e:
+        logger.critical(str(e))
+
+        if ctx.obj.verbose:
+            import traceback
+            logger.critical(traceback.format_exc())
+
+        sys.exit(1)
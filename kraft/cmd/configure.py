@@ -39,8 +39,10 @@ import click
 import inquirer
 
 from kraft.app import Application
+from kraft.app import workdir_lockfile
 from kraft.cmd.list import kraft_list_preflight
 from kraft.cmd.list.pull import kraft_list_pull
+from kraft.cmd.list.pull import kraft_lock_application
 from kraft.const import KCONFIG
 from kraft.const import KCONFIG_EQ
 from kraft.const import KCONFIG_N
@@ -212,8 +214,14 @@ def kraft_configure(ctx, env=None, workdir=None, target=None, plat=None,
     app = Application.from_workdir(
         workdir=workdir,
         force_init=force_configure,
-        use_versions=use_versions,
+        use_versions=use_versions
     )
+
+    # Pin the components unless other versions were explicitly requested
+    if len(use_versions) == 0 and not force_configure \
+            and workdir_lockfile(workdir) is None:
+        kraft_lock_application(app, workdir)
+
     if show_menuconfig:
         if sys.stdout.isatty():
             app.open_menuconfig()
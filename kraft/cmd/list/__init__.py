@@ -34,6 +34,7 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 from .add import cmd_list_add
+from .export import cmd_list_export_index
 from .list import cmd_list
 from .list import kraft_list_preflight
 from .pull import cmd_list_pull
@@ -54,3 +55,4 @@ cmd_list.add_command(cmd_list_remove)
 cmd_list.add_command(cmd_list_pull)
 cmd_list.add_command(cmd_list_update)
 cmd_list.add_command(cmd_list_show)
+cmd_list.add_command(cmd_list_export_index)
@@ -0,0 +1,132 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import sys
+import time
+
+import click
+
+from .provider.index import dump_index
+from .provider.index import index_from_manifests
+from kraft.logger import logger
+from kraft.util import atomic_write
+
+
+@click.pass_context
+def kraft_list_export_index(ctx, output=None, origins=list(), compress=None):
+    """
+    Write the manifests of the cached origins into a single index file which
+    can itself be used as an origin.
+
+    Args:
+        output (str):  The path to write the index to, or None for stdout.
+        origins (list):  The origins to include.  Defaults to all cached
+            origins.
+        compress (bool):  Whether to gzip-compress the index.  Defaults to
+            whether the output path ends with ".gz".
+    """
+    if origins is None or len(origins) == 0:
+        origins = ctx.obj.cache.all()
+
+    if compress is None:
+        compress = output is not None and output.endswith(".gz")
+
+    manifests = list()
+    generated = list()
+    for origin in origins:
+        manifest = ctx.obj.cache.get(origin)
+
+        # Indexes are saved with no items of their own
+        if manifest is None or len(manifest.items()) == 0:
+            logger.debug("Skipping empty origin: %s" % origin)
+            continue
+
+        manifests.append(manifest)
+
+        refreshed = ctx.obj.cache.last_refreshed(origin)
+        if refreshed is not None:
+            generated.append(refreshed.timestamp())
+
+    # The index is only as recent as the least recently refreshed origin
+    index = index_from_manifests(
+        manifests,
+        generated=min(generated) if len(generated) > 0 else time.time()
+    )
+
+    if output is None:
+        dump_index(index, sys.stdout.buffer, compress=compress)
+    else:
+        with atomic_write(output) as f:
+            dump_index(index, f, compress=compress)
+
+        logger.info("Exported %d origins to %s" % (len(manifests), output))
+
+
+@click.command('export-index', short_help='Export the cache as an index.')
+@click.option(
+    '--output', '-o', 'output',
+    help='Path to write the index to.  Defaults to stdout.',
+    type=click.Path(dir_okay=False),
+    default=None
+)
+@click.option(
+    '--gzip/--no-gzip', 'compress',
+    help='Compress the index.  Defaults to whether the output ends with .gz.',
+    default=None
+)
+@click.argument('origin', nargs=-1)
+@click.pass_context
+def cmd_list_export_index(ctx, output=None, compress=None, origin=None):
+    """
+    Export the components of the cached origins, or only the provided
+    origins, into a single JSON index file.  The file can be served over
+    HTTP or shared on disk and then added as an origin itself, such that
+    kraft list update reads it instead of probing every repository.
+    """
+
+    try:
+        kraft_list_export_index(
+            output=output,
+            origins=list(origin),
+            compress=compress
+        )
+
+    except Exception as e:
+        logger.critical(str(e))
+
+        if ctx.obj.verbose:
+            import traceback
+            logger.critical(traceback.format_exc())
+
+        sys.exit(1)
@@ -39,7 +39,11 @@ import sys
 import click
 
 from .update import kraft_update
+from .update import kraft_update_background
+from .update import kraft_update_origins
 from kraft.app import Application
+from kraft.const import KRAFTRC_LIST_ORIGINS
+from kraft.const import LIST_REFRESH_RETRY
 from kraft.const import UNIKRAFT_RELEASE_STABLE
 from kraft.const import UNIKRAFT_RELEASE_STAGING
 from kraft.error import KraftError
@@ -264,7 +268,8 @@ def cmd_list(ctx, show_installed=False, show_core=False, show_plats=False,
                 click.echo(output[:-1])
 
 
-# Pre-flight check determines if we are trying to work with nothing
+# Pre-flight check determines if we are trying to work with nothing or with
+# manifests which are out-of-date
 @click.pass_context
 def kraft_list_preflight(ctx):
     if ctx.obj.cache.is_stale():
@@ -272,3 +277,38 @@ def kraft_list_preflight(ctx):
             'kraft caches are out-of-date. Would you like to update?',
                 default=True):
             kraft_update()
+
+        return
+
+    origins = ctx.obj.settings.get(KRAFTRC_LIST_ORIGINS)
+    if origins is None or len(origins) == 0:
+        return
+
+    # Manifests which are too old to be trusted must be refreshed first
+    expired = ctx.obj.cache.stale_origins(
+        origins=origins,
+        ttl=ctx.obj.settings.list_max_age
+    )
+
+    if len(expired) > 0:
+        logger.info("Refreshing out-of-date origins...")
+
+        # Hosts without network access can still use the cached manifests
+        try:
+            kraft_update_origins(expired)
+
+        except Exception as e:
+            logger.warning(
+                "Could not refresh out-of-date origins, using the cached "
+                "manifests instead: %s" % e
+            )
+
+    # Otherwise, continue with what we have whilst refreshing stale origins
+    stale = ctx.obj.cache.stale_origins(
+        origins=[origin for origin in origins if origin not in expired],
+        ttl=ctx.obj.settings.list_ttl,
+        retry=LIST_REFRESH_RETRY
+    )
+
+    if len(stale) > 0:
+        kraft_update_background(stale)
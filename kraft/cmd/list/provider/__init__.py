@@ -37,4 +37,5 @@ from enum import Enum
 
 from .git import GitListProvider
 from .github import GitHubListProvider
+from .index import IndexListProvider
 from .provider import ListProvider
@@ -33,10 +33,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import asyncio
+import hashlib
 import os
 import sys
 import uuid
-from datetime import datetime
 from queue import Queue
 from urllib.parse import urlparse
 
@@ -47,18 +48,41 @@ from git import InvalidGitRepositoryError
 from git import NoSuchPathError
 from git import RemoteProgress
 from git import Repo as GitRepo
-from git.cmd import Git
 
 from .provider import ListProvider
+from .provider import origin_host
+from .provider import unchanged_item
+from kraft.cache import add_alternate
+from kraft.cache import git_mirrors
+from kraft.cache import remote_cache
+from kraft.const import DOWNLOAD_FAILED
+from kraft.const import DOWNLOAD_FETCHED
+from kraft.const import DOWNLOAD_HIT
+from kraft.const import GIT_FETCH_FULL
+from kraft.const import GIT_FETCH_PARTIAL
+from kraft.const import GIT_FETCH_SHALLOW
+from kraft.const import GIT_SHA_PATTERN
 from kraft.const import GIT_UNIKRAFT_TAG_PATTERN
 from kraft.const import GIT_UNIKRAFT_TAG_RELEASE
 from kraft.const import UNIKRAFT_RELEASE_STABLE
 from kraft.const import UNIKRAFT_RELEASE_STABLE_VARIATIONS
-from kraft.const import UNIKRAFT_RELEASE_STAGING
 from kraft.logger import logger
 from kraft.types import break_component_naming_format
 from kraft.util import ErrorPropagatingThread
 
+# The commit and commit time of each ref, peeled for annotated tags
+GIT_FOR_EACH_REF_FORMAT = "%00".join([
+    "%(refname)",
+    "%(objectname)",
+    "%(*objectname)",
+    "%(committerdate:raw)",
+    "%(*committerdate:raw)",
+    "%(symref)",
+])
+
+GIT_FETCH_HEADS_REFSPEC = "+refs/heads/*:refs/remotes/origin/*"
+GIT_FETCH_TAG_REFSPEC = "+refs/tags/%s:refs/tags/%s"
+
 
 class GitProgressBar(RemoteProgress):
     def __init__(self, max_lines=10, label=None):
@@ -85,17 +109,16 @@ class GitListProvider(ListProvider):
         if origin is None:
             return False
 
-        g = Git()
-
         try:
-            g.ls_remote(origin)
+            remote_cache().ls_remote(origin)
         except GitCommandError:
             return False
 
         return True
 
     @click.pass_context
-    def probe(ctx, self, origin=None, items=None, return_threads=False):
+    def probe(ctx, self, origin=None, items=None, return_threads=False,
+              pool=None):
         # TODO: There should be a work around to fix this import loop cycle
         from kraft.manifest import Manifest
 
@@ -113,24 +136,47 @@ class GitListProvider(ListProvider):
                 manifest=origin
             )
 
-        if return_threads:
+        if return_threads and pool is not None:
+            threads.append(pool.submit_to(
+                origin_host(origin),
+                lambda *arg: items.put(get_component_from_git_repo(*arg)),
+                ctx,
+                origin,
+                manifest
+            ))
+        elif return_threads:
             thread = ErrorPropagatingThread(
                 target=lambda *arg: items.put(get_component_from_git_repo(*arg)),
                 args=(
                     ctx,
-                    origin
+                    origin,
+                    manifest
                 )
             )
             threads.append(thread)
             thread.start()
         else:
-            items.put(get_component_from_git_repo(ctx, origin))
+            items.put(get_component_from_git_repo(ctx, origin, manifest))
 
         return items, threads
 
+    @classmethod
+    async def is_type_async(cls, origin=None, pool=None):
+        if origin is None:
+            return False
+
+        refs = await git_ls_remote_async(origin, pool)
+
+        return refs is not None
+
+    async def probe_async(self, ctx, origin=None, manifest=None, pool=None):
+        return [asyncio.ensure_future(get_component_from_git_repo_async(
+            ctx, origin, manifest, pool
+        ))]
+
     @classmethod
     def download(cls, manifest=None, localdir=None, version=None,
-            override_existing=False, **kwargs):
+            override_existing=False, fetch_mode=GIT_FETCH_FULL, **kwargs):
 
         try:
             repo = GitRepo(localdir)
@@ -144,15 +190,54 @@ class GitListProvider(ListProvider):
             except GitCommandError as e:
                 pass
 
+        # Only go to the network if the commit is not here already, or a
+        # full fetch is asked of a shallow checkout
+        if version.git_sha is not None and not override_existing \
+                and git_has_commit(repo, version.git_sha) \
+                and (fetch_mode != GIT_FETCH_FULL or not git_is_shallow(repo)):
+            repo.git.checkout(version.git_sha)
+            return DOWNLOAD_HIT
+
+        result = DOWNLOAD_FETCHED
+
+        if fetch_mode in [GIT_FETCH_SHALLOW, GIT_FETCH_PARTIAL]:
+            try:
+                git_fetch_commit(repo, version.git_sha, fetch_mode)
+            except GitCommandError as e:
+                logger.error("Could not fetch %s: %s" % (manifest.git, str(e)))
+                result = DOWNLOAD_FAILED
+
+            if version.git_sha is not None:
+                repo.git.checkout(version.git_sha)
+
+            return result
+
+        # Borrow the objects of the remote's mirror, such that the checkout
+        # only has to fetch the refs from it
+        mirror = git_mirrors().update(manifest.git)
+
+        # A checkout which was fetched shallowly before gets its full history
+        deepen = dict()
+        if git_is_shallow(repo):
+            deepen["unshallow"] = True
+
         try:
-            if sys.stdout.isatty():
+            if mirror is not None:
+                add_alternate(repo.git_dir, mirror)
+                repo.git.fetch(
+                    "--quiet", "--tags", mirror, GIT_FETCH_HEADS_REFSPEC,
+                    **deepen
+                )
+
+            elif sys.stdout.isatty():
                 repo.remotes.origin.fetch(
                     progress=GitProgressBar(
                         label="%s@%s" % (str(manifest), version.version)
-                    )
+                    ),
+                    **deepen
                 )
             else:
-                for fetch_info in repo.remotes.origin.fetch():
+                for fetch_info in repo.remotes.origin.fetch(**deepen):
                     logger.debug("Updated %s %s to %s" % (
                         manifest.git,
                         fetch_info.ref,
@@ -162,21 +247,159 @@ class GitListProvider(ListProvider):
             # self.last_checked = datetime.now()
         except (GitCommandError, AttributeError) as e:
             logger.error("Could not fetch %s: %s" % (manifest.git, str(e)))
+            result = DOWNLOAD_FAILED
 
         if version.git_sha is not None:
             repo.git.checkout(version.git_sha)
 
+        return result
 
-def get_component_from_git_repo(ctx, origin=None):
-    if origin is None:
-        raise ValueError("expected origin")
 
-    # TODO: There should be a work around to fix this import loop cycle
-    from kraft.manifest import ManifestItem
-    from kraft.manifest import ManifestItemVersion
-    from kraft.manifest import ManifestItemDistribution
-    from .types import ListProviderType
+def git_is_shallow(repo=None):
+    return os.path.exists(os.path.join(repo.git_dir, "shallow"))
+
+
+def git_has_commit(repo=None, sha=None):
+    try:
+        repo.git.cat_file("-e", "%s^{commit}" % sha)
+        return True
+    except GitCommandError:
+        return False
+
+
+def git_fetch_commit(repo=None, sha=None, fetch_mode=GIT_FETCH_SHALLOW):
+    """
+    Fetch no more from the origin of a repository than is needed to check
+    out a commit: in shallow mode only the commit itself and in partial mode
+    its history without any blobs, which are fetched once they are checked
+    out.
+
+    Args:
+        repo (git.Repo):  The repository to fetch into.
+        sha (str):  The commit to check out, either its SHA or the name of a
+            tag which points at it.
+        fetch_mode (str):  Either GIT_FETCH_SHALLOW or GIT_FETCH_PARTIAL.
+    """
+    if fetch_mode == GIT_FETCH_SHALLOW:
+        args = ["--depth", "1"]
+    else:
+        args = ["--filter=blob:none"]
+
+    if sha is not None:
+        # Fetching a tag by its name would only update FETCH_HEAD, whereas it
+        # is checked out by its name
+        refspec = sha
+        if GIT_SHA_PATTERN.match(sha) is None:
+            refspec = GIT_FETCH_TAG_REFSPEC % (sha, sha)
+
+        try:
+            repo.git.fetch("--quiet", *args, "origin", refspec)
+            return
+
+        except GitCommandError as e:
+            logger.debug("Could not fetch %s by itself: %s" % (sha, e))
+
+    # Not every remote allows fetching a commit which no ref points at, so
+    # fall back to the tips of its refs and deepen the history until the
+    # commit is part of it
+    repo.git.fetch("--quiet", "--tags", *args, "origin", GIT_FETCH_HEADS_REFSPEC)
+
+    if sha is not None and not git_has_commit(repo, sha) \
+            and git_is_shallow(repo):
+        repo.git.fetch(
+            "--quiet", "--tags", "--unshallow", "origin", GIT_FETCH_HEADS_REFSPEC
+        )
+
+
+def git_refs_fingerprint(refs=None):
+    """
+    Digest the refs advertised by a remote, as listed by `git ls-remote`,
+    which changes whenever any of them is updated.
+    """
+    refs = sorted(line.strip() for line in refs.splitlines() if line.strip())
+
+    return hashlib.sha1("\n".join(refs).encode("utf-8")).hexdigest()
+
+
+def git_fingerprint(origin=None):
+    """
+    Digest the refs advertised by the remote without having to fetch the
+    repository.
+    """
+    return git_refs_fingerprint(remote_cache().ls_remote(origin))
+
+
+async def git_ls_remote_async(origin=None, pool=None):
+    """
+    List the refs of the remote with an asynchronous subprocess, unless they
+    were listed only recently.
+
+    Returns:
+        str: The output of `git ls-remote` or None if it failed.
+    """
+    refs = remote_cache().refs(origin)
+    if refs is not None:
+        return refs
+
+    returncode, refs = await pool.run_process(
+        origin_host(origin), "git", "ls-remote", origin
+    )
+    if returncode != 0:
+        return None
+
+    remote_cache().set_refs(origin, refs)
+    return refs
+
 
+def git_refs(repo=None):
+    """
+    Read the commit and commit time of every tag and branch of a repository
+    using a single `git for-each-ref` rather than looking up each commit.
+
+    Args:
+        repo (git.Repo):  The repository.
+
+    Returns:
+        list: Tuples of each ref's full name, commit SHA and commit time, in
+            seconds since the epoch, in the order of their names.  Symbolic refs and tags which do not
+            point at a commit are omitted.
+    """
+    refs = list()
+
+    output = repo.git.for_each_ref(
+        "--format=%s" % GIT_FOR_EACH_REF_FORMAT,
+        "refs/heads",
+        "refs/remotes",
+        "refs/tags"
+    )
+
+    for line in output.splitlines():
+        name, sha, peeled_sha, date, peeled_date, symref = line.split("\0")
+        if len(symref) > 0:
+            continue
+
+        if len(peeled_sha) > 0:
+            sha, date = peeled_sha, peeled_date
+
+        if len(date) == 0:
+            continue
+
+        refs.append((
+            name,
+            sha,
+            int(date.split()[0])
+        ))
+
+    return refs
+
+
+def git_repo_naming(origin=None):
+    """
+    Determine the type and name of the component of a git repository.
+
+    Returns:
+        tuple: The ComponentType and name of the component.
+    """
     # This is a best-effort guess at the type and name of the git repository
     # using the path to determine if it's namespaced.
     uri = urlparse(origin)
@@ -195,6 +418,73 @@ def get_component_from_git_repo(ctx, origin=None):
             ]) % origin
         )
 
+    return _type, _name
+
+
+async def get_component_from_git_repo_async(ctx, origin=None, manifest=None,
+                                            pool=None):
+    """
+    Fingerprint the remote with an asynchronous `git ls-remote` and only
+    read the repository, which blocks, if it has changed.
+    """
+    if origin is None:
+        raise ValueError("expected origin")
+
+    _type, _name = git_repo_naming(origin)
+
+    refs = await git_ls_remote_async(origin, pool)
+    if refs is None:
+        raise ValueError("Could not list the refs of %s" % origin)
+
+    fingerprint = git_refs_fingerprint(refs)
+
+    item = unchanged_item(
+        manifest=manifest,
+        type=_type,
+        name=_name,
+        fingerprint=fingerprint
+    )
+    if item is not None:
+        logger.debug("Unchanged since last probe: %s" % origin)
+        return item
+
+    return await pool.run(
+        origin_host(origin),
+        get_component_from_git_repo,
+        ctx,
+        origin,
+        manifest,
+        fingerprint
+    )
+
+
+def get_component_from_git_repo(ctx, origin=None, manifest=None,
+                                fingerprint=None):
+    if origin is None:
+        raise ValueError("expected origin")
+
+    # TODO: There should be a work around to fix this import loop cycle
+    from kraft.manifest import ManifestItem
+    from kraft.manifest import ManifestItemVersion
+    from kraft.manifest import ManifestItemDistribution
+    from .types import ListProviderType
+
+    _type, _name = git_repo_naming(origin)
+
+    if fingerprint is None:
+        fingerprint = git_fingerprint(origin)
+
+    # Re-use the cached item if none of the remote's refs have changed since
+    item = unchanged_item(
+        manifest=manifest,
+        type=_type,
+        name=_name,
+        fingerprint=fingerprint
+    )
+    if item is not None:
+        logger.debug("Unchanged since last probe: %s" % origin)
+        return item
+
     localdir = None
     if os.path.exists(origin):
         localdir = origin
@@ -207,66 +497,70 @@ def get_component_from_git_repo(ctx, origin=None):
         dist=UNIKRAFT_RELEASE_STABLE,
         git=origin,
         manifest=origin,
-        localdir=localdir
+        localdir=localdir,
+        fingerprint=fingerprint
     )
 
     stable = ManifestItemDistribution(
         name=UNIKRAFT_RELEASE_STABLE
     )
 
-    staging = ManifestItemDistribution(
-        name=UNIKRAFT_RELEASE_STAGING
-    )
+    refs = git_refs(repo)
+    commits = {name: (sha, timestamp) for name, sha, timestamp in refs}
 
-    for version in repo.tags:
-        commit = repo.commit(version)
+    for name, sha, timestamp in refs:
+        if not name.startswith("refs/tags/"):
+            continue
+
+        version = name[len("refs/tags/"):]
 
         # interpret the tag name for symbolic distributions
-        ref = GIT_UNIKRAFT_TAG_PATTERN.match(str(version))
+        ref = GIT_UNIKRAFT_TAG_PATTERN.match(version)
         if ref is not None:
             version = ref.group(1)
 
         stable.add_version(ManifestItemVersion(
-            git_sha=str(commit),
+            git_sha=sha,
             version=version,
-            timestamp=datetime.fromtimestamp(int(commit.committed_date))
+            timestamp=timestamp
         ))
 
     # Only create the stable distribution if versions exist within
     if len(stable.versions) > 0:
         item.add_distribution(stable)
 
-    for ref in repo.git.branch('-a').split('\n'):
-        # skip fast forwards
-        if "->" in ref or "detached" in ref:
+    for name, sha, timestamp in refs:
+        if name.startswith("refs/heads/"):
+            branch = name[len("refs/heads/"):]
+        elif name.startswith("refs/remotes/"):
+            branch = name[len("refs/remotes/"):]
+        else:
             continue
 
-        branch = ref.strip().replace("*", "")
-        branch = branch.strip().replace("remotes/", "")
-        branch = branch.strip().replace("origin/", "")
+        branch = branch.replace("origin/", "")
         if branch in UNIKRAFT_RELEASE_STABLE_VARIATIONS:
             continue # we've done this one seperately
 
-        # Add this commit to the staging branch (this usually happens when
-        # commits have been applied on top of a HEAD)
-        if ref.strip() == "":
-            dist = staging
+        # Resolve the branch name like `git rev-parse` would, such that a
+        # local branch takes precedence over the remote one it tracks
+        for prefix in ("refs/tags/", "refs/heads/", "refs/remotes/"):
+            if prefix + branch in commits:
+                sha, timestamp = commits[prefix + branch]
+                break
 
         # Add the branch as a distribution
-        else:
-            dist = ManifestItemDistribution(
-                name=branch,
-            )
+        dist = ManifestItemDistribution(
+            name=branch,
+        )
 
         if branch in item.dists.keys():
             dist = item.dists[branch]
 
         # Add the latest commit to that branch as the only version
-        commit = repo.commit(branch)
         dist.add_version(ManifestItemVersion(
-            git_sha=str(commit),
-            version=str(commit)[:7],
-            timestamp=datetime.fromtimestamp(int(commit.committed_date))
+            git_sha=sha,
+            version=sha[:7],
+            timestamp=timestamp
         ))
 
         item.add_distribution(dist)
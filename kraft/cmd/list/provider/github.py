@@ -33,26 +33,123 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import asyncio
 import fnmatch
 import os
 import re
 import threading
+from datetime import timezone
 from queue import Queue
 from urllib.parse import urlparse
 
 import click
+import dateutil.parser
+import requests
 from github import Github
+from github.GithubException import RateLimitExceededException
 from github.Repository import Repository
+from github.Requester import HTTPRequestsConnectionClass
+from github.Requester import HTTPSRequestsConnectionClass
+from github.Requester import Requester
 
 from .git import GitListProvider
+from .provider import unchanged_item
+from .ratelimit import RateLimitScheduler
 from .tarball import TarballListProvider
 from kraft.const import GIT_UNIKRAFT_TAG_PATTERN
+from kraft.const import GITHUB_API_GRAPHQL
+from kraft.const import GITHUB_API_REST
+from kraft.const import GITHUB_GRAPHQL
 from kraft.const import GITHUB_ORIGIN
 from kraft.const import GITHUB_TARBALL
+from kraft.const import LIST_GITHUB_RESERVE
 from kraft.const import UNIKRAFT_RELEASE_STABLE
 from kraft.logger import logger
 from kraft.types import break_component_naming_format
 from kraft.util import ErrorPropagatingThread
+from kraft.util import WorkerPool
+
+try:
+    from github import Auth
+except ImportError:  # pragma: no cover
+    Auth = None
+
+
+GITHUB_GRAPHQL_REPOSITORY_FIELDS = """
+fragment RepositoryFields on Repository {
+  name
+  description
+  pushedAt
+  url
+  sshUrl
+  owner { login }
+  branches: refs(refPrefix: "refs/heads/", first: 100) {
+    pageInfo { hasNextPage endCursor }
+    nodes { name target { oid } }
+  }
+  tags: refs(refPrefix: "refs/tags/", first: 100) {
+    pageInfo { hasNextPage endCursor }
+    nodes { name }
+  }
+  releases(first: 100) {
+    pageInfo { hasNextPage endCursor }
+    nodes { tagName isDraft publishedAt }
+  }
+}
+"""
+
+GITHUB_GRAPHQL_QUERY_ORGANIZATION = GITHUB_GRAPHQL_REPOSITORY_FIELDS + """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    repositories(first: 50, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { ...RepositoryFields }
+    }
+  }
+}
+"""
+
+GITHUB_GRAPHQL_QUERY_REPOSITORY = GITHUB_GRAPHQL_REPOSITORY_FIELDS + """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) { ...RepositoryFields }
+}
+"""
+
+# Further pages of a repository's connections beyond the first 100 nodes
+GITHUB_GRAPHQL_QUERY_CONNECTION = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    connection: %s
+  }
+}
+"""
+
+GITHUB_GRAPHQL_CONNECTIONS = {
+    "branches": """refs(refPrefix: "refs/heads/", first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name target { oid } }
+    }""",
+    "tags": """refs(refPrefix: "refs/tags/", first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name }
+    }""",
+    "releases": """releases(first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { tagName isDraft publishedAt }
+    }""",
+}
+
+# Schedulers are shared by all requests of this process which are made with
+# the same token against the same API, as they draw from the same budget
+GITHUB_SCHEDULERS = dict()
+GITHUB_SCHEDULERS_LOCK = threading.Lock()
+
+# Serialises the creation of clients, whose connection class is injected
+GITHUB_CLIENT_LOCK = threading.Lock()
+
+# Each thread uses clients of its own, as a client sends all of its requests
+# over a single connection which cannot be shared by concurrent requests
+GITHUB_CLIENTS = threading.local()
 
 
 class GitHubListProvider(GitListProvider):
@@ -74,7 +171,29 @@ class GitHubListProvider(GitListProvider):
         return False
 
     @click.pass_context
-    def probe(ctx, self, origin=None, items=None, return_threads=False):
+    def use_graphql(ctx, self, github_token=None):
+        """
+        Determine whether to probe GitHub via its GraphQL API, which retrieves
+        many repositories per request but can only be used with a token.
+        """
+        github_api = ctx.obj.settings.list_github_api
+
+        if github_api == GITHUB_API_REST:
+            return False
+
+        if github_token is None:
+            if github_api == GITHUB_API_GRAPHQL:
+                logger.warn(
+                    "GitHub's GraphQL API requires UK_KRAFT_GITHUB_TOKEN, "
+                    "falling back to the REST API"
+                )
+            return False
+
+        return True
+
+    @click.pass_context
+    def probe(ctx, self, origin=None, items=None, return_threads=False,
+              pool=None):
         # TODO: There should be a work around to fix this import loop cycle
         from kraft.manifest import Manifest
 
@@ -96,7 +215,7 @@ class GitHubListProvider(GitListProvider):
 
         # Is the origin from GitHub?
         if uri.netloc == GITHUB_ORIGIN:
-            github_api = Github(ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None))
+            github_token = ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None)
             github_org = uri.path.split('/')[1]
             github_repo = uri.path.split('/')[2]
 
@@ -104,6 +223,35 @@ class GitHubListProvider(GitListProvider):
                 logger.warn("Cannot use wildcard in GitHub organisation names!")
                 return
 
+            if self.use_graphql(github_token):
+                logger.info("Populating via GraphQL: %s" % origin)
+
+                def probe_graphql(*args):
+                    for item in get_components_from_github_graphql(*args):
+                        items.put(item)
+
+                args = (
+                    ctx, origin, github_org, github_repo, github_token, manifest
+                )
+
+                if return_threads and pool is not None:
+                    threads.append(
+                        pool.submit_to(GITHUB_ORIGIN, probe_graphql, *args)
+                    )
+                elif return_threads:
+                    thread = ErrorPropagatingThread(
+                        target=probe_graphql,
+                        args=args
+                    )
+                    threads.append(thread)
+                    thread.start()
+                else:
+                    probe_graphql(*args)
+
+                return items, threads
+
+            github_api = github_thread_client(ctx, github_token)
+
             # Does the origin contain a wildcard in the repo name?
             if "*" in github_repo:
                 logger.info("Populating via wildcard: %s" % origin)
@@ -111,208 +259,772 @@ class GitHubListProvider(GitListProvider):
                 org = github_api.get_organization(github_org)
                 repos = org.get_repos()
 
+            else:
+                logger.info("Using direct repository: %s" % origin)
+
+                repos = [github_repo]
+
+            # A pool of our own is shut down once its tasks have completed
+            own_pool = None
+            if return_threads and pool is None:
+                pool = own_pool = WorkerPool(
+                    max_workers=ctx.obj.settings.list_concurrency,
+                    max_per_host=ctx.obj.settings.list_concurrency_per_host,
+                    fatal=(RateLimitExceededException,)
+                )
+
+            try:
                 for repo in repos:
                     if return_threads:
-                        thread = ErrorPropagatingThread(
-                            target=lambda *arg: items.put(get_component_from_github(*arg)),
-                            args=(
-                                ctx,
-                                origin,
-                                github_org,
-                                repo.name,
+                        # Repositories of the listing make their requests
+                        # through this thread's client, so the workers are
+                        # only passed the names of those which have changed
+                        if isinstance(repo, Repository):
+                            probe, item = github_cached_component(
+                                origin, repo.name, repo.pushed_at, manifest
                             )
-                        )
-                        threads.append(thread)
-                        thread.start()
-                    else:
-                        items.put(get_component_from_github(
+                            if not probe:
+                                if item is not None:
+                                    items.put(item)
+                                continue
+
+                            repo = repo.name
+
+                        threads.append(pool.submit_to(
+                            GITHUB_ORIGIN,
+                            lambda *arg: items.put(get_component_from_github(*arg)),
                             ctx,
                             origin,
                             github_org,
-                            repo.name
+                            repo,
+                            None,
+                            manifest
                         ))
-            else:
-                logger.info("Using direct repository: %s" % origin)
 
-                if return_threads:
-                    thread = ErrorPropagatingThread(
-                        target=lambda *arg: items.put(get_component_from_github(*arg)),
-                        args=(
+                        # Stop listing once the pool has been cancelled
+                        if pool.fatal is not None:
+                            break
+
+                    else:
+                        items.put(get_component_from_github(
                             ctx,
                             origin,
                             github_org,
-                            github_repo,
-                        )
-                    )
-                    threads.append(thread)
-                    thread.start()
-                else:
-                    items.put(get_component_from_github(
-                        ctx,
-                        origin,
-                        github_org,
-                        github_repo
-                    ))
+                            repo,
+                            github_api,
+                            manifest
+                        ))
+
+            except BaseException:
+                if own_pool is not None:
+                    own_pool.cancel()
+                raise
+
+            finally:
+                if own_pool is not None:
+                    own_pool.shutdown()
 
         return items, threads
 
+    @classmethod
+    async def is_type_async(cls, origin=None, pool=None):
+        return cls.is_type(origin)
+
+    async def probe_async(self, ctx, origin=None, manifest=None, pool=None):
+        uri = urlparse(origin)
+        github_token = ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None)
+        github_org = uri.path.split('/')[1]
+        github_repo = uri.path.split('/')[2]
+
+        with ctx:
+            use_graphql = self.use_graphql(github_token)
+
+        if use_graphql:
+            logger.info("Populating via GraphQL: %s" % origin)
+
+            return [asyncio.ensure_future(pool.run(
+                GITHUB_ORIGIN,
+                get_components_from_github_graphql,
+                ctx,
+                origin,
+                github_org,
+                github_repo,
+                github_token,
+                manifest
+            ))]
+
+        if "*" in github_repo:
+            logger.info("Populating via wildcard: %s" % origin)
+
+            repos = await pool.run(
+                GITHUB_ORIGIN,
+                lambda: list(github_thread_client(ctx, github_token)
+                             .get_organization(github_org).get_repos())
+            )
+
+        else:
+            logger.info("Using direct repository: %s" % origin)
+
+            repos = [github_repo]
+
+        futures = list()
+
+        # Repositories of the listing make their requests through the client
+        # of the worker which listed them, so only the names of those which
+        # have changed are passed on
+        for repo in repos:
+            if isinstance(repo, Repository):
+                probe, item = github_cached_component(
+                    origin, repo.name, repo.pushed_at, manifest
+                )
+                if not probe:
+                    future = asyncio.get_event_loop().create_future()
+                    future.set_result(item)
+                    futures.append(future)
+                    continue
+
+                repo = repo.name
+
+            futures.append(asyncio.ensure_future(pool.run(
+                GITHUB_ORIGIN,
+                get_component_from_github,
+                ctx,
+                origin,
+                github_org,
+                repo,
+                None,
+                manifest
+            )))
+
+        return futures
+
     @click.pass_context
     def download(ctx, self, manifest=None, localdir=None, version=None,
-            override_existing=False, use_git=False):
+            override_existing=False, use_git=False, fetch_mode=None):
         # TODO: Fix Tarball downloader
         use_git = True
         provider = (GitListProvider if use_git else TarballListProvider)()
-        provider.download(
+        return provider.download(
             manifest=manifest,
             localdir=localdir,
             version=version,
-            override_existing=override_existing
+            override_existing=override_existing,
+            fetch_mode=fetch_mode
         )
 
 
-def get_component_from_github(ctx, origin=None, org=None, repo=None):
-    if origin is None:
-        raise ValueError("expected origin")
-    elif org is None:
-        raise ValueError("expected org")
-    elif repo is None:
-        raise ValueError("expected repo")
+def github_repo_matches(origin=None, name=None):
+    """
+    Determine whether the repository name matches the, possibly wildcard,
+    repository of the origin.
+    """
+    if "*" not in origin:
+        return True
 
-    # TODO: There should be a work around to fix this import loop cycle
-    from kraft.manifest import ManifestItem
-    from kraft.manifest import ManifestItemVersion
-    from kraft.manifest import ManifestItemDistribution
-    from .types import ListProviderType
+    uri = urlparse(origin)
+    github_org = uri.path.split('/')[1]
+    github_repo = uri.path.split('/')[2]
 
-    if isinstance(repo, str):
-        if repo == '.github':
-            pass
-        elif ".git" in repo:
-            repo = repo.split(".")[0]
-        github_api = Github(ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None))
-        repo = github_api.get_repo(
-            "%s/%s" % (org, repo)
-        )
+    if "*" in github_org:
+        raise ValueError("cannot use wildcard in GitHub organisation names")
 
-    if repo is None or not isinstance(repo, Repository):
-        raise TypeError("repo expected Repository")
+    regex = fnmatch.translate(github_repo)
+    reobj = re.compile(regex)
+
+    return reobj.match(name) is not None
 
-    # Ensure repository matches expression
-    if "*" in origin:
-        uri = urlparse(origin)
-        github_org = uri.path.split('/')[1]
-        github_repo = uri.path.split('/')[2]
 
-        if "*" in github_org:
-            raise ValueError("cannot use wildcard in GitHub organisation names")
+def github_fingerprint(pushed_at=None):
+    """
+    Any push to a repository, including of tags, changes the time it was last
+    pushed to, which is provided as part of listing the repositories.  It is
+    kept in seconds since the epoch, which both of GitHub's APIs agree on.
+    """
+    pushed_at = github_datetime(pushed_at)
+    if pushed_at is None:
+        return None
 
-        regex = fnmatch.translate(github_repo)
-        reobj = re.compile(regex)
-        match = reobj.match(repo.name)
+    return str(int(pushed_at.timestamp()))
 
-        if match is None:
-            return
 
-    _type, _name, _, _ = break_component_naming_format(repo.name)
+def make_component_from_github(origin=None, owner=None, name=None,
+                               description=None, pushed_at=None,
+                               html_url=None, ssh_url=None, branches=list(),
+                               tags=list(), releases=list()):
+    """
+    Build the manifest item for a GitHub repository.
 
-    remote_git = repo.html_url
+    Args:
+        origin (str):  The origin the repository was found through.
+        owner (str):  The login of the owner of the repository.
+        name (str):  The name of the repository.
+        description (str):  The description of the repository.
+        pushed_at (datetime):  When the repository was last pushed to.
+        html_url (str):  The URL of the repository.
+        ssh_url (str):  The SSH URL of the repository.
+        branches (iterable):  Tuples of each branch's name and head SHA.
+        tags (iterable):  The names of all tags.  Only consumed if there is a
+            stable branch.
+        releases (iterable):  Tuples of each release's tag name, whether it is
+            a draft and when it was published.  Only consumed if there is a
+            stable branch.
+
+    Returns:
+        ManifestItem: The manifest item, or None if the name of the
+            repository does not indicate the type of component.
+    """
+
+    # TODO: There should be a work around to fix this import loop cycle
+    from kraft.manifest import ManifestItem
+    from kraft.manifest import ManifestItemVersion
+    from kraft.manifest import ManifestItemDistribution
+    from .types import ListProviderType
+
+    _type, _name, _, _ = break_component_naming_format(name)
+    if _type is None:
+        return None
+
+    remote_git = html_url
     if "git@" in origin or "ssh://" in origin:
-        remote_git = repo.ssh_url
+        remote_git = ssh_url
 
     item = ManifestItem(
         provider=ListProviderType.GITHUB,
         name=_name,
-        description=repo.description,
+        description=description,
         type=_type.shortname,
         dist=UNIKRAFT_RELEASE_STABLE,
         git=remote_git,
         manifest=origin,
+        fingerprint=github_fingerprint(pushed_at),
     )
 
-    for branch in repo.get_branches():
-        if branch.name == UNIKRAFT_RELEASE_STABLE:
+    for branch, sha in branches:
+        if branch == UNIKRAFT_RELEASE_STABLE:
             dist = ManifestItemDistribution(
                 name=UNIKRAFT_RELEASE_STABLE
             )
 
-            tags = repo.get_tags()
-            releases = repo.get_releases()
             did_add_version = False
 
-            if tags.totalCount > 0:
-                for tag in tags:
-                    _version = tag.name
-
-                    # interpret the tag name for symbolic distributions
-                    ref = GIT_UNIKRAFT_TAG_PATTERN.match(tag.name)
-                    if ref is not None:
-                        _version = ref.group(1)
-
-                    did_add_version = True
-                    dist.add_version(ManifestItemVersion(
-                        git_sha=tag.name,
-                        version=_version,
-                        timestamp=repo.pushed_at,
-                        tarball=GITHUB_TARBALL % (
-                            repo.owner.login,
-                            repo.name,
-                            tag.name
-                        ),
-                    ))
-
-            if releases.totalCount > 0:
-                for release in releases:
-                    # Skip draft releases
-                    if release.draft:
-                        continue
-
-                    _version = release.tag_name
-
-                    # interpret the tag name for symbolic distributions
-                    ref = GIT_UNIKRAFT_TAG_PATTERN.match(release.tag_name)
-                    if ref is not None:
-                        _version = ref.group(1)
-
-                    did_add_version = True
-                    dist.add_version(ManifestItemVersion(
-                        git_sha=release.tag_name,
-                        version=_version,
-                        timestamp=release.published_at,
-                        tarball=GITHUB_TARBALL % (
-                            repo.owner.login,
-                            repo.name,
-                            release.tag_name
-                        ),
-                    ))
+            for tag in tags:
+                _version = tag
+
+                # interpret the tag name for symbolic distributions
+                ref = GIT_UNIKRAFT_TAG_PATTERN.match(tag)
+                if ref is not None:
+                    _version = ref.group(1)
+
+                did_add_version = True
+                dist.add_version(ManifestItemVersion(
+                    git_sha=tag,
+                    version=_version,
+                    timestamp=pushed_at,
+                    tarball=GITHUB_TARBALL % (owner, name, tag),
+                ))
+
+            for tag, draft, published_at in releases:
+                # Skip draft releases
+                if draft:
+                    continue
+
+                _version = tag
+
+                # interpret the tag name for symbolic distributions
+                ref = GIT_UNIKRAFT_TAG_PATTERN.match(tag)
+                if ref is not None:
+                    _version = ref.group(1)
+
+                did_add_version = True
+                dist.add_version(ManifestItemVersion(
+                    git_sha=tag,
+                    version=_version,
+                    timestamp=published_at,
+                    tarball=GITHUB_TARBALL % (owner, name, tag),
+                ))
 
             if did_add_version is False:
                 dist.add_version(ManifestItemVersion(
-                    git_sha=branch.commit.sha,
-                    version=branch.commit.sha[:7],
-                    timestamp=repo.pushed_at,
-                    tarball=GITHUB_TARBALL % (
-                        repo.owner.login,
-                        repo.name,
-                        branch.commit.sha
-                    ),
+                    git_sha=sha,
+                    version=sha[:7],
+                    timestamp=pushed_at,
+                    tarball=GITHUB_TARBALL % (owner, name, sha),
                 ))
 
         else:
             dist = ManifestItemDistribution(
-                name=branch.name,
+                name=branch,
             )
 
             dist.add_version(ManifestItemVersion(
-                git_sha=branch.commit.sha,
-                version=branch.commit.sha[:7],
-                timestamp=repo.pushed_at,
-                tarball=GITHUB_TARBALL % (
-                    repo.owner.login,
-                    repo.name,
-                    branch.commit.sha
-                ),
+                git_sha=sha,
+                version=sha[:7],
+                timestamp=pushed_at,
+                tarball=GITHUB_TARBALL % (owner, name, sha),
             ))
 
         item.add_distribution(dist)
 
     return item
+
+
+def github_cached_component(origin=None, name=None, pushed_at=None,
+                            manifest=None):
+    """
+    Determine whether a repository must be probed, which only requires what
+    is provided as part of listing the repositories.
+
+    Returns:
+        tuple: Whether the repository must be probed and otherwise its cached
+            item, which is None for repositories which are skipped.
+    """
+    # Ensure repository matches expression
+    if not github_repo_matches(origin, name):
+        return False, None
+
+    _type, _name, _, _ = break_component_naming_format(name)
+    if _type is None:
+        logger.debug("Skipping unknown type of repository: %s" % name)
+        return False, None
+
+    # Re-use the cached item if the repository has not been pushed to since
+    item = unchanged_item(
+        manifest=manifest,
+        type=_type,
+        name=_name,
+        fingerprint=github_fingerprint(pushed_at)
+    )
+    if item is not None:
+        logger.debug("Unchanged since last probe: %s" % name)
+        return False, item
+
+    return True, None
+
+
+def get_component_from_github(ctx, origin=None, org=None, repo=None,
+                              github_api=None, manifest=None):
+    if origin is None:
+        raise ValueError("expected origin")
+    elif org is None:
+        raise ValueError("expected org")
+    elif repo is None:
+        raise ValueError("expected repo")
+
+    if isinstance(repo, str):
+        if repo == '.github':
+            pass
+        elif ".git" in repo:
+            repo = repo.split(".")[0]
+        if github_api is None:
+            github_api = github_thread_client(
+                ctx, ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None)
+            )
+        repo = github_api.get_repo(
+            "%s/%s" % (org, repo)
+        )
+
+    if repo is None or not isinstance(repo, Repository):
+        raise TypeError("repo expected Repository")
+
+    probe, item = github_cached_component(
+        origin, repo.name, repo.pushed_at, manifest
+    )
+    if not probe:
+        return item
+
+    # Tags and releases are paginated lazily and are therefore only retrieved
+    # if the repository has a stable branch
+    return make_component_from_github(
+        origin=origin,
+        owner=repo.owner.login,
+        name=repo.name,
+        description=repo.description,
+        pushed_at=github_datetime(repo.pushed_at),
+        html_url=repo.html_url,
+        ssh_url=repo.ssh_url,
+        branches=((b.name, b.commit.sha) for b in repo.get_branches()),
+        tags=(tag.name for tag in repo.get_tags()),
+        releases=(
+            (
+                release.tag_name,
+                release.draft,
+                github_datetime(release.published_at)
+            ) for release in repo.get_releases()
+        )
+    )
+
+
+def github_scheduler(ctx, github_token=None, resource="core"):
+    """
+    Return the scheduler for requests made with the provided token against
+    either GitHub's REST ("core") or GraphQL ("graphql") API.
+
+    Returns:
+        RateLimitScheduler: The scheduler.
+    """
+    with GITHUB_SCHEDULERS_LOCK:
+        key = (github_token, resource)
+
+        if key not in GITHUB_SCHEDULERS:
+            GITHUB_SCHEDULERS[key] = RateLimitScheduler(
+                name="GitHub %s API" % (
+                    "GraphQL" if resource == "graphql" else "REST"
+                ),
+                reserve=LIST_GITHUB_RESERVE,
+                max_wait=ctx.obj.settings.list_github_max_wait
+            )
+
+        return GITHUB_SCHEDULERS[key]
+
+
+def github_schedulers():
+    with GITHUB_SCHEDULERS_LOCK:
+        return list(GITHUB_SCHEDULERS.values())
+
+
+class ScheduledConnection(object):
+    """
+    A connection of a GitHub client which makes its requests through a
+    scheduler.  It mimics, and wraps, the connection classes of PyGithub such
+    that all of the client's requests, including those of paginated lists
+    and of the objects it returns, are scheduled.
+    """
+
+    scheduler = None
+    connection_class = HTTPSRequestsConnectionClass
+
+    def __init__(self, *args, **kwargs):
+        self._connection = self.connection_class(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def request(self, *args, **kwargs):
+        # The request is only sent once its response is retrieved, so no
+        # other request may be made on this connection until then
+        self._lock.acquire()
+
+        try:
+            self.scheduler.acquire()
+            self._connection.request(*args, **kwargs)
+
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def getresponse(self):
+        try:
+            # The request is sent again when it was rejected for exceeding
+            # the rate limit
+            while True:
+                response = self._connection.getresponse()
+                headers = dict(response.getheaders())
+
+                if response.status in [403, 429] and \
+                        github_rate_limited(headers) and \
+                        self.scheduler.backoff(headers):
+                    self.scheduler.acquire()
+                    continue
+
+                self.scheduler.update(headers)
+                return response
+
+        finally:
+            self._lock.release()
+
+
+def github_rate_limited(headers=None):
+    headers = {k.lower(): v for k, v in headers.items()}
+
+    return headers.get("x-ratelimit-remaining", None) == "0" \
+        or "retry-after" in headers
+
+
+def github_client(ctx, github_token=None):
+    """
+    Create a GitHub client whose requests are all made through the scheduler
+    of the token.
+
+    Returns:
+        Github: The client.
+    """
+    connection_class = type(str("ScheduledHTTPSConnection"), (ScheduledConnection,), {
+        "scheduler": github_scheduler(ctx, github_token)
+    })
+
+    # A client keeps the connection class which was injected when it was
+    # created
+    with GITHUB_CLIENT_LOCK:
+        Requester.injectConnectionClasses(
+            HTTPRequestsConnectionClass,
+            connection_class
+        )
+
+        try:
+            # PyGithub 1.59 introduced authentication objects and deprecated
+            # passing the token as is
+            if Auth is not None and github_token is not None:
+                return Github(auth=Auth.Token(github_token))
+
+            return Github(github_token)
+
+        finally:
+            Requester.resetConnectionClasses()
+
+
+def github_thread_client(ctx, github_token=None):
+    """
+    Return the calling thread's GitHub client for the provided token, which
+    is created on first use.
+
+    Returns:
+        Github: The client.
+    """
+    clients = getattr(GITHUB_CLIENTS, "clients", None)
+    if clients is None:
+        clients = GITHUB_CLIENTS.clients = dict()
+
+    if github_token not in clients:
+        clients[github_token] = github_client(ctx, github_token)
+
+    return clients[github_token]
+
+
+def github_graphql(ctx, query=None, variables=dict(), github_token=None):
+    """
+    Perform a query against GitHub's GraphQL API, which requires a token.
+
+    Returns:
+        dict: The data returned by the query.
+    """
+    scheduler = github_scheduler(ctx, github_token, resource="graphql")
+
+    while True:
+        scheduler.acquire()
+
+        response = requests.post(
+            GITHUB_GRAPHQL,
+            json={
+                "query": query,
+                "variables": variables
+            },
+            headers={
+                "Authorization": "bearer %s" % github_token
+            }
+        )
+
+        if response.status_code in (403, 429) and \
+                response.headers.get("X-RateLimit-Remaining", None) == "0":
+            if scheduler.backoff(response.headers):
+                continue
+
+            raise RateLimitExceededException(
+                response.status_code, response.json(), dict(response.headers)
+            )
+
+        scheduler.update(response.headers)
+        response.raise_for_status()
+        result = response.json()
+
+        rate_limited = any(
+            error.get("type", None) == "RATE_LIMITED"
+            for error in result.get("errors", list())
+        )
+
+        if not rate_limited:
+            break
+
+        if not scheduler.backoff(response.headers):
+            raise RateLimitExceededException(
+                response.status_code, result, dict(response.headers)
+            )
+
+    if result.get("data", None) is None:
+        raise ValueError("GitHub GraphQL query failed: %s" % "; ".join(
+            error.get("message", "") for error in result.get("errors", list())
+        ))
+
+    return result["data"]
+
+
+def github_graphql_nodes(ctx, owner=None, name=None, field=None,
+                         connection=None, github_token=None):
+    """
+    Return all nodes of a connection of a repository, retrieving any further
+    pages of it which were not part of the initial query.
+    """
+    nodes = list(connection["nodes"])
+    page_info = connection["pageInfo"]
+
+    while page_info["hasNextPage"]:
+        data = github_graphql(
+            ctx,
+            query=GITHUB_GRAPHQL_QUERY_CONNECTION % GITHUB_GRAPHQL_CONNECTIONS[field],
+            variables={
+                "owner": owner,
+                "name": name,
+                "cursor": page_info["endCursor"]
+            },
+            github_token=github_token
+        )
+
+        connection = data["repository"]["connection"]
+        nodes.extend(connection["nodes"])
+        page_info = connection["pageInfo"]
+
+    return nodes
+
+
+def github_datetime(value=None):
+    """
+    Return a point in time provided by GitHub as an aware datetime in UTC.
+    Older releases of PyGithub provide naive datetimes in UTC.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = dateutil.parser.parse(value)
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(timezone.utc)
+
+
+def make_component_from_github_graphql(ctx, origin=None, repo=None,
+                                       github_token=None):
+    owner = repo["owner"]["login"]
+    name = repo["name"]
+
+    def nodes(field):
+        return github_graphql_nodes(
+            ctx,
+            owner=owner,
+            name=name,
+            field=field,
+            connection=repo[field],
+            github_token=github_token
+        )
+
+    return make_component_from_github(
+        origin=origin,
+        owner=owner,
+        name=name,
+        description=repo["description"],
+        pushed_at=github_datetime(repo["pushedAt"]),
+        html_url=repo["url"],
+        ssh_url=repo["sshUrl"],
+        branches=[
+            (branch["name"], branch["target"]["oid"])
+            for branch in nodes("branches")
+        ],
+        tags=(tag["name"] for tag in nodes("tags")),
+        releases=(
+            (
+                release["tagName"],
+                release["isDraft"],
+                github_datetime(release["publishedAt"])
+            ) for release in nodes("releases")
+        )
+    )
+
+
+def get_components_from_github_graphql(ctx, origin=None, org=None, repo=None,
+                                       github_token=None, manifest=None):
+    """
+    Retrieve the components of a GitHub origin using batched GraphQL queries.
+    Each query returns the branches, tags and releases of many repositories
+    at once.
+
+    Args:
+        origin (str):  The origin to probe.
+        org (str):  The GitHub organisation of the origin.
+        repo (str):  The repository of the origin, which may be a wildcard.
+        github_token (str):  The token used to access GitHub's GraphQL API.
+        manifest (Manifest):  The cached manifest of the origin, whose items
+            are re-used for repositories which have not changed.
+
+    Returns:
+        list: The manifest items of all matching repositories.
+    """
+    if origin is None:
+        raise ValueError("expected origin")
+    elif org is None:
+        raise ValueError("expected org")
+    elif repo is None:
+        raise ValueError("expected repo")
+
+    repos = list()
+
+    if "*" in repo:
+        cursor = None
+
+        while True:
+            data = github_graphql(
+                ctx,
+                query=GITHUB_GRAPHQL_QUERY_ORGANIZATION,
+                variables={
+                    "org": org,
+                    "cursor": cursor
+                },
+                github_token=github_token
+            )
+
+            repositories = data["organization"]["repositories"]
+            repos.extend(repositories["nodes"])
+
+            if not repositories["pageInfo"]["hasNextPage"]:
+                break
+
+            cursor = repositories["pageInfo"]["endCursor"]
+
+    else:
+        if ".git" in repo:
+            repo = repo.split(".")[0]
+
+        data = github_graphql(
+            ctx,
+            query=GITHUB_GRAPHQL_QUERY_REPOSITORY,
+            variables={
+                "owner": org,
+                "name": repo
+            },
+            github_token=github_token
+        )
+
+        repos.append(data["repository"])
+
+    items = list()
+
+    for repo in repos:
+        if repo is None or not github_repo_matches(origin, repo["name"]):
+            continue
+
+        _type, _name, _, _ = break_component_naming_format(repo["name"])
+        if _type is None:
+            logger.debug("Skipping unknown type of repository: %s" % repo["name"])
+            continue
+
+        item = unchanged_item(
+            manifest=manifest,
+            type=_type,
+            name=_name,
+            fingerprint=github_fingerprint(
+                github_datetime(repo["pushedAt"])
+            )
+        )
+        if item is not None:
+            logger.debug("Unchanged since last probe: %s" % repo["name"])
+            items.append(item)
+            continue
+
+        items.append(make_component_from_github_graphql(
+            ctx,
+            origin=origin,
+            repo=repo,
+            github_token=github_token
+        ))
+
+    return items
@@ -0,0 +1,319 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+# flake8: noqa
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from queue import Queue
+from urllib.parse import urlparse
+
+import click
+import requests
+
+from .provider import ListProvider
+from .provider import origin_host
+from kraft.const import UNIKRAFT_CACHEDIR
+from kraft.logger import logger
+from kraft.util import atomic_write
+from kraft.util import ErrorPropagatingThread
+
+INDEX_FORMAT_VERSION = 1
+INDEX_EXTENSIONS = (".json", ".json.gz")
+INDEX_VALIDATORS_DIRNAME = "indexes"
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class IndexListProvider(ListProvider):
+    """
+    The index provider reads a single, pre-generated file which describes
+    the components of any number of other origins, e.g. one produced by
+    `kraft list export-index`.  Each of those origins is saved into the
+    cache as it was when the index was generated, such that an update only
+    has to make a single request rather than one per repository.
+    """
+
+    @classmethod
+    def is_type(cls, origin=None):
+        if origin is None:
+            return False
+
+        return urlparse(origin).path.endswith(INDEX_EXTENSIONS)
+
+    @click.pass_context
+    def probe(ctx, self, origin=None, items=None, return_threads=False,
+              pool=None):
+        if self.is_type(origin) is False:
+            return []
+
+        threads = list()
+        if items is None:
+            items = Queue()
+
+        if return_threads and pool is not None:
+            threads.append(pool.submit_to(
+                origin_host(origin),
+                lambda *arg: items.put(get_manifests_from_index(*arg)),
+                ctx,
+                origin
+            ))
+        elif return_threads:
+            thread = ErrorPropagatingThread(
+                target=lambda *arg: items.put(get_manifests_from_index(*arg)),
+                args=(ctx, origin)
+            )
+            threads.append(thread)
+            thread.start()
+        else:
+            items.put(get_manifests_from_index(ctx, origin))
+
+        return items, threads
+
+
+def index_from_manifests(manifests=None, generated=None):
+    """
+    Build an index from the provided manifests.  Each manifest is described
+    in the schema of Manifest.__getstate__, with its items in the schema of
+    ManifestItem.__getstate__.
+
+    Args:
+        manifests (list):  The manifests to describe.
+        generated (float):  The time, in seconds since the epoch, at which the
+            manifests were retrieved.  Defaults to now.
+
+    Returns:
+        dict: The index, which can be serialized as JSON.
+    """
+    if generated is None:
+        generated = time.time()
+
+    index = {
+        "meta": {
+            "version": INDEX_FORMAT_VERSION,
+            "generated": generated
+        },
+        "manifests": list()
+    }
+
+    for manifest in manifests:
+        state = manifest.__getstate__()
+        state["data"] = dict()
+
+        for name, item in manifest.items():
+            item_state = item.__getstate__()
+
+            # The local directory is specific to the machine which generated
+            # the index and is determined anew wherever the item is used
+            item_state["meta"].pop("localdir", None)
+            state["data"][name] = item_state
+
+        index["manifests"].append(state)
+
+    return index
+
+
+def manifests_from_index(index=None):
+    """
+    Restore the manifests described by an index.
+
+    Returns:
+        list: The manifests.
+
+    Raises:
+        ValueError: If the index is of an unknown format.
+    """
+    # TODO: There should be a work around to fix this import loop cycle
+    from kraft.manifest import Manifest
+    from kraft.manifest import ManifestItem
+
+    if not isinstance(index, dict) or "manifests" not in index:
+        raise ValueError("not a component index")
+
+    version = index.get("meta", dict()).get("version", None)
+    if version != INDEX_FORMAT_VERSION:
+        raise ValueError("unsupported index version: %s" % version)
+
+    manifests = list()
+    for state in index["manifests"]:
+        meta = state.get("meta", dict())
+        manifest = Manifest(
+            manifest=meta.get("manifest", None),
+            manifest_checksum=meta.get("manifest_checksum", None)
+        )
+
+        for _, item_state in state.get("data", dict()).items():
+            item = ManifestItem()
+            item.__setstate__(item_state)
+            manifest.add_item(item)
+
+        manifests.append(manifest)
+
+    return manifests
+
+
+def dump_index(index=None, f=None, compress=False):
+    """
+    Write the index to the provided binary file, optionally gzip-compressed.
+    """
+    data = json.dumps(index, sort_keys=True).encode("utf-8")
+
+    if compress:
+        # Omit the modification time and the file name so the same index
+        # compresses identically
+        with gzip.GzipFile(filename="", fileobj=f, mode="wb", mtime=0) as gz:
+            gz.write(data)
+
+        return
+
+    f.write(data)
+
+
+def load_index(data=None):
+    """
+    Parse an index, decompressing it first if it is gzip-compressed.
+
+    Args:
+        data (bytes):  The contents of the index file.
+
+    Returns:
+        dict: The index.
+    """
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+
+    return json.loads(data.decode("utf-8"))
+
+
+def index_validators_path(ctx, origin=None):
+    return os.path.join(
+        ctx.obj.env.get('UK_CACHEDIR', os.path.join(
+            ctx.obj.workdir,
+            UNIKRAFT_CACHEDIR)
+        ),
+        INDEX_VALIDATORS_DIRNAME,
+        "%s.json" % hashlib.sha1(origin.encode("utf-8")).hexdigest()
+    )
+
+
+def read_index_validators(path=None):
+    if not os.path.exists(path):
+        return dict()
+
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+
+    except (IOError, ValueError) as e:
+        logger.debug("Ignoring unreadable %s: %s" % (path, e))
+        return dict()
+
+
+def fetch_index(ctx, origin=None):
+    """
+    Retrieve the contents of an index from a local path or a URL.  Remote
+    indexes are revalidated with the ETag and Last-Modified headers of the
+    previous response, as long as the origins it described are still cached.
+
+    Returns:
+        tuple: The contents of the index, or None if it has not changed, and
+            the validators of the response to remember, if any.
+    """
+    uri = urlparse(origin)
+    if uri.scheme not in ("http", "https"):
+        path = uri.path if uri.scheme == "file" else origin
+        with open(path, "rb") as f:
+            return f.read(), None
+
+    validators = read_index_validators(index_validators_path(ctx, origin))
+
+    headers = dict()
+    cached = set(ctx.obj.cache.all())
+    if all(o in cached for o in validators.get("origins", list())):
+        if validators.get("etag", None) is not None:
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified", None) is not None:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = requests.get(origin, headers=headers)
+    if response.status_code == 304:
+        return None, None
+
+    response.raise_for_status()
+
+    return response.content, {
+        "etag": response.headers.get("ETag", None),
+        "last_modified": response.headers.get("Last-Modified", None)
+    }
+
+
+def get_manifests_from_index(ctx, origin=None):
+    """
+    Retrieve the index at the origin and save each manifest it describes
+    into the cache, unless the cache holds a more recent copy already.
+
+    Returns:
+        list: An empty list, as the index origin itself has no components.
+    """
+    data, validators = fetch_index(ctx, origin)
+    if data is None:
+        logger.info("Unchanged since last update: %s" % origin)
+        return list()
+
+    index = load_index(data)
+    generated = index.get("meta", dict()).get("generated", None)
+    manifests = manifests_from_index(index)
+
+    for manifest in manifests:
+        if manifest.manifest is None or manifest.manifest == origin:
+            continue
+
+        refreshed = ctx.obj.cache.last_refreshed(manifest.manifest)
+        if refreshed is not None and generated is not None \
+                and refreshed.timestamp() >= generated:
+            logger.debug("Keeping more recent %s" % manifest.manifest)
+            continue
+
+        logger.info("Found %s via %s..." % (manifest.manifest, origin))
+        ctx.obj.cache.save(manifest.manifest, manifest, refreshed=generated)
+
+    # Only remember the validators once the index has been saved, such that
+    # an interrupted update fetches the whole index again
+    if validators is not None:
+        validators["origins"] = [m.manifest for m in manifests]
+        with atomic_write(index_validators_path(ctx, origin), mode="w") as f:
+            json.dump(validators, f)
+
+    return list()
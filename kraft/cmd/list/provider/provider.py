@@ -33,6 +33,9 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import asyncio
+from urllib.parse import urlparse
+
 import click
 
 from kraft.logger import logger
@@ -46,13 +49,107 @@ class ListProvider(object):
         return False
 
     @click.pass_context
-    def probe(ctx, self, origin=None, items=None, return_threads=False):
+    def probe(ctx, self, origin=None, items=None, return_threads=False,
+              pool=None):
         logger.warning("%s did not replace probe()" %
             self.__class__.__name__)
         return None, None
 
+    @classmethod
+    async def is_type_async(cls, origin=None, pool=None):
+        """
+        Determine whether the origin is of this type from within an event
+        loop, using the AsyncWorkerPool to avoid blocking it.
+        """
+        return await pool.run(origin_host(origin), cls.is_type, origin)
+
+    async def probe_async(self, ctx, origin=None, manifest=None, pool=None):
+        """
+        Start probing the origin from within an event loop.  Providers which
+        cannot probe without blocking simply run probe() on one of the
+        AsyncWorkerPool's threads.
+
+        Args:
+            ctx (Context):  The click context.
+            origin (str):  The origin to probe.
+            manifest (Manifest):  The cached manifest of the origin.
+            pool (AsyncWorkerPool):  The pool to run blocking work on.
+
+        Returns:
+            list: Futures which each resolve to a manifest item, a list of
+                them or None.
+        """
+        def probe():
+            with ctx:
+                items, _ = self.probe(origin=origin)
+
+            found = list()
+            while items is not None and not items.empty():
+                found.append(items.get())
+
+            return found
+
+        return [asyncio.ensure_future(
+            pool.run(origin_host(origin), probe)
+        )]
+
     @click.pass_context
     def download(ctx, self, manifest=None, localdir=None, version=None,
             override_existing=False, **kwargs):
         logger.warning("%s did not replace download()" %
             self.__class__.__name__)
+
+
+def origin_host(origin=None):
+    """
+    Determine the host an origin is retrieved from, such that the number of
+    concurrent requests made against each host can be limited.
+
+    Args:
+        origin (str):  The origin, which may be a URL, an scp-like git address
+            (user@host:path) or a local path.
+
+    Returns:
+        str: The host of the origin, or an empty string for local origins.
+    """
+    if origin is None:
+        return ""
+
+    uri = urlparse(origin)
+    if uri.netloc != "":
+        return uri.hostname or uri.netloc
+
+    if ":" in origin and "@" in origin.split(":")[0]:
+        return origin.split(":")[0].split("@")[-1]
+
+    return ""
+
+
+def unchanged_item(manifest=None, type=None, name=None, fingerprint=None):
+    """
+    Look up the cached item of a remote repository which has not changed
+    since it was last probed, such that it does not have to be probed again.
+
+    Args:
+        manifest (Manifest):  The cached manifest of the origin.
+        type (ComponentType):  The type of the component.
+        name (str):  The name of the component.
+        fingerprint (str):  The current fingerprint of the remote repository.
+
+    Returns:
+        ManifestItem: The cached item, marked as checked, or None if it must
+            be probed.
+    """
+    if manifest is None or fingerprint is None:
+        return None
+
+    item = manifest.get_item(name)
+    if item is None or item.fingerprint != fingerprint:
+        return None
+
+    if type is not None and item.type is not None and \
+            item.type.shortname != type.shortname:
+        return None
+
+    item.touch()
+    return item
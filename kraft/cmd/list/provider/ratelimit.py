@@ -0,0 +1,239 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+from datetime import datetime
+
+from github.GithubException import RateLimitExceededException
+
+from kraft.logger import logger
+
+
+def _int_or_none(value=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler(object):
+    """
+    Schedules requests against an API with a rate limit, such as GitHub's,
+    based on the budget reported by the X-RateLimit-* headers of its
+    responses.  Requests are made freely whilst the budget is plentiful, are
+    spread out evenly over the time until the limit is reset once it runs
+    low and wait for the reset once it is exhausted.  If the reset is further
+    away than the maximum wait, RateLimitExceededException is raised instead.
+    """
+
+    _name = None
+    @property
+    def name(self): return self._name
+
+    _limit = None
+    @property
+    def limit(self): return self._limit
+
+    _remaining = None
+    @property
+    def remaining(self): return self._remaining
+
+    _reset = None
+    @property
+    def reset(self): return self._reset
+
+    _requests = 0
+    @property
+    def requests(self): return self._requests
+
+    def __init__(self, name=None, reserve=0, pace_below=0.1, max_wait=None,
+                 clock=time.time, sleep=time.sleep):
+        """
+        Args:
+            name (str):  The name of the API, used when reporting.
+            reserve (int):  The number of requests to keep in reserve, e.g.
+                for other clients sharing the same budget.
+            pace_below (float):  The fraction of the budget below which
+                requests are spread out until the reset.
+            max_wait (int):  The number of seconds to wait at most for the
+                limit to be reset.  Waits indefinitely if None.
+        """
+        self._name = name
+        self._reserve = reserve
+        self._pace_below = pace_below
+        self._max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0
+        self._blocked_until = None
+
+    def acquire(self):
+        """
+        Wait until the next request may be made and account for it.
+        """
+        with self._lock:
+            delay = self._delay(self._clock())
+            self._requests += 1
+            if self._remaining is not None:
+                self._remaining -= 1
+
+        if delay > 0:
+            self._sleep(delay)
+
+    def _delay(self, now):
+        # Every request waits whilst the budget is exhausted, not only the
+        # one which found it to be
+        if self._blocked_until is not None:
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self._blocked_until = None
+
+        if self._remaining is None or self._reset is None:
+            return 0
+
+        until_reset = max(0, self._reset - now)
+
+        if self._remaining <= self._reserve:
+            if until_reset == 0:
+                return 0
+
+            if self._max_wait is not None and until_reset > self._max_wait:
+                raise self.exceeded()
+
+            logger.warning("%s rate limit exhausted, waiting until %s..." % (
+                self._name, self.reset_time().strftime("%H:%M:%S")
+            ))
+
+            # The remaining budget is unknown until the next response
+            self._remaining = None
+            self._blocked_until = self._reset
+            return until_reset
+
+        if self._limit is not None and \
+                self._remaining < self._limit * self._pace_below:
+            start = max(now, self._next)
+            self._next = start + until_reset / max(1, self._remaining)
+            return start - now
+
+        return 0
+
+    def update(self, headers=None):
+        """
+        Update the budget from the headers of a response.
+
+        Args:
+            headers (dict):  The headers of the response.
+        """
+        if headers is None:
+            return
+
+        headers = {k.lower(): v for k, v in headers.items()}
+        limit = _int_or_none(headers.get("x-ratelimit-limit", None))
+        remaining = _int_or_none(headers.get("x-ratelimit-remaining", None))
+        reset = _int_or_none(headers.get("x-ratelimit-reset", None))
+
+        if remaining is None or reset is None:
+            return
+
+        with self._lock:
+            # Responses may arrive out of order and other clients may share
+            # the budget, so within the same window the lowest count wins
+            if self._reset == reset and self._remaining is not None:
+                remaining = min(remaining, self._remaining)
+
+            if self._reset is None or reset >= self._reset:
+                self._limit = limit
+                self._remaining = remaining
+                self._reset = reset
+
+    def backoff(self, headers=None):
+        """
+        Wait for the limit to be reset after a request was rejected.
+
+        Args:
+            headers (dict):  The headers of the rejected response.
+
+        Returns:
+            bool: Whether the request can be retried.
+        """
+        self.update(headers)
+
+        with self._lock:
+            if self._reset is None:
+                return False
+
+            until_reset = max(0, self._reset - self._clock())
+            if self._max_wait is not None and until_reset > self._max_wait:
+                return False
+
+            self._remaining = None
+            self._blocked_until = self._reset
+
+        logger.warning("%s rate limit exceeded, waiting until %s..." % (
+            self._name, self.reset_time().strftime("%H:%M:%S")
+        ))
+        self._sleep(until_reset)
+        return True
+
+    def exceeded(self):
+        return RateLimitExceededException(403, {
+            "message": "%s rate limit exceeded until %s" % (
+                self._name, self.reset_time()
+            )
+        }, None)
+
+    def reset_time(self):
+        if self._reset is None:
+            return None
+
+        return datetime.fromtimestamp(self._reset)
+
+    def report(self):
+        """
+        Returns:
+            str: A summary of the requests made and the remaining budget.
+        """
+        report = "%s: %d requests made" % (self._name, self._requests)
+
+        if self._remaining is not None and self._limit is not None:
+            report += ", %d/%d remaining until %s" % (
+                self._remaining,
+                self._limit,
+                self.reset_time().strftime("%H:%M:%S")
+            )
+
+        return report
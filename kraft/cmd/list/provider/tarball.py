@@ -50,6 +50,7 @@ from atpbar import find_reporter
 from .provider import ListProvider
 from kraft.const import UNIKRAFT_CACHEDIR
 from kraft.logger import logger
+from kraft.util import atomic_write
 
 
 class FileDownloader(object):
@@ -133,6 +134,8 @@ class TarballProgressBar(object):
 
 
 class TarballListProvider(ListProvider):
+    BLOCK_SIZE = 8192
+
     @click.pass_context
     def download(ctx, self, manifest=None, localdir=None, version=None,
             override_existing=False):
@@ -143,17 +146,12 @@ class TarballListProvider(ListProvider):
 
         remote = manifest.get_version(version.version).tarball
 
-        if remote.endswith(".tar.gz"):
-            ext = ".tar.gz"
-        else:
-            _, ext = os.path.splitext(remote)
-
         local = os.path.join(
             ctx.obj.env.get('UK_CACHEDIR', os.path.join(
                 ctx.obj.workdir,
                 UNIKRAFT_CACHEDIR)
             ),
-            "%s-%s%s" % (manifest.name, version.version, ext)
+            tarball_filename(manifest.name, version.version, remote)
         )
 
         logger.debug("Downloading %s..." % remote)
@@ -161,12 +159,37 @@ class TarballListProvider(ListProvider):
         t = TarballProgressBar(label="%s/%s@%s"
             % (manifest.type.shortname, manifest.name, version.version)
         )
-        urllib.request.urlretrieve(
-            remote,
-            filename=local,
-            reporthook=t.update_to,
-            data=None
-        )
+
+        # Other kraft processes may share the cache directory, so only move
+        # the tarball into place once it has been downloaded completely.
+        with urllib.request.urlopen(remote) as response, \
+                atomic_write(local) as f:
+            size = int(response.headers.get('Content-Length', 0) or 0)
+            blocks = 0
+            t.update_to(blocks, self.BLOCK_SIZE, size)
+
+            while True:
+                block = response.read(self.BLOCK_SIZE)
+                if not block:
+                    break
+
+                f.write(block)
+                blocks += 1
+                t.update_to(blocks, self.BLOCK_SIZE, size)
 
         # dl = FileDownloader(remote, local)
         # dl.start()
+
+
+def tarball_filename(name=None, version=None, remote=None):
+    """
+    Returns:
+        str: The name under which the tarball of a component's version is
+            kept in the cache directory.
+    """
+    if remote.endswith(".tar.gz"):
+        ext = ".tar.gz"
+    else:
+        _, ext = os.path.splitext(remote)
+
+    return "%s-%s%s" % (name, version, ext)
@@ -37,10 +37,13 @@ from enum import Enum
 
 from .git import GitListProvider
 from .github import GitHubListProvider
+from .index import IndexListProvider
 from .tarball import TarballListProvider
+from kraft.cache import remote_cache
 
 
 class ListProviderType(Enum):
+    INDEX   = ("index"   , IndexListProvider)    # noqa
     GITHUB  = ("github"  , GitHubListProvider)   # noqa
     GIT     = ("git"     , GitListProvider)      # noqa
     TARBALL = ("tarball" , TarballListProvider)  # noqa
@@ -57,6 +60,51 @@ class ListProviderType(Enum):
         return self.value[1].is_type(origin)
 
 
+def origin_to_provider(origin=None):
+    """
+    Determine the provider of an origin, asking each provider in turn only
+    if the provider of the origin is not remembered already.
+
+    Returns:
+        ListProviderType: The provider or None if no provider serves it.
+    """
+    if origin is None:
+        return None
+
+    provider = provider_name_to_enum(remote_cache().provider("list", origin))
+    if provider is not None:
+        return provider
+
+    for _, provider in ListProviderType.__members__.items():
+        if provider.is_type(origin):
+            remote_cache().set_provider("list", origin, provider.name)
+            return provider
+
+    return None
+
+
+async def origin_to_provider_async(origin=None, pool=None):
+    """
+    Determine the provider of an origin from within an event loop.
+
+    Returns:
+        ListProviderType: The provider or None if no provider serves it.
+    """
+    if origin is None:
+        return None
+
+    provider = provider_name_to_enum(remote_cache().provider("list", origin))
+    if provider is not None:
+        return provider
+
+    for _, provider in ListProviderType.__members__.items():
+        if await provider.cls.is_type_async(origin, pool=pool):
+            remote_cache().set_provider("list", origin, provider.name)
+            return provider
+
+    return None
+
+
 def provider_name_to_enum(name=None):
     if name is None:
         return None
@@ -40,19 +40,35 @@ import click
 from atpbar import flush
 
 from .list import kraft_list_preflight
+from .provider.provider import origin_host
 from kraft.app import Application
+from kraft.app import save_workdir_lockfile
+from kraft.app import workdir_lockfile
+from kraft.const import DOWNLOAD_FAILED
+from kraft.const import DOWNLOAD_FETCHED
+from kraft.const import DOWNLOAD_HIT
+from kraft.const import GIT_FETCH_MODES
+from kraft.dependency import component_dependencies
+from kraft.dependency import dependency_key
+from kraft.dependency import DependencyGraph
+from kraft.dependency import LibrarySymbols
+from kraft.error import KraftError
 from kraft.logger import logger
 from kraft.manifest import ManifestItem
 from kraft.manifest import ManifestVersionEquality
+from kraft.manifest import resolve_version
 from kraft.types import break_component_naming_format
 from kraft.types import ComponentType
-from kraft.util import ErrorPropagatingThread
+from kraft.util import pretty_columns
+from kraft.util import prettysize
+from kraft.util import WorkerPool
 
 
 @click.pass_context  # noqa: C901
 def kraft_list_pull(ctx, name=None, workdir=None, use_git=False,
                     pull_dependencies=False, skip_verify=False, appdir=None,
-                    skip_app=False, force_pull=False):
+                    skip_app=False, force_pull=False, plan=False,
+                    fetch_mode=None):
     """
     Pull a particular component from a known manifest.  This will retrieve
     the contents to either the automatically determined directory or to an
@@ -68,6 +84,10 @@ def kraft_list_pull(ctx, name=None, workdir=None, use_git=False,
         appdir (str):  Used in conjunction with pull_dependencies and used to
             specify the application from which the dependencies are determined
             and then pulled.
+        plan (bool):  Only print the components which would be pulled, in the
+            order they would be pulled in, and the estimated transfer size.
+        fetch_mode (str):  How much of the git repositories of the components
+            to fetch, see GIT_FETCH_MODES, or None to use the setting.
     """
 
     manifests = list()
@@ -84,14 +104,15 @@ def kraft_list_pull(ctx, name=None, workdir=None, use_git=False,
         not_found.append(name)
 
     # Pull the dependencies for the application at workdir or cwd
+    app = None
+    lockfile = None
     if (pull_dependencies and
             (len(names) == 0 or (appdir is not None and len(names) == 1))):
-        app = Application.from_workdir(
-            appdir if appdir is not None
-            else workdir if workdir is not None
-            else os.getcwd(),
-            force_pull
-        )
+        if appdir is None:
+            appdir = workdir if workdir is not None else os.getcwd()
+
+        app = Application.from_workdir(appdir, force_pull)
+        lockfile = workdir_lockfile(appdir)
         for component in app.components:
             if component.manifest is not None:
                 manifests.append((
@@ -131,96 +152,365 @@ def kraft_list_pull(ctx, name=None, workdir=None, use_git=False,
         logger.error("No manifests to download")
         sys.exit(1)
 
-    for manifest in manifests:
-        if skip_app and manifest[0].type == ComponentType.APP:
-            continue
+    if skip_app:
+        manifests = [m for m in manifests if m[0].type != ComponentType.APP]
+
+    graph = DependencyGraph()
+    for manifest, equality, version in manifests:
+        graph.add(
+            manifest=manifest,
+            equality=equality,
+            version=version,
+            localdir=kraft_manifest_localdir(workdir, manifest)
+        )
 
-        kraft_download_via_manifest(
+    pending = list(graph)
+    symbols = LibrarySymbols(graph, lockfile)
+
+    # Follow the dependencies of the components which are already on disk
+    # so that they are retrieved at once with the rest
+    if pull_dependencies:
+        pending += kraft_resolve_dependencies(graph, pending, workdir, symbols)
+
+    if plan:
+        kraft_list_plan(graph, pending)
+        return
+
+    # Retrieve the components in waves: every component which is known is
+    # downloaded concurrently, after which those which were downloaded are
+    # searched for further dependencies until no new ones are found
+    pulled = set()
+    complete = True
+    while len(pending) > 0:
+        failed = kraft_download_manifests(
             workdir=workdir,
-            manifest=manifest[0],
-            equality=manifest[1],
-            version=manifest[2],
+            manifests=[graph.get(key)[:3]
+                       for wave in graph.waves(pending) for key in wave],
             use_git=use_git,
-            skip_verify=skip_verify
+            skip_verify=skip_verify,
+            fetch_mode=fetch_mode
         )
 
-    if pull_dependencies and len(names) > 0:
-        for manifest in manifests:
-            if manifest[0].type == ComponentType.APP:
-                kraft_list_pull(
-                    appdir=manifest[0].localdir,
-                    workdir=workdir,
-                    use_git=use_git,
-                    pull_dependencies=True,
-                    skip_verify=skip_verify
+        pulled.update(pending)
+        complete = complete and len(failed) == 0
+        if not pull_dependencies:
+            break
+
+        pending = [key for key in kraft_resolve_dependencies(graph, [
+            key for key in pending if graph.get(key).manifest not in failed
+        ], workdir, symbols) if key not in pulled]
+
+    # Pin the application's components and those they depend on once all of
+    # them are on disk
+    if app is not None and lockfile is None and not force_pull and complete:
+        kraft_lock_application(app, appdir, graph)
+
+
+def kraft_resolve_dependencies(graph=None, keys=None, workdir=None,
+                               symbols=None):
+    """
+    Add the components which the provided components of the graph depend on,
+    and in turn those which they depend on, as far as they are on disk.
+
+    Args:
+        graph (DependencyGraph):  The graph to add to.
+        keys (list):  The components to start from.
+        workdir (str):  The alternative working directory to save to.
+        symbols (LibrarySymbols):  Finds the libraries of Kconfig symbols.
+
+    Returns:
+        list: The keys of the components which were added.
+    """
+    added = list()
+    queue = list(keys)
+
+    while len(queue) > 0:
+        key = queue.pop(0)
+        node = graph.get(key)
+
+        for manifest, equality, version in component_dependencies(
+                manifest=node.manifest,
+                localdir=node.localdir,
+                find_symbol=symbols.find):
+            if graph.add(
+                    manifest=manifest,
+                    equality=equality,
+                    version=version,
+                    localdir=kraft_manifest_localdir(workdir, manifest)):
+                added.append(dependency_key(manifest))
+                queue.append(dependency_key(manifest))
+
+            graph.depend(key, dependency_key(manifest))
+
+    return added
+
+
+def kraft_lock_application(app=None, appdir=None, graph=None, workdir=None):
+    """
+    Pin the components of an application, and every component they depend
+    on as far as they are on disk, in the lockfile next to its Kraftfile.
+
+    Args:
+        app (Application):  The application.
+        appdir (str):  The working directory of the application.
+        graph (DependencyGraph):  The components which were pulled for the
+            application, or None to follow the dependencies of those of its
+            components which are on disk.
+        workdir (str):  The alternative working directory the components
+            were saved to.
+
+    Returns:
+        Lockfile: The lockfile which was written or None.
+    """
+    if graph is None:
+        graph = DependencyGraph()
+
+        for component in app.components:
+            if component.manifest is not None and component.version is not None:
+                graph.add(
+                    manifest=component.manifest,
+                    equality=ManifestVersionEquality.EQ,
+                    version=component.version.version,
+                    localdir=kraft_manifest_localdir(workdir, component.manifest)
+                )
+
+        kraft_resolve_dependencies(
+            graph, list(graph), workdir, LibrarySymbols(graph)
+        )
+
+    dependencies = list()
+    for key in graph:
+        node = graph.get(key)
+
+        try:
+            _, version = resolve_version(
+                node.manifest, node.version, node.equality
+            )
+        except KraftError:
+            version = None
+
+        dependencies.append((node.manifest, version, node.localdir))
+
+    return save_workdir_lockfile(appdir, app.components, dependencies)
+
+
+def kraft_list_plan(graph=None, keys=None):
+    """
+    Print the components which would be pulled in waves, what each depends
+    on and the estimated size of the transfer.
+    """
+    data = [[
+        click.style('WAVE', fg='white'),
+        click.style('COMPONENT', fg='white'),
+        click.style('VERSION', fg='white'),
+        click.style('SIZE', fg='white'),
+        click.style('DEPENDS ON', fg='white'),
+    ]]
+
+    total = 0
+    unknown = 0
+    unexplored = 0
+
+    for i, wave in enumerate(graph.waves(keys)):
+        for key in wave:
+            node = graph.get(key)
+
+            try:
+                _, version = resolve_version(
+                    node.manifest, node.version, node.equality
                 )
+            except KraftError:
+                version = None
+
+            present = os.path.isdir(node.localdir) \
+                and len(os.listdir(node.localdir)) > 0
+
+            size = version.tarball_size if version is not None else None
+            if present:
+                size = 0
+            elif size is None:
+                unknown += 1
+            else:
+                total += size
+
+            depends = ", ".join(
+                "%s/%s" % dep for dep in graph.dependencies(key)
+            )
+            if not present and node.manifest.type in (ComponentType.LIB,
+                                                      ComponentType.APP):
+                depends = (depends + " " if len(depends) > 0 else "") + "?"
+                unexplored += 1
+
+            data.append([
+                click.style(str(i + 1), fg='white'),
+                click.style(str(node.manifest), fg='green' if present else 'red'),
+                click.style(version.version if version is not None else "?", fg='white'),
+                click.style("present" if present else prettysize(size), fg='white'),
+                click.style(depends, fg='white'),
+            ])
+
+    click.echo(pretty_columns(data)[:-1])
+    click.echo("Estimated transfer: %s%s" % (
+        prettysize(total),
+        " and %d component(s) of unknown size" % unknown if unknown > 0 else ""
+    ))
+
+    if unexplored > 0:
+        click.echo(
+            "Dependencies marked ? are only known once the component is pulled."
+        )
 
 
 @click.pass_context
 def kraft_download_via_manifest(ctx, workdir=None, manifest=None,
                                 equality=None, version=None, use_git=False,
-                                skip_verify=False):
+                                skip_verify=False, fetch_mode=None):
+    """
+    Download a single manifest item, see kraft_download_manifests().
+    """
+    kraft_download_manifests(
+        workdir=workdir,
+        manifests=[(manifest, equality, version)],
+        use_git=use_git,
+        skip_verify=skip_verify,
+        fetch_mode=fetch_mode
+    )
+
+
+def kraft_manifest_localdir(workdir=None, manifest=None):
+    """
+    Returns:
+        str: The directory the manifest item is downloaded to, either its
+            default location or within the alternative working directory.
     """
+    if workdir is None:
+        return manifest.localdir
+    elif manifest.type == ComponentType.CORE:
+        return os.path.join(workdir, manifest.type.workdir)
+    else:
+        return os.path.join(workdir, manifest.type.workdir, manifest.name)
+
+
+@click.pass_context
+def kraft_download_manifests(ctx, workdir=None, manifests=None, use_git=False,
+                             skip_verify=False, fetch_mode=None):
     """
-    threads = list()
+    Download the provided manifest items concurrently through a bounded pool,
+    which limits the number of downloads from the same host.  Errors are
+    collected and reported together once all downloads have completed.
 
-    def kraft_download_component_thread(localdir=None, manifest=None,
-                                        equality=ManifestVersionEquality.EQ,
-                                        version=None, use_git=False,
-                                        skip_verify=False,
-                                        override_existing=False):
+    Args:
+        workdir (str):  An alternative working directory to save the items to.
+        manifests (list):  Tuples of each manifest item, the equality and the
+            version to download.
+        use_git (bool):  Whether to use git to retrieve the items.
+        skip_verify (bool):  Whether to skip the verification of the items.
+        fetch_mode (str):  How much of the git repositories of the items to
+            fetch, or None to use the setting.
+
+    Returns:
+        dict: The error of each manifest item which could not be downloaded.
+    """
+    def kraft_download_component_task(localdir=None, manifest=None,
+                                      equality=ManifestVersionEquality.EQ,
+                                      version=None):
         with ctx:
-            kraft_download_component(
+            return kraft_download_component(
                 localdir=localdir,
                 manifest=manifest,
                 equality=equality,
                 version=version,
                 use_git=use_git,
                 skip_verify=skip_verify,
-                override_existing=override_existing
+                fetch_mode=fetch_mode
             )
 
-    if workdir is None:
-        localdir = manifest.localdir
-    elif manifest.type == ComponentType.CORE:
-        localdir = os.path.join(workdir, manifest.type.workdir)
-    else:
-        localdir = os.path.join(workdir, manifest.type.workdir, manifest.name)
-
-    thread = ErrorPropagatingThread(
-        target=kraft_download_component_thread,
-        kwargs={
-            'localdir': localdir,
-            'manifest': manifest,
-            'equality': equality,
-            'version': version,
-            'use_git': use_git,
-            'skip_verify': skip_verify
-        }
-    )
-    threads.append((manifest, thread))
-    thread.start()
+    tasks = list()
+    localdirs = set()
 
-    for manifest, thread in threads:
-        try:
-            thread.join()
-        except Exception as e:
-            logger.error("Error pulling manifest: %s " % e)
+    with WorkerPool(
+            max_workers=ctx.obj.settings.list_concurrency,
+            max_per_host=ctx.obj.settings.list_concurrency_per_host) as pool:
+        for manifest, equality, version in manifests or list():
+            localdir = kraft_manifest_localdir(workdir, manifest)
 
-            if ctx.obj.verbose:
-                import traceback
-                logger.error(traceback.format_exc())
+            # The same component may be listed more than once
+            if localdir in localdirs:
+                continue
+            localdirs.add(localdir)
+
+            tasks.append((manifest, pool.submit_to(
+                origin_host(manifest.git or manifest.manifest),
+                kraft_download_component_task,
+                localdir=localdir,
+                manifest=manifest,
+                equality=equality,
+                version=version
+            )))
+
+        failed = dict()
+        results = dict()
+        for manifest, task in tasks:
+            try:
+                results[manifest] = task.join() or DOWNLOAD_FETCHED
+            except Exception as e:
+                failed[manifest] = e
+                results[manifest] = DOWNLOAD_FAILED
 
     if sys.stdout.isatty():
         flush()
 
+    kraft_download_report(results, failed)
+
+    return failed
+
+
+@click.pass_context
+def kraft_download_report(ctx, results=None, failed=None):
+    """
+    Report whether each manifest item was already available locally, had to
+    be fetched or could not be fetched, and the errors of the latter.
+
+    Args:
+        results (dict):  The result of the download of each manifest item.
+        failed (dict):  The error of each manifest item which could not be
+            downloaded.
+    """
+    for manifest, result in results.items():
+        logger.info("%s: %s" % (manifest, result))
+
+    if len(results) > 1:
+        outcomes = list(results.values())
+        logger.info("Pulled %d of %d components (%s)" % (
+            len(results) - len(failed), len(results), ", ".join(
+                "%d %s" % (outcomes.count(result), result) for result in [
+                    DOWNLOAD_HIT, DOWNLOAD_FETCHED, DOWNLOAD_FAILED
+                ]
+            )
+        ))
+
+    for manifest, e in failed.items():
+        logger.error("Error pulling manifest %s: %s" % (manifest, e))
+
+        if ctx.obj.verbose:
+            import traceback
+            logger.error("".join(traceback.format_exception(
+                type(e), e, e.__traceback__
+            )))
+
 
 @click.pass_context
 def kraft_download_component(ctx, localdir=None, manifest=None,
                              equality=ManifestVersionEquality.EQ, version=None,
                              use_git=False, skip_verify=False,
-                             override_existing=False):
+                             override_existing=False, fetch_mode=None):
     """
+    Download a single manifest item to a local directory.
+
+    Returns:
+        str: Whether the item was already available locally (DOWNLOAD_HIT),
+            had to be fetched (DOWNLOAD_FETCHED) or could not be fetched
+            (DOWNLOAD_FAILED).
     """
     if manifest is None or not isinstance(manifest, ManifestItem):
         raise TypeError("expected ManifestItem")
@@ -230,12 +520,13 @@ def kraft_download_component(ctx, localdir=None, manifest=None,
         os.makedirs(str(path.parent), exist_ok=True)
 
     with ctx:
-        manifest.download(
+        return manifest.download(
             localdir=localdir,
             equality=equality,
             version=version,
             override_existing=override_existing,
             use_git=use_git,
+            fetch_mode=fetch_mode
         )
 
 
@@ -260,10 +551,22 @@ def kraft_download_component(ctx, localdir=None, manifest=None,
     help='Skip the verification of the manifest.',
     is_flag=True
 )
+@click.option(
+    '--plan', '-p', 'plan',
+    help='Show the components which would be pulled and the estimated size.',
+    is_flag=True
+)
+@click.option(
+    '--fetch-mode', '-f', 'fetch_mode',
+    help='Fetch the full history, only the commit (shallow) or no blobs '
+         'other than those checked out (partial).',
+    type=click.Choice(GIT_FETCH_MODES)
+)
 @click.argument('name', required=False, nargs=-1)
 @click.pass_context
 def cmd_list_pull(ctx, name=None, workdir=None, use_git=False,
-                  no_dependencies=False, skip_verify=False):
+                  no_dependencies=False, skip_verify=False, plan=False,
+                  fetch_mode=None):
     """
     Download a remote component to your working directory.
 
@@ -271,8 +574,10 @@ def cmd_list_pull(ctx, name=None, workdir=None, use_git=False,
     version you wish to download.  The name of a component is specified by
     either its unique name or by its type and name (e.g. [type]/[name] or
     [type]-[name]).  The version can be specified using an equality operator:
-    at the specific version/distribution (e.g. [name]==[version]) or equal and
-    above the specific version (e.g. [name]>=[version]).
+    at the specific version/distribution (e.g. [name]==[version]), equal and
+    above the specific version (e.g. [name]>=[version]), within a range of
+    versions (e.g. [name]>=[version],<[version]) or at any later version of
+    the same minor release (e.g. [name]~[version]).
 
     To pull an application and its depedencies, simply call the specified name:
 
@@ -294,9 +599,27 @@ def cmd_list_pull(ctx, name=None, workdir=None, use_git=False,
 
         $ kraft list pull lib-python3>=0.4
 
+        $ kraft list pull 'lib-python3>=0.4,<0.6'
+
+    The libraries which the pulled libraries select or depend on in their
+    Config.uk are pulled as well.  To see what would be pulled, in which
+    order and the estimated size of the transfer, without pulling anything:
+
+        $ kraft list pull --plan
+
+    Continuous integration jobs, which discard the components once they are
+    built, may only fetch the commits which are checked out:
+
+        $ kraft list pull --fetch-mode shallow
+
+    The default mode can be set as fetch.git_mode in .kraftrc.
     """
 
-    kraft_list_preflight()
+    # The dependencies of an application with a valid lockfile are retrieved
+    # by their pinned SHAs, without having to update the cache first
+    if len(name) > 0 or no_dependencies or \
+            workdir_lockfile(workdir if workdir is not None else os.getcwd()) is None:
+        kraft_list_preflight()
 
     try:
         kraft_list_pull(
@@ -304,7 +627,9 @@ def cmd_list_pull(ctx, name=None, workdir=None, use_git=False,
             workdir=workdir,
             use_git=use_git,
             pull_dependencies=not no_dependencies,
-            skip_verify=skip_verify
+            skip_verify=skip_verify,
+            plan=plan,
+            fetch_mode=fetch_mode
         )
 
     except Exception as e:
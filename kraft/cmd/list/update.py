@@ -32,27 +32,40 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import asyncio
+import subprocess
 import sys
+from queue import Empty
 from queue import Queue
 
 import click
 import six
 from github.GithubException import RateLimitExceededException
 
-from .provider.types import ListProviderType
+from .provider.github import github_schedulers
+from .provider.types import origin_to_provider
+from .provider.types import origin_to_provider_async
+from kraft import __program__
 from kraft.const import KRAFTRC_LIST_ORIGINS
+from kraft.const import LIST_ENGINE_ASYNCIO
+from kraft.const import LIST_UPDATE_FLUSH_INTERVAL
+from kraft.const import LIST_UPDATE_POLL_INTERVAL
 from kraft.logger import logger
-from kraft.manifest import Manifest
+from kraft.util import AsyncWorkerPool
+from kraft.util import ErrorPropagatingThread
+from kraft.util import WorkerPool
 
 
 @click.command('update', short_help='Update the list of remote components.')
+@click.argument('origin', nargs=-1)
 @click.pass_context
-def cmd_list_update(ctx):
+def cmd_list_update(ctx, origin=None):
     """
     Update the list of known Unikraft components.  This will search for
-    repositories specified in the origins section of your ~/.kraftrc file.
+    repositories specified in the origins section of your ~/.kraftrc file,
+    or only the provided origins.
     """
-    kraft_update()
+    kraft_update(list(origin))
 
 
 @click.pass_context  # noqa: C901
@@ -68,49 +81,33 @@ def kraft_update(ctx, origins=list()):
         sys.exit(1)
 
     try:
-        for origin in origins:
-            manifest = ctx.obj.cache.get(origin)
-
-            if manifest is None:
-                manifest = Manifest(
-                    manifest=origin
-                )
-
-            threads, items = kraft_update_from_source_threads(origin)
-
-            for thread in threads:
-                thread.join()
-
-            # Check thread's return value
-            while not items.empty():
-                result = items.get()
-                if result is not None:
-                    manifest.add_item(result)
-                    logger.info(
-                        "Found %s/%s via %s..." % (
-                            click.style(result.type.shortname, fg="blue"),
-                            click.style(result.name, fg="blue"),
-                            manifest.manifest
-                        )
-                    )
-                    ctx.obj.cache.save(origin, manifest)
+        kraft_update_origins(origins)
 
     except RateLimitExceededException:
-        for line in [
-            "GitHub rate limit exceeded!  If you have not done so already,",
-            "you can tell kraft to use a personal access token when contacting",
-            "the GitHub API.  First, visit:",
-            "",
-            "  https://github.com/settings/tokens/new",
-            "",
-            "then select 'repo:public_repo'.  You can then set the",
-            "environmental variable UK_KRAFT_GITHUB_TOKEN with this new token,",
-            "for example:",
-            "",
-            "  export UK_KRAFT_GITHUB_TOKEN=<token>",
-            "",
-            "Once this is done, please try again :-)"
-        ]:
+        if ctx.obj.env.get('UK_KRAFT_GITHUB_TOKEN', None) is not None:
+            lines = [
+                "GitHub rate limit exceeded!  The components found so far have",
+                "been saved and will not be probed again unless they change,",
+                "so simply run kraft list update again later to resume."
+            ]
+        else:
+            lines = [
+                "GitHub rate limit exceeded!  If you have not done so already,",
+                "you can tell kraft to use a personal access token when contacting",
+                "the GitHub API.  First, visit:",
+                "",
+                "  https://github.com/settings/tokens/new",
+                "",
+                "then select 'repo:public_repo'.  You can then set the",
+                "environmental variable UK_KRAFT_GITHUB_TOKEN with this new token,",
+                "for example:",
+                "",
+                "  export UK_KRAFT_GITHUB_TOKEN=<token>",
+                "",
+                "Once this is done, please try again :-)"
+            ]
+
+        for line in lines:
             logger.error(line)
 
         if ctx.obj.verbose:
@@ -130,23 +127,277 @@ def kraft_update(ctx, origins=list()):
 
 
 @click.pass_context
-def kraft_update_from_source_threads(ctx, origin=None):
+def kraft_update_origins(ctx, origins=list()):
+    """
+    Refresh the manifests of the provided origins with the configured engine.
+    Unlike kraft_update(), errors are raised to the caller.
+    """
+    try:
+        if ctx.obj.settings.list_engine == LIST_ENGINE_ASYNCIO:
+            kraft_update_async(origins)
+        else:
+            kraft_update_threads(origins)
+
+    finally:
+        for scheduler in github_schedulers():
+            if scheduler.requests > 0:
+                logger.info(scheduler.report())
+
+
+@click.pass_context
+def kraft_update_threads(ctx, origins=list()):
+    """
+    Update the provided origins using a thread per origin, each of which
+    submits its probes to a shared WorkerPool.
+    """
+    def update_origin(origin, pool):
+        with ctx:
+            kraft_update_origin(origin, pool=pool)
+
+    # All origins are probed at once through the same pool, whilst each
+    # origin's results are saved as soon as they arrive
+    with WorkerPool(
+            max_workers=ctx.obj.settings.list_concurrency,
+            max_per_host=ctx.obj.settings.list_concurrency_per_host,
+            fatal=(RateLimitExceededException,)) as pool:
+        threads = list()
+
+        for origin in origins:
+            thread = ErrorPropagatingThread(
+                target=update_origin,
+                args=(origin, pool)
+            )
+            threads.append(thread)
+            thread.start()
+
+        # Let every origin finish saving before reporting the first error
+        error = None
+        for thread in threads:
+            try:
+                thread.join()
+            except Exception as e:
+                if error is None:
+                    error = e
+
+        if error is not None:
+            raise error
+
+
+def kraft_update_add_item(batch=None, result=None):
+    """
+    Add the manifest item, or list of items, found by a probe to the batch.
+    """
+    if result is None:
+        return
+
+    if isinstance(result, list):
+        for item in result:
+            kraft_update_add_item(batch, item)
+        return
+
+    batch.add_item(result)
+    logger.info(
+        "Found %s/%s via %s..." % (
+            click.style(result.type.shortname, fg="blue"),
+            click.style(result.name, fg="blue"),
+            batch.manifest.manifest
+        )
+    )
+
+
+@click.pass_context
+def kraft_update_origin(ctx, origin=None, pool=None):
+    """
+    Probe a single origin and save the components found into the cache as
+    they arrive.  Components which cannot be probed are reported and skipped,
+    unless the error is fatal to the whole pool.
+
+    Args:
+        origin (str):  The origin to probe.
+        pool (WorkerPool):  The pool to submit probes to.
+    """
+    with ctx.obj.cache.batch(
+            origin, flush_interval=LIST_UPDATE_FLUSH_INTERVAL) as batch:
+        threads, items = kraft_update_from_source_threads(origin, pool=pool)
+
+        # Collect items in the order they are found rather than the order in
+        # which the threads were started
+        try:
+            while len(threads) > 0:
+                try:
+                    kraft_update_add_item(
+                        batch, items.get(timeout=LIST_UPDATE_POLL_INTERVAL)
+                    )
+                except Empty:
+                    pass
+
+                running = list()
+                for thread in threads:
+                    if thread.is_alive():
+                        running.append(thread)
+                        continue
+
+                    try:
+                        thread.join()
+
+                    except RateLimitExceededException:
+                        raise
+
+                    except Exception as e:
+                        logger.error("Could not probe %s: %s" % (origin, e))
+
+                        if ctx.obj.verbose:
+                            import traceback
+                            logger.error(traceback.format_exc())
+
+                threads = running
+
+        # Keep everything found so far, even if the update was aborted, such
+        # that the next update can resume from here
+        finally:
+            while not items.empty():
+                kraft_update_add_item(batch, items.get())
+
+
+@click.pass_context
+def kraft_update_async(ctx, origins=list()):
+    """
+    Update the provided origins from a single asyncio event loop.  Remotes
+    are fingerprinted with asynchronous subprocesses, whilst the blocking
+    HTTP clients of the providers run on a bounded set of threads.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    try:
+        loop.run_until_complete(kraft_update_origins_async(ctx, origins))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def kraft_update_origins_async(ctx, origins=list()):
+    with AsyncWorkerPool(
+            max_workers=ctx.obj.settings.list_concurrency,
+            max_per_host=ctx.obj.settings.list_concurrency_per_host) as pool:
+        pending = [asyncio.ensure_future(
+            kraft_update_origin_async(ctx, origin, pool)
+        ) for origin in origins]
+
+        # Let every origin finish saving before reporting the first error,
+        # unless the rate limit was exceeded, which stops all of them
+        error = None
+        while len(pending) > 0:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_EXCEPTION
+            )
+
+            for task in done:
+                if task.exception() is not None and error is None:
+                    error = task.exception()
+
+            if isinstance(error, RateLimitExceededException):
+                for task in pending:
+                    task.cancel()
+                if len(pending) > 0:
+                    await asyncio.wait(pending)
+                break
+
+        if error is not None:
+            raise error
+
+
+async def kraft_update_origin_async(ctx, origin=None, pool=None):
+    """
+    Probe a single origin from an event loop and save the components found
+    into the cache as they arrive.
+    """
+    provider = await origin_to_provider_async(origin, pool=pool)
+    if provider is not None:
+        provider = provider.cls()
+
+    manifest = ctx.obj.cache.get(origin)
+
+    with ctx.obj.cache.batch(
+            origin, flush_interval=LIST_UPDATE_FLUSH_INTERVAL) as batch:
+        futures = list()
+        if provider is not None:
+            futures = await provider.probe_async(
+                ctx,
+                origin=origin,
+                manifest=manifest,
+                pool=pool
+            )
+
+        try:
+            for future in asyncio.as_completed(futures):
+                try:
+                    kraft_update_add_item(batch, await future)
+
+                except RateLimitExceededException:
+                    raise
+
+                except Exception as e:
+                    logger.error("Could not probe %s: %s" % (origin, e))
+
+                    if ctx.obj.verbose:
+                        import traceback
+                        logger.error(traceback.format_exc())
+
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+@click.pass_context
+def kraft_update_background(ctx, origins=list()):
+    """
+    Refresh the provided origins in a detached kraft process so that the
+    current command can continue to use the cached manifests in the meantime.
+
+    Args:
+        origins (list):  The origins to refresh.
+
+    Returns:
+        subprocess.Popen: The background process.
+    """
+    if isinstance(origins, six.string_types):
+        origins = [origins]
+
+    if origins is None or len(origins) == 0:
+        return None
+
+    ctx.obj.cache.mark_refreshing(origins)
+
+    logger.debug("Refreshing in the background: %s" % ", ".join(origins))
+
+    return subprocess.Popen(
+        [sys.executable, '-m', __program__, 'list', 'update'] + list(origins),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+@click.pass_context
+def kraft_update_from_source_threads(ctx, origin=None, pool=None):
     threads = list()
     items = Queue()
 
-    for _, provider in ListProviderType.__members__.items():
-        if provider.is_type(origin):
-            provider = provider.cls()
-            with ctx:
-                extra_items, extra_threads = provider.probe(
-                    origin=origin,
-                    items=items,
-                    return_threads=True
-                )
-            if extra_threads is not None and isinstance(extra_threads, list):
-                threads.extend(extra_threads)
-
-            break
+    provider = origin_to_provider(origin)
+    if provider is not None:
+        provider = provider.cls()
+        with ctx:
+            extra_items, extra_threads = provider.probe(
+                origin=origin,
+                items=items,
+                return_threads=True,
+                pool=pool
+            )
+        if extra_threads is not None and isinstance(extra_threads, list):
+            threads.extend(extra_threads)
 
     return threads, items
 
@@ -155,10 +406,8 @@ def kraft_update_from_source_threads(ctx, origin=None):
 def kraft_update_from_source(ctx, origin=None):
     manifest = None
 
-    for _, provider in ListProviderType.__members__.items():
-        if provider.is_type(origin):
-            provider = provider.cls()
-            manifest = provider.probe(origin=origin)
-            break
+    provider = origin_to_provider(origin)
+    if provider is not None:
+        manifest = provider.cls().probe(origin=origin)
 
     return manifest
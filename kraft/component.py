@@ -52,6 +52,7 @@ from kraft.error import UnknownVersionError
 from kraft.logger import logger
 from kraft.manifest import ManifestItemVersion
 from kraft.manifest import ManifestVersionEquality
+from kraft.manifest import resolve_version
 from kraft.types import ComponentType
 
 
@@ -175,12 +176,21 @@ class Component(object):
             if self._type is ComponentType.CORE:
                 name = "unikraft"
 
-            self._manifest = ctx.obj.cache.find_item_by_name(
-                type=self._type.shortname,
-                name=name
-            )
+            # A valid lockfile pins the component without consulting the cache
+            if ctx.obj.lockfile is not None:
+                self._manifest = ctx.obj.lockfile.item(
+                    type=self._type.shortname,
+                    name=name
+                )
 
-        if self._manifest is None and self.localdir is not None:
+            else:
+                self._manifest = ctx.obj.cache.find_item_by_name(
+                    type=self._type.shortname,
+                    name=name
+                )
+
+        if self._manifest is None and self.localdir is not None \
+                and ctx.obj.lockfile is None:
             from kraft.manifest import manifest_from_localdir
             self._manifest = manifest_from_localdir(self._localdir)
 
@@ -188,25 +198,13 @@ class Component(object):
             if self._name is None:
                 self._name = self._manifest.name
 
-            # Attempt to select the latest version from stable or staging
-            if version is None:
-                if UNIKRAFT_RELEASE_STABLE in self._manifest.dists.keys():
-                    self._version = self._manifest.get_distribution(UNIKRAFT_RELEASE_STABLE).latest
-
-                if self._version is None and UNIKRAFT_RELEASE_STAGING in self._manifest.dists.keys():
-                    self._version = self._manifest.get_distribution(UNIKRAFT_RELEASE_STAGING).latest
-
-            # Is the version actually a distribution name?
-            elif version in self._manifest.dists.keys():
-                self._version = \
-                    self._manifest.get_distribution(version).latest
-
-            # Maybe the version is from a distribution
-            else:
-                for dist in self._manifest.dists.keys():
-                    dist = self._manifest.get_distribution(dist)
-                    if version in dist.versions.keys():
-                        self._version = dist.get_version(version)
+            # Select the latest version from stable or staging, the latest
+            # version of a distribution, an exact version or the highest
+            # version within a constraint, e.g. >=0.5,<0.7
+            try:
+                _, self._version = resolve_version(self._manifest, version)
+            except UnknownVersionError:
+                pass
 
             if self._version is None and ignore_version:
                 known_versions = list()
@@ -55,6 +55,7 @@ from kraft.error import KraftError
 from kraft.error import KraftFileNotFound
 from kraft.lib import LibraryManager
 from kraft.logger import logger
+from kraft.manifest import version_spec
 from kraft.plat.network import NetworkManager
 from kraft.plat.volume import VolumeManager
 from kraft.target import TargetManager
@@ -631,7 +632,8 @@ def load_config(config_details, use_versions=[]):  # noqa: C901
     # Dynamically update the configuration specification based on version
     # overrides provided by use_versions
     for use in use_versions:
-        _type, name, _, version = break_component_naming_format(use)
+        _type, name, eq, version = break_component_naming_format(use)
+        version = version_spec(version, eq)
 
         if _type is ComponentType.CORE:
             unikraft['version'] = version
@@ -101,6 +101,145 @@ def infer_lib_config_name(name=None):
     return KCONFIG_LIB_NAME % name.replace('-', '_').upper()
 
 
+KCONFIG_DEFINITION_PATTERN = re.compile(
+    r'^\s*(?:menuconfig|config)\s+([A-Za-z0-9_]+)\s*$', re.MULTILINE
+)
+# Lines which start another entry of a Config.uk file
+KCONFIG_ENTRY_PATTERN = re.compile(
+    r'^\s*(?:config|menuconfig|choice|endchoice|menu|endmenu|if|endif|'
+    r'source|comment|mainmenu)\b'
+)
+# The attributes of an entry which make it require other symbols, e.g.
+# "select LIBNEWLIBC" or "depends on LIBPTHREAD_EMBEDDED && !LIBLWIP"
+KCONFIG_SELECT_PATTERN = re.compile(r'^\s*select\s+([A-Za-z0-9_]+)\s*(\bif\b.*)?$')
+KCONFIG_DEPENDS_PATTERN = re.compile(r'^\s*depends\s+on\s+(.+?)\s*$')
+KCONFIG_SYMBOL_PATTERN = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def kconfig_symbols(filename=None):
+    """
+    Read the symbols which a Config.uk file defines, without evaluating it.
+
+    Returns:
+        list: The defined symbols in the order they appear.
+    """
+    if filename is None or not os.path.isfile(filename):
+        return list()
+
+    with open(filename, encoding='utf-8', errors='replace') as f:
+        return KCONFIG_DEFINITION_PATTERN.findall(f.read())
+
+
+def kconfig_entry(contents=None, symbol=None):
+    """
+    Returns:
+        list: The attribute lines of the entry which defines the symbol, or
+            of the first entry if no symbol is provided.
+    """
+    lines = None
+
+    for line in contents.replace("\\\n", " ").splitlines():
+        if lines is not None:
+            if KCONFIG_ENTRY_PATTERN.match(line):
+                break
+            lines.append(line)
+            continue
+
+        definition = KCONFIG_DEFINITION_PATTERN.match(line)
+        if definition is not None and \
+                (symbol is None or definition.group(1) == symbol):
+            lines = list()
+
+    return lines or list()
+
+
+def _kconfig_parenthesised(expr=None):
+    # Whether the whole expression is enclosed by a single pair of parentheses
+    if not expr.startswith("(") or not expr.endswith(")"):
+        return False
+
+    depth = 0
+    for i, c in enumerate(expr):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0 and i < len(expr) - 1:
+                return False
+
+    return True
+
+
+def kconfig_required_symbols(expr=None):
+    """
+    Determine the symbols which a dependency expression requires to be
+    enabled.  Negated symbols, comparisons and either side of an alternative
+    ("||") are not required.
+
+    Returns:
+        set: The required symbols.
+    """
+    expr = expr.strip()
+
+    while _kconfig_parenthesised(expr):
+        expr = expr[1:-1].strip()
+
+    # Split the conjunction at its top level
+    terms = list()
+    depth = 0
+    start = 0
+    for i, c in enumerate(expr):
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0 and expr.startswith("&&", i):
+            terms.append(expr[start:i])
+            start = i + 2
+    terms.append(expr[start:])
+
+    if len(terms) > 1:
+        return set().union(*[kconfig_required_symbols(term) for term in terms])
+
+    if KCONFIG_SYMBOL_PATTERN.match(expr):
+        return set([expr])
+
+    return set()
+
+
+def kconfig_dependencies(filename=None, symbol=None):
+    """
+    Read the symbols which the option that enables a component, by default
+    the first option of its Config.uk file, requires without evaluating the
+    file: those it selects unconditionally and those it depends on.  The
+    other options of the file are only enabled on demand and are ignored.
+
+    Args:
+        filename (str):  The Config.uk file.
+        symbol (str):  The symbol of the option, e.g. LIBPYTHON3.
+
+    Returns:
+        set: The symbols, excluding those the file defines itself.
+    """
+    if filename is None or not os.path.isfile(filename):
+        return set()
+
+    with open(filename, encoding='utf-8', errors='replace') as f:
+        contents = f.read()
+
+    symbols = set()
+    for line in kconfig_entry(contents, symbol):
+        select = KCONFIG_SELECT_PATTERN.match(line)
+        if select is not None and select.group(2) is None:
+            symbols.add(select.group(1))
+
+        depends = KCONFIG_DEPENDS_PATTERN.match(line)
+        if depends is not None:
+            symbols.update(kconfig_required_symbols(depends.group(1)))
+
+    return symbols - set(KCONFIG_DEFINITION_PATTERN.findall(contents))
+
+
 def indent_print(s, indent):
     print(indent*" " + s)
 
@@ -51,6 +51,7 @@ GIT_UNIKRAFT_TAG_RELEASE = 'RELEASE-%s'
 # GIT_UNIKRAFT_TAG_PATTERN = re.compile(r'refs/tags/RELEASE-([\d\.]+)\^\{\}')
 GIT_TAG_PATTERN = re.compile(r'refs/tags/([\w\d\.-]+)[\^\{\}]?')
 GIT_BRANCH_PATTERN = re.compile(r'refs/heads/(.*)')
+GIT_SHA_PATTERN = re.compile(r'^[0-9a-f]{40}([0-9a-f]{24})?$')
 VSEMVER_PATTERN = re.compile(r'^v\d')
 SEMVER_PATTERN = re.compile(
     r"""
@@ -73,6 +74,10 @@ SEMVER_PATTERN = re.compile(
 
 GITHUB_ORIGIN = "github.com"
 GITHUB_TARBALL = "https://github.com/%s/%s/archive/%s.tar.gz"
+GITHUB_GRAPHQL = "https://api.github.com/graphql"
+GITHUB_API_AUTO = "auto"
+GITHUB_API_REST = "rest"
+GITHUB_API_GRAPHQL = "graphql"
 UNIKRAFT_ORG = "unikraft"
 UNIKRAFT_CORE = "%s/%s/%s" % (GITHUB_ORIGIN, UNIKRAFT_ORG, "unikraft.git")
 UNIKRAFT_ORIGIN = "%s/%s" % (GITHUB_ORIGIN, UNIKRAFT_ORG)
@@ -93,6 +98,8 @@ SUPPORTED_FILENAMES = [
     'kraft.yml',
 ]
 
+KRAFT_LOCKFILE = 'kraft.lock'
+
 TARBALL_SUPPORTED_EXTENSIONS = [
     '.zip',
     '.tar.gz',
@@ -130,6 +137,7 @@ UNIKRAFT_APPSDIR = "apps"
 UNIKRAFT_BUILDDIR = "build"
 UNIKRAFT_FETCHED_FILE = ".origin"
 UNIKRAFT_PREPARED_FILE = ".origin"
+UNIKRAFT_MIRRORSDIR = "mirrors"
 
 UNIKRAFT_LIB_MAKEFILE_VERSION_EXT = '_VERSION'
 UNIKRAFT_LIB_MAKEFILE_URL_EXT = '_URL'
@@ -148,11 +156,19 @@ URL_VERSION = '$VERSION'
 KRAFTRC = ".kraftrc"
 KRAFTRC_DELIMETER = "/"
 KRAFTRC_LIST_ORIGINS = "list/origins"
+KRAFTRC_LIST_TTL = "list/ttl"
+KRAFTRC_LIST_MAX_AGE = "list/max_age"
+KRAFTRC_LIST_CONCURRENCY = "list/concurrency"
+KRAFTRC_LIST_CONCURRENCY_PER_HOST = "list/concurrency_per_host"
+KRAFTRC_LIST_GITHUB_API = "list/github_api"
+KRAFTRC_LIST_GITHUB_MAX_WAIT = "list/github_max_wait"
+KRAFTRC_LIST_ENGINE = "list/engine"
 KRAFTRC_INIT_WORKDIR = "init/workdir"
 KRAFTRC_CONFIGURE_PLATFORM = "configure/platform"
 KRAFTRC_CONFIGURE_ARCHITECTURE = "configure/architecture"
 KRAFTRC_FETCH_MIRRORS = "fetch/mirrors"
 KRAFTRC_FETCH_PRIORITIZE_ORIGIN = "fetch/prioritize_origin"
+KRAFTRC_FETCH_GIT_MODE = "fetch/git_mode"
 
 KCONFIG = "CONFIG_%s"
 KCONFIG_Y = 'y'
@@ -207,3 +223,54 @@ QEMU_GUEST = 'qemu-guest'
 XEN_GUEST = 'xen-guest'
 
 LIST_DESC_WIDTH = 50
+
+# Seconds after which a cached origin is refreshed in the background, after
+# which it is refreshed before continuing, and before a failed background
+# refresh is retried.
+LIST_TTL = 60 * 60 * 24
+LIST_MAX_AGE = 60 * 60 * 24 * 7
+LIST_REFRESH_RETRY = 60 * 10
+
+# Number of repositories which are probed at the same time during an update
+LIST_CONCURRENCY = 8
+
+# Number of those which may contact the same host at the same time
+LIST_CONCURRENCY_PER_HOST = 4
+
+# Seconds after which items found during an update are written to the cache
+LIST_UPDATE_FLUSH_INTERVAL = 30
+
+# Seconds to wait for further items whilst probes of an origin are running
+LIST_UPDATE_POLL_INTERVAL = 0.1
+
+# Seconds to wait at most for GitHub's rate limit to be reset before giving up
+# on an update, and the number of requests left for other clients of a token
+LIST_GITHUB_MAX_WAIT = 60 * 15
+LIST_GITHUB_RESERVE = 10
+
+# Seconds for which the provider of an origin and the refs advertised by its
+# remote are remembered
+REMOTE_PROVIDER_TTL = 60 * 60 * 24 * 7
+REMOTE_REFS_TTL = 60
+
+# Engines which can be used to update the list of remote components
+LIST_ENGINE_THREADS = "threads"
+LIST_ENGINE_ASYNCIO = "asyncio"
+
+# Modes in which the git repositories of components are fetched: with their
+# whole history, only the commit which is checked out or without any blobs
+# other than those which are checked out
+GIT_FETCH_FULL = "full"
+GIT_FETCH_SHALLOW = "shallow"
+GIT_FETCH_PARTIAL = "partial"
+GIT_FETCH_MODES = [
+    GIT_FETCH_FULL,
+    GIT_FETCH_SHALLOW,
+    GIT_FETCH_PARTIAL,
+]
+
+# Outcomes of downloading a component: its commit was available locally, it
+# had to be fetched or fetching it failed
+DOWNLOAD_HIT = "hit"
+DOWNLOAD_FETCHED = "fetched"
+DOWNLOAD_FAILED = "failed"
@@ -63,6 +63,7 @@ class KraftContext:
     _assume_yes = False
     _dont_checkout = False
     _ignore_checkout_errors = False
+    _lockfile = None
 
     def __init__(self, verbose=False, dont_checkout=False,
                  ignore_checkout_errors=False, assume_yes=False):
@@ -180,6 +181,14 @@ class KraftContext:
         self._env = Environment.from_env_file(workdir, None)
         self._workdir = workdir
 
+    @property
+    def lockfile(self):
+        return self._lockfile
+
+    @lockfile.setter
+    def lockfile(self, lockfile=None):
+        self._lockfile = lockfile
+
     @property
     def assume_yes(self):
         return self._assume_yes
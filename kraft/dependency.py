@@ -0,0 +1,292 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+from collections import namedtuple
+from collections import OrderedDict
+
+import click
+
+from kraft.config.kconfig import infer_lib_config_name
+from kraft.config.kconfig import kconfig_dependencies
+from kraft.config.kconfig import kconfig_symbols
+from kraft.const import CONFIG_UK
+from kraft.error import KraftFileNotFound
+from kraft.manifest import ManifestVersionEquality
+from kraft.types import ComponentType
+
+
+class DependencyNode(namedtuple(
+        '_DependencyNode', [
+            'manifest',
+            'equality',
+            'version',
+            'localdir'
+        ])):
+    """
+    :param manifest: the manifest item of the component
+    :type  manifest: :class:`ManifestItem`
+    :param equality: the equality the version was given with
+    :type  equality: :class:`ManifestVersionEquality`
+    :param version: the version, distribution or constraint to retrieve
+    :type  version: string
+    :param localdir: where the component is saved to
+    :type  localdir: string
+    """
+
+    @property
+    def key(self):
+        return dependency_key(self.manifest)
+
+
+def dependency_key(manifest=None):
+    return (manifest.type.shortname, manifest.name)
+
+
+class DependencyGraph(object):
+    """
+    The dependency graph holds the components which are needed together,
+    e.g. by an application, and which of them each one depends on.  A
+    component which several others depend on is held only once, by its type
+    and name, with the version it was first added with.
+    """
+
+    _nodes = None
+    _edges = None
+
+    def __init__(self):
+        self._nodes = OrderedDict()
+        self._edges = dict()
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __iter__(self):
+        return iter(list(self._nodes.keys()))
+
+    def __contains__(self, key):
+        return key in self._nodes
+
+    def add(self, manifest=None, equality=None, version=None, localdir=None):
+        """
+        Add a component to the graph unless it is already known.
+
+        Returns:
+            bool: Whether the component was added.
+        """
+        key = dependency_key(manifest)
+        if key in self._nodes:
+            return False
+
+        self._nodes[key] = DependencyNode(manifest, equality, version, localdir)
+        self._edges[key] = OrderedDict()
+        return True
+
+    def get(self, key=None):
+        return self._nodes.get(key, None)
+
+    def depend(self, dependant=None, dependency=None):
+        """
+        Record that the component dependant depends on the component
+        dependency, both given by their key.
+        """
+        if dependant == dependency:
+            return
+
+        self._edges[dependant][dependency] = True
+
+    def dependencies(self, key=None):
+        return list(self._edges.get(key, dict()).keys())
+
+    def waves(self, keys=None):
+        """
+        Order the components in waves, each of which only depends on the
+        components of earlier waves, such that all components of a wave can
+        be retrieved at once.  Components which depend on each other in a
+        cycle are placed in the last wave.
+
+        Args:
+            keys (iterable):  The components to order.  Defaults to all.
+
+        Returns:
+            list: The lists of the keys of each wave.
+        """
+        remaining = OrderedDict(
+            (key, None) for key in (keys if keys is not None else self)
+        )
+
+        waves = list()
+        while len(remaining) > 0:
+            wave = [key for key in remaining if not any(
+                dep in remaining for dep in self._edges[key]
+            )]
+
+            if len(wave) == 0:
+                wave = list(remaining.keys())
+
+            for key in wave:
+                del remaining[key]
+
+            waves.append(wave)
+
+        return waves
+
+
+def library_symbol(name=None):
+    """
+    Returns:
+        str: The Kconfig symbol which conventionally enables a library, e.g.
+            LIBLWIP for lwip.
+    """
+    return infer_lib_config_name(name)[len("CONFIG_"):]
+
+
+class LibrarySymbols(object):
+    """
+    Find the library which defines a Kconfig symbol, first amongst the
+    libraries of a dependency graph and only then amongst every library
+    known to the cache, unless it is pinned by a lockfile.  A library is
+    recognised by the conventional symbol for its name or by the first
+    symbol its Config.uk defines.
+    """
+
+    _graph = None
+    _lockfile = None
+    _known = None
+    _defined = None
+
+    def __init__(self, graph=None, lockfile=None):
+        self._graph = graph
+        self._lockfile = lockfile
+        self._defined = dict()
+
+    def _symbols(self, manifest=None, localdir=None):
+        symbols = [library_symbol(manifest.name)]
+
+        if localdir is not None:
+            defined = self._defined.get(localdir, None)
+            if defined is None:
+                defined = kconfig_symbols(os.path.join(localdir, CONFIG_UK))[:1]
+
+                # Remember the symbols of libraries once they are downloaded
+                if len(defined) > 0:
+                    self._defined[localdir] = defined
+
+            symbols.extend(defined)
+
+        return symbols
+
+    @click.pass_context
+    def find(ctx, self, symbol=None):
+        """
+        Returns:
+            ManifestItem: The library which defines the symbol or None.
+        """
+        for key in self._graph:
+            node = self._graph.get(key)
+            if node.manifest.type == ComponentType.LIB \
+                    and symbol in self._symbols(node.manifest, node.localdir):
+                return node.manifest
+
+        if self._known is None:
+            self._known = dict()
+
+            items = list()
+            if self._lockfile is not None:
+                items.extend(self._lockfile.items(ComponentType.LIB.shortname))
+            items.extend(ctx.obj.cache.find_items_by_type(
+                ComponentType.LIB.shortname
+            ))
+
+            # Pinned libraries take precedence over those of the cache
+            for item in items:
+                localdir = item._localdir
+                if localdir is None:
+                    localdir = item.type.localdir(item.name)
+
+                for known in self._symbols(item, localdir):
+                    self._known.setdefault(known, item)
+
+        return self._known.get(symbol, None)
+
+
+def component_dependencies(manifest=None, localdir=None, find_symbol=None):
+    """
+    Determine the components which a downloaded component depends on: those
+    listed in the Kraftfile of an application, or the libraries whose
+    symbols the Config.uk of a library selects or depends on.
+
+    Args:
+        manifest (ManifestItem):  The manifest item of the component.
+        localdir (str):  Where the component was downloaded to.
+        find_symbol (callable):  Returns the manifest item of the library
+            which defines a Kconfig symbol, see LibrarySymbols.find().
+
+    Returns:
+        list: Tuples of each manifest item, equality and version which the
+            component depends on.
+    """
+    if localdir is None or not os.path.isdir(localdir):
+        return list()
+
+    dependencies = list()
+
+    if manifest.type == ComponentType.APP:
+        from kraft.app import Application
+
+        try:
+            app = Application.from_workdir(localdir)
+        except KraftFileNotFound:
+            return list()
+
+        for component in app.components:
+            if component.manifest is None:
+                continue
+
+            dependencies.append((
+                component.manifest,
+                ManifestVersionEquality.EQ,
+                component.version.version
+                if component.version is not None else None
+            ))
+
+    elif manifest.type == ComponentType.LIB and find_symbol is not None:
+        for symbol in sorted(kconfig_dependencies(
+                os.path.join(localdir, CONFIG_UK))):
+            item = find_symbol(symbol)
+            if item is not None:
+                dependencies.append((item, None, None))
+
+    return dependencies
@@ -346,6 +346,13 @@ class UnknownVersionFormatError(KraftError):
         )
 
 
+class InvalidVersionConstraint(KraftError):
+    def __init__(self, constraint):
+        super(InvalidVersionConstraint, self).__init__(
+            "Invalid version constraint: %s" % constraint
+        )
+
+
 class BumpLibraryDowngrade(KraftError):
     def __init__(self, current_version, desired_version):
         super(BumpLibraryDowngrade, self).__init__(
@@ -44,6 +44,7 @@ from kraft.cmd import cmd_menuconfig
 from kraft.cmd import cmd_prepare
 from kraft.cmd import cmd_run
 from kraft.cmd import cmd_up
+from kraft.cmd import grp_cache
 from kraft.cmd import grp_lib
 from kraft.context import KraftContext
 from kraft.logger import logger
@@ -113,3 +114,4 @@ kraft.add_command(cmd_build)
 kraft.add_command(cmd_run)
 kraft.add_command(cmd_clean)
 kraft.add_command(grp_lib)
+kraft.add_command(grp_cache)
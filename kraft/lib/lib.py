@@ -67,6 +67,8 @@ from kraft.error import NoRemoteVersionsAvailable
 from kraft.error import UnknownLibraryOriginVersion
 from kraft.error import UnknownLibraryProvider
 from kraft.logger import logger
+from kraft.manifest.version import version_key
+from kraft.manifest.version import VersionIndex
 from kraft.template import delete_template_resources_of_disabled_features
 from kraft.template import get_template_config
 from kraft.template import get_templates_path
@@ -474,7 +476,11 @@ class Library(Component):
                     except ValueError:
                         continue
 
-                latest_version = sorted(semversions, reverse=True)[0]
+                index = VersionIndex(key=version_key)
+                for checkv in semversions:
+                    index.add(checkv)
+
+                latest_version = index.latest()
 
                 # Pick the latest version
                 if fast_forward or current_not_semver:
@@ -486,35 +492,15 @@ class Library(Component):
 
                 # Find the next version
                 else:
-                    semversions = sorted(semversions)
-
-                    for i in range(len(semversions)):
-                        try:
-                            comparison = semver.compare(
-                                semversions[i],
-                                current_version
-                            )
-                        except ValueError as e:
-                            logger.warn(e)
-                            continue
-
-                        if comparison == 0:
-                            # We should have never made it this far, but because we
-                            # did, we're at the latest version.
-                            if i + 1 == len(semversions):
-                                version = latest_version
-                                break
-
-                            # Select the next version
-                            else:
-                                version = semversions[i + 1]
-                                break
+                    version = index.after(current_version)
+                    if version is None:
+                        version = latest_version
 
             # Prompt user for a version
             else:
                 version = read_user_choice(
                     'version',
-                    sorted(list(versions.keys()), reverse=True)
+                    sorted(list(versions.keys()), key=version_key, reverse=True)
                 )
 
         if version not in versions.keys():
@@ -34,9 +34,9 @@ from __future__ import unicode_literals
 
 from git import GitCommandError
 from git import Repo as GitRepo
-from git.cmd import Git as GitCmd
 
 from .provider import LibraryProvider
+from kraft.cache import remote_cache
 from kraft.const import GIT_BRANCH_PATTERN
 from kraft.const import GIT_TAG_PATTERN
 from kraft.const import GIT_UNIKRAFT_TAG_PATTERN
@@ -64,18 +64,16 @@ def git_probe_remote_versions(origin_url=None):  # noqa: C901
     if origin_url.startswith("file://"):
         origin_url = origin_url[7:]
 
-    g = GitCmd()
-
     logger.debug("Probing remote git repository: %s..." % origin_url)
 
     try:
-        g.ls_remote(origin_url)
+        remote_refs = remote_cache().ls_remote(origin_url)
 
     except GitCommandError as e:
         logger.fatal("Could not connect to repository: %s" % str(e))
         return versions
 
-    for refs in g.ls_remote(origin_url).split('\n'):
+    for refs in remote_refs.split('\n'):
         hash_ref_list = refs.split('\t')
 
         # Empty repository
@@ -128,7 +126,7 @@ class GitLibraryProvider(LibraryProvider):
             pass
 
         try:
-            GitCmd().ls_remote(origin_url)
+            remote_cache().ls_remote(origin_url)
             return True
 
         except Exception:
@@ -38,6 +38,7 @@ from .git import GitLibraryProvider
 from .github import GitHubLibraryProvider
 from .sourceforge import SourceForgeLibraryProvider
 from .tarball import TarballLibraryProvider
+from kraft.cache import remote_cache
 
 
 def determine_lib_provider(origin_url=None):
@@ -46,8 +47,15 @@ def determine_lib_provider(origin_url=None):
     if origin_url is None:
         return provider
 
+    # Re-use the provider this origin was classified with before
+    name = remote_cache().provider("lib", origin_url)
+    for _, member in LibraryProviderType.__members__.items():
+        if member.name == name:
+            return member.cls
+
     for _, member in LibraryProviderType.__members__.items():
         if member.is_type(origin_url):
+            remote_cache().set_provider("lib", origin_url, member.name)
             return member.cls
 
     return provider
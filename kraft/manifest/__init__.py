@@ -32,6 +32,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+from .manifest import epoch_seconds  # noqa: F401
 from .manifest import maniest_from_name  # noqa: F401
 from .manifest import Manifest  # noqa: F401
 from .manifest import manifest_from_localdir  # noqa: F401
@@ -40,3 +41,8 @@ from .manifest import ManifestItem  # noqa: F401
 from .manifest import ManifestItemDistribution  # noqa: F401
 from .manifest import ManifestItemVersion  # noqa: F401
 from .manifest import ManifestVersionEquality  # noqa: F401
+from .manifest import resolve_version  # noqa: F401
+from .manifest import version_spec  # noqa: F401
+from .version import version_key  # noqa: F401
+from .version import VersionConstraint  # noqa: F401
+from .version import VersionIndex  # noqa: F401
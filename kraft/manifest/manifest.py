@@ -36,6 +36,7 @@ from __future__ import unicode_literals
 import os
 import pickle
 import sys
+import time
 import threading
 import uuid
 from datetime import datetime
@@ -43,7 +44,6 @@ from enum import Enum
 
 import click
 import dateutil.parser
-import semver
 import six
 
 from kraft.const import UNIKRAFT_RELEASE_STABLE
@@ -52,11 +52,60 @@ from kraft.error import KraftError
 from kraft.error import UnknownVersionError
 from kraft.error import UnknownVersionFormatError
 from kraft.logger import logger
+from kraft.manifest.version import CONSTRAINT_OPERATORS
+from kraft.manifest.version import version_key
+from kraft.manifest.version import VersionConstraint
+from kraft.manifest.version import VersionIndex
+
+
+# Serialises the loading of the distributions of manifest items, which do not
+# each keep a lock so as to remain compact
+MANIFEST_ITEM_LOADER_LOCK = threading.Lock()
+
+
+def _intern(value=None):
+    # Names such as "stable", "lib" or "github" repeat across every item
+    if isinstance(value, six.string_types):
+        return sys.intern(value)
+    return value
+
+
+def epoch_seconds(value=None):
+    """
+    Convert a point in time to whole seconds since the epoch, which is how
+    manifests keep timestamps until they are displayed.
+
+    Args:
+        value (int, float, str, datetime):  The point in time, including
+            dates formatted as strings by older caches.
+
+    Returns:
+        int: The seconds since the epoch or None.
+    """
+    # Older states stored missing dates as the string "None"
+    if value is None or value == "None":
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    try:
+        return int(value)
+    except ValueError:
+        return int(dateutil.parser.parse(value).timestamp())
+
+
+def _datetime_or_none(epoch=None):
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch)
 
 
 class ManifestVersionEquality(Enum):
     EQ = ("==", "@")
     GT = (">=", "^")
+    RANGE = ("~",)
 
     @classmethod
     def split(cls, name=None):
@@ -88,57 +137,77 @@ class ManifestVersionEquality(Enum):
 
 
 class ManifestItemVersion(object):
-    _version = None
+    __slots__ = (
+        "_version",
+        "_git_sha",
+        "_timestamp",
+        "_tarball",
+        "_tarball_size",
+        "_tarball_checksum",
+        "_key",
+    )
+
     @property
     def version(self): return self._version
 
-    _git_sha = None
     @property
     def git_sha(self): return self._git_sha
 
-    _timestamp = None
     @property
-    def timestamp(self): return self._timestamp
+    def timestamp(self):
+        """
+        When the version was made, as a local time.
+        """
+        return _datetime_or_none(self._timestamp)
+
+    @property
+    def epoch(self):
+        """
+        When the version was made, in seconds since the epoch.
+        """
+        return self._timestamp
 
-    _tarball = None
     @property
     def tarball(self): return self._tarball
 
-    _tarball_size = None
     @property
     def tarball_size(self): return self._tarball_size
 
-    _tarball_checksum = None
     @property
     def tarball_checksum(self): return self._tarball_checksum
 
+    @property
+    def key(self):
+        """
+        The key by which versions are ordered, parsed only once.
+        """
+        if self._key is None:
+            self._key = version_key(self._version, self._timestamp)
+        return self._key
+
     def __init__(self, **kwargs):
         self._version = kwargs.get('version', None)
         self._git_sha = kwargs.get('git_sha', None)
-        self._timestamp = kwargs.get('timestamp', None)
-        if self._timestamp is not None and isinstance(self._timestamp, six.string_types):
-            self._timestamp = dateutil.parser.parse(self._timestamp)
+        self._timestamp = epoch_seconds(kwargs.get('timestamp', None))
         self._tarball = kwargs.get('tarball', None)
         self._tarball_size = kwargs.get('tarball_size', None)
         self._tarball_checksum = kwargs.get('tarball_checksum', None)
+        self._key = None
 
     def __str__(self):
         return self._version
 
     def __setstate__(self, state):
-        if "meta" in state:
-            meta = state["meta"]
-            self._version = meta.get("name", None)
-
-        if "data" in state:
-            data = state["data"]
-            self._git_sha = data.get("git_sha", None)
-            self._timestamp = data.get("timestamp", None)
-            if self._timestamp is not None and isinstance(self._timestamp, six.string_types):
-                self._timestamp = dateutil.parser.parse(self._timestamp)
-            self._tarball = data.get("tarball", None)
-            self._tarball_size = data.get("tarball_size", None)
-            self._tarball_checksum = data.get("tarball_checksum", None)
+        meta = state.get("meta", dict())
+        data = state.get("data", dict())
+
+        self._version = meta.get("name", None)
+        self._git_sha = data.get("git_sha", None)
+        self._timestamp = epoch_seconds(data.get("timestamp", None))
+        self._tarball = data.get("tarball", None)
+        self._tarball_size = data.get("tarball_size", None)
+        self._tarball_checksum = data.get("tarball_checksum", None)
+        self._key = None
 
     def repr(self):
         return self._version
@@ -153,7 +222,7 @@ class ManifestItemVersion(object):
             },
             "data": {
                 "git_sha": self._git_sha,
-                "timestamp": str(self._timestamp),
+                "timestamp": self._timestamp,
                 "tarball": self._tarball,
                 "tarball_size": self._tarball_size,
                 "tarball_checksum": self._tarball_checksum
@@ -162,35 +231,42 @@ class ManifestItemVersion(object):
 
 
 class ManifestItemDistribution(object):
-    _name = None
+    __slots__ = (
+        "_name",
+        "_manifest",
+        "_manifest_checksum",
+        "_latest",
+        "_versions",
+        "_index",
+    )
+
     @property
     def name(self): return self._name
 
-    _manifest = None
     @property
     def manifest(self): return self._manifest
 
-    _manifest_checksum = None
     @property
     def manifest_checksum(self): return self._manifest_checksum
 
-    _latest = None
     @property
     def latest(self):
-        # Pick the latest version if we have known versions, ordered by semver
-        if self._latest is None and \
-                self._versions is not None and \
-                len(self._versions) > 0:
-            self._latest = self.versions[
-                sorted(self._versions.keys(), reverse=True)[0]
-            ]
+        # Pick the highest known version unless the latest was set explicitly
+        if self._latest is None and self._index is not None:
+            self._latest = self._index.latest()
 
         return self._latest
 
-    _versions = None
     @property
     def versions(self): return self._versions
 
+    @property
+    def index(self):
+        """
+        The known versions in ascending order, see VersionIndex.
+        """
+        return self._index
+
     @latest.setter
     def latest(self, version=None):
         if version is None:
@@ -198,19 +274,18 @@ class ManifestItemDistribution(object):
         if not isinstance(version, ManifestItemVersion):
             raise TypeError("expected ManifestItemVersion")
 
-        self._latest = version.version
+        self._latest = version
 
     def __init__(self, **kwargs):
         self._manifest = kwargs.get('manifest', None)
         self._manifest_checksum = kwargs.get('manifest_checksum', None)
-        self._name = kwargs.get('name', None)
+        self._name = _intern(kwargs.get('name', None))
+        self._latest = None
+        self._versions = dict()
+        self._index = VersionIndex()
         self.latest = kwargs.get('latest', None)
 
-        if self.latest is not None \
-            and not isinstance(self.latest, ManifestItemDistribution):
-            raise TypeError("expected ManifestItemDistribution")
-
-        elif kwargs.get("latest_version", None) is not None:
+        if kwargs.get("latest_version", None) is not None:
             self._latest = ManifestItemVersion(
                 git_sha=kwargs["latest_git_sha"],
                 version=kwargs["latest_version"],
@@ -220,8 +295,6 @@ class ManifestItemDistribution(object):
                 tarball_checksum=kwargs.get("latest_tarball_checksum", None)
             )
 
-        self._versions = dict()
-
     def add_version(self, version=None):
         if isinstance(version, list):
             for i in version:
@@ -231,30 +304,12 @@ class ManifestItemDistribution(object):
         if not isinstance(version, ManifestItemVersion):
             raise TypeError("expected ManifestItemVersion")
 
-        if version.version not in self.versions.keys():
+        if version.version not in self._versions:
             self._versions[version.version] = version
+            self._index.add(version)
 
-        if self._latest is None:
+        if self._latest is None or version.key > self._latest.key:
             self._latest = version
-            return
-
-        # This accounts for the fact that some unikraft releases are not
-        # corresponding to semver, e.g. 0.4, and so we add an extra .0:
-        current_version = version.version
-        if current_version.count('.') == 1:
-            current_version += ".0"
-
-        latest_version = self._latest.version
-        if latest_version.count('.') == 1:
-            latest_version += ".0"
-
-        try:
-            if semver.compare(current_version, latest_version) > 0:
-                self._latest = version
-
-        # If not a semantic version, maybe it's a commit sha
-        except ValueError:
-            pass
 
     def get_version(self, version=None):
         if version in self._versions.keys():
@@ -262,31 +317,33 @@ class ManifestItemDistribution(object):
         return None
 
     def __setstate__(self, state):
-        if "meta" in state:
-            meta = state["meta"]
-            self._name = meta.get("name", None)
-            self._manifest = meta.get("manifest", None)
-            self._manifest_checksum = meta.get("manifest_checksum", None)
+        meta = state.get("meta", dict())
+        data = state.get("data", dict())
 
-        if "data" in state:
-            data = state["data"]
-            if data.get("latest_version", None) is not None:
-                self._latest = ManifestItemVersion(
-                    git_sha=data["latest_git_sha"],
-                    version=data["latest_version"],
-                    timestamp=data.get("latest_timestamp", None),
-                    tarball=data.get("latest_tarball", None),
-                    tarball_size=data.get("latest_tarball_size", None),
-                    tarball_checksum=data.get("latest_tarball_checksum", None)
-                )
-
-            versions = data.get("versions", None)
-            if versions is not None:
-                self._versions = dict()
-                for d in versions:
-                    version = ManifestItemVersion()
-                    version.__setstate__(versions[d])
-                    self._versions[d] = version
+        self._name = _intern(meta.get("name", None))
+        self._manifest = meta.get("manifest", None)
+        self._manifest_checksum = meta.get("manifest_checksum", None)
+        self._latest = None
+        self._versions = dict()
+        self._index = VersionIndex()
+
+        if data.get("latest_version", None) is not None:
+            self._latest = ManifestItemVersion(
+                git_sha=data["latest_git_sha"],
+                version=data["latest_version"],
+                timestamp=data.get("latest_timestamp", None),
+                tarball=data.get("latest_tarball", None),
+                tarball_size=data.get("latest_tarball_size", None),
+                tarball_checksum=data.get("latest_tarball_checksum", None)
+            )
+
+        versions = data.get("versions", None)
+        if versions is not None:
+            for d in versions:
+                version = ManifestItemVersion()
+                version.__setstate__(versions[d])
+                self._versions[d] = version
+                self._index.add(version)
 
     def __getstate__(self):
         """
@@ -296,9 +353,9 @@ class ManifestItemDistribution(object):
         if self._latest is not None:
             data["latest_git_sha"] = self._latest.git_sha
             data["latest_version"] = self._latest.version
-            data["latest_timestamp"] = str(self._latest.timestamp)
+            data["latest_timestamp"] = self._latest.epoch
             data["latest_tarball"] = self._latest.tarball
-            data["latest_tarball_size "] = self._latest.tarball_size
+            data["latest_tarball_size"] = self._latest.tarball_size
             data["latest_tarball_checksum"] = self._latest.tarball_checksum
 
         if len(self._versions) > 0:
@@ -317,15 +374,27 @@ class ManifestItemDistribution(object):
 
 
 class ManifestItem(object):
-    _name = None
+    __slots__ = (
+        "_name",
+        "_description",
+        "_type",
+        "_manifest",
+        "_manifest_checksum",
+        "_dists",
+        "_loader",
+        "_git",
+        "_last_checked",
+        "_fingerprint",
+        "_provider",
+        "_localdir",
+    )
+
     @property
     def name(self): return self._name
 
-    _description = None
     @property
     def description(self): return self._description
 
-    _type = None
     @property
     def type(self):
         if self._type is not None and isinstance(self._type, six.string_types):
@@ -335,27 +404,52 @@ class ManifestItem(object):
                 self._type = type
         return self._type
 
-    _manifest = None
     @property
     def manifest(self): return self._manifest
 
-    _manifest_checksum = None
     @property
     def manifest_checksum(self): return self._manifest_checksum
 
-    _dists = None
     @property
-    def dists(self): return self._dists
+    def dists(self):
+        """
+        The distributions of the item, which a loader may only provide once
+        they are first accessed, e.g. when the item was found in the cache.
+        """
+        if self._dists is None:
+            with MANIFEST_ITEM_LOADER_LOCK:
+                if self._dists is None:
+                    loader = self._loader
+                    self._dists = loader(self) if loader is not None else dict()
+                    self._loader = None
+
+        return self._dists
 
-    _git = None
     @property
     def git(self): return self._git
 
-    _last_checked = None
     @property
-    def last_checked(self): return self._last_checked
+    def last_checked(self):
+        """
+        When the item was last checked against its remote, as a local time.
+        """
+        return _datetime_or_none(self._last_checked)
+
+    @property
+    def last_checked_epoch(self):
+        """
+        When the item was last checked, in seconds since the epoch.
+        """
+        return self._last_checked
+
+    @property
+    def fingerprint(self):
+        """
+        A cheap marker of the state of the remote repository, e.g. the time it
+        was last pushed to, which changes whenever it must be probed again.
+        """
+        return self._fingerprint
 
-    _provider = None
     @property
     def provider(self):
         if self._provider is not None and isinstance(self._provider, six.string_types):
@@ -365,7 +459,6 @@ class ManifestItem(object):
                 self._provider = provider
         return self._provider
 
-    _localdir = None
     @property
     def localdir(self):
         """
@@ -383,15 +476,31 @@ class ManifestItem(object):
 
     def __init__(self, **kwargs):
         self._name = kwargs.get('name', None)
-        self._type = kwargs.get('type', None)
+        self._type = _intern(kwargs.get('type', None))
         self._description = kwargs.get('description', None)
         self._dists = kwargs.get('dists', dict())
+        self._loader = kwargs.get('loader', None)
         self._git = kwargs.get('git', None)
-        self._last_checked = kwargs.get('last_checked', datetime.now())
-        self._provider = kwargs.get('provider', None)
+        self._last_checked = epoch_seconds(kwargs.get('last_checked', time.time()))
+        self._provider = _intern(kwargs.get('provider', None))
         self._manifest = kwargs.get('manifest', None)
         self._manifest_checksum = kwargs.get('manifest_checksum', None)
         self._localdir = kwargs.get('localdir', None)
+        self._fingerprint = kwargs.get('fingerprint', None)
+
+    def touch(self, last_checked=None):
+        """
+        Record that the item was checked against its remote without having
+        to be probed again.
+
+        Args:
+            last_checked (datetime, int):  When the item was checked.
+                Defaults to now.
+        """
+        if last_checked is None:
+            last_checked = time.time()
+
+        self._last_checked = epoch_seconds(last_checked)
 
     def add_distribution(self, dist=None):
         """
@@ -411,148 +520,93 @@ class ManifestItem(object):
             raise TypeError("expected ManifestItemDistribution")
 
         if dist.name not in self.dists.keys():
-            self._dists[dist.name] = dist
+            self.dists[dist.name] = dist
 
     def get_distribution(self, dist=None):
-        if dist in self._dists.keys():
-            return self._dists[dist]
+        if dist in self.dists.keys():
+            return self.dists[dist]
         return None
 
     def get_version(self, version=None):
-        if version in self._dists.keys():
-            return self._dists[version].latest
+        dists = self.dists
+        if version in dists.keys():
+            return dists[version].latest
 
-        for dist in self._dists.keys():
-            if version in self._dists[dist].versions.keys():
-                return self._dists[dist].get_version(version)
+        for dist in dists.keys():
+            if version in dists[dist].versions.keys():
+                return dists[dist].get_version(version)
 
         return None
 
     @click.pass_context
     def download(ctx, self, localdir=None, equality=ManifestVersionEquality.EQ,
-            version=None, use_git=False, override_existing=False):
-        dist = None
-
-        # This accounts for the fact that some unikraft releases are not
-        # corresponding to semver, e.g. 0.4, and so we add an extra .0:
-        version_semver = version
-        if version is not None and version.count('.') == 1:
-            version_semver += ".0"
-
-        # Select the distribution's latest if only the distribution is known
-        if version is not None and version in self._dists:
-            dist = self._dists[version]
-            version = dist.latest
-
-        # Find the distribution based on the version
-        elif version is not None and dist is None:
-            for d in self._dists:
-                if equality == ManifestVersionEquality.EQ:
-                    if version in self._dists[d].versions:
-                        dist = self._dists[d]
-                        version = dist.versions[version]
-                        break
-
-                else:
-                    for v in self._dists[d].versions:
-                        # This accounts for the fact that some unikraft releases
-                        # are not corresponding to semver, e.g. 0.4, and so we
-                        # add an extra .0:
-                        curr_semver = v
-                        if curr_semver.count('.') == 1:
-                            curr_semver += ".0"
-
-                        try:
-                            # This will ALSO select the distribution, based on
-                            # whether the version matches or not. BE CAREFUL!
-                            # e.g. staging@0.5 > stable@0.4
-                            if semver.compare(curr_semver, version_semver) >= 0:
-                                version_semver = curr_semver
-                                dist = self._dists[d]
-                                version = dist.versions[v]
-
-                                # don't break here, keep iterating to find
-                                # bigger and better versions.
-
-                        # If not a semantic version, maybe it's a commit sha
-                        except ValueError:
-                            pass
-
-        # Set stable as the default distribution and choose its latest version
-        elif UNIKRAFT_RELEASE_STABLE in self._dists:
-            dist = self._dists[UNIKRAFT_RELEASE_STABLE]
-            version = dist.latest
-
-        # If there is only one distribution, pick it
-        elif len(self._dists) == 1:
-            dist_name = next(iter(self._dists))
-            dist = self._dists[dist_name]
-            version = dist.latest
-
-        # Unknown version
-        if dist is None or version is None:
-            raise UnknownVersionError(version, self)
+            version=None, use_git=False, override_existing=False,
+            fetch_mode=None):
+        _, version = resolve_version(self, version, equality)
+
+        if fetch_mode is None:
+            fetch_mode = ctx.obj.settings.fetch_git_mode
 
         if localdir is None:
             localdir = self.type.localdir(self.name)
 
         provider = self.provider.cls()
-        provider.download(
+        return provider.download(
             manifest=self,
             localdir=localdir,
             version=version,
             use_git=use_git,
-            override_existing=override_existing
+            override_existing=override_existing,
+            fetch_mode=fetch_mode
         )
 
     def __str__(self):
         return "%s/%s" % (self.type.shortname, self.name)
 
     def __setstate__(self, state):
-        if "meta" in state:
-            meta = state["meta"]
-            self._name = meta.get("name", None)
-            self._manifest = meta.get("manifest", None)
-            self._manifest_checksum = meta.get("manifest_checksum", None)
-            self._last_checked = meta.get("last_checked", None)
-            if self._last_checked is not None:
-                self._last_checked = dateutil.parser.parse(self._last_checked)
-            self._provider = meta.get("provider", None)
-
-        if "data" in state:
-            data = state["data"]
-            self._description = data.get("description", None)
-            self._type = data.get("type", None)
-
-            dists = data.get("dists", None)
-            if dists is not None:
-                self._dists = dict()
-                for d in dists:
-                    dist = ManifestItemDistribution()
-                    dist.__setstate__(dists[d])
-                    self._dists[d] = dist
-
-            self._git = data.get("git", None)
+        meta = state.get("meta", dict())
+        data = state.get("data", dict())
+
+        self._name = meta.get("name", None)
+        self._manifest = meta.get("manifest", None)
+        self._manifest_checksum = meta.get("manifest_checksum", None)
+        self._last_checked = epoch_seconds(meta.get("last_checked", None))
+        self._provider = _intern(meta.get("provider", None))
+        self._fingerprint = meta.get("fingerprint", None)
+        self._localdir = None
+
+        self._description = data.get("description", None)
+        self._type = _intern(data.get("type", None))
+        self._git = data.get("git", None)
+        self._dists = dict()
+        self._loader = None
+
+        dists = data.get("dists", None)
+        if dists is not None:
+            for d in dists:
+                dist = ManifestItemDistribution()
+                dist.__setstate__(dists[d])
+                self._dists[d] = dist
 
     def __getstate__(self):
         """
         Return state values to be pickled.
         """
-        from kraft.cmd.list.provider.types import ListProviderType
         return {
             "meta": {
                 "name": self._name,
                 "manifest": self._manifest,
                 "manifest_checksum": self._manifest_checksum,
-                "last_checked": str(self._last_checked),
-                "provider": self.provider.name,
-                "localdir": self.localdir
+                "last_checked": self._last_checked,
+                "provider": self.provider.name if self.provider is not None else None,
+                "localdir": self._localdir,
+                "fingerprint": self._fingerprint
             },
             "data": {
                 "description": self._description,
                 "type": self.type.shortname,
                 "dists": {
-                    d: self._dists[d].__getstate__() for d in self._dists
+                    d: dist.__getstate__() for d, dist in self.dists.items()
                 },
                 "git": self._git
             }
@@ -620,6 +674,96 @@ class Manifest(object):
         }
 
 
+def version_spec(version=None, equality=ManifestVersionEquality.EQ):
+    """
+    Join a version and the equality it was given with, e.g. by
+    break_component_naming_format(), back into a single version or
+    constraint.
+
+    Returns:
+        str: The version, distribution or constraint.
+    """
+    if isinstance(version, ManifestItemVersion):
+        version = version.version
+
+    if version is None or equality is None \
+            or equality == ManifestVersionEquality.EQ \
+            or version.strip().startswith(CONSTRAINT_OPERATORS):
+        return version
+
+    return equality.value[0] + version
+
+
+def preferred_distributions(item=None):
+    """
+    Returns:
+        list: The distributions of the item in the order in which versions are
+            looked for: stable, staging and then the others by name.
+    """
+    order = [UNIKRAFT_RELEASE_STABLE, UNIKRAFT_RELEASE_STAGING]
+    return [item.dists[name] for name in sorted(
+        item.dists.keys(),
+        key=lambda name: (order.index(name) if name in order else len(order), name)
+    )]
+
+
+def resolve_version(item=None, version=None,
+                    equality=ManifestVersionEquality.EQ):
+    """
+    Resolve the version of a manifest item to use, which may be given as a
+    version, the name of a distribution, a constraint such as ">=0.5,<0.7"
+    or not at all.  Distributions are considered in a fixed order, such that
+    a version is only ever taken from another distribution if none of the
+    preferred ones has one which matches.
+
+    Args:
+        item (ManifestItem):  The manifest item.
+        version (str):  The version, distribution or constraint.
+        equality (ManifestVersionEquality):  The equality the version was
+            given with.
+
+    Returns:
+        tuple: The distribution and the version.
+
+    Raises:
+        UnknownVersionError: If no version matches.
+        InvalidVersionConstraint: If the constraint cannot be parsed.
+    """
+    spec = version_spec(version, equality)
+    dists = preferred_distributions(item)
+
+    # The latest version of the stable, staging or only distribution
+    if spec is None:
+        for dist in dists:
+            if dist.name in (UNIKRAFT_RELEASE_STABLE, UNIKRAFT_RELEASE_STAGING) \
+                    or len(dists) == 1:
+                if dist.latest is not None:
+                    return dist, dist.latest
+
+    # The latest version of the distribution
+    elif spec in item.dists:
+        dist = item.dists[spec]
+        if dist.latest is not None:
+            return dist, dist.latest
+
+    # The highest version within the constraint
+    elif VersionConstraint.is_constraint(spec):
+        constraint = VersionConstraint(spec)
+        for dist in dists:
+            found = constraint.select(dist.index)
+            if found is not None:
+                return dist, found
+
+    # The exact version
+    else:
+        for dist in dists:
+            found = dist.get_version(spec)
+            if found is not None:
+                return dist, found
+
+    raise UnknownVersionError(spec, item)
+
+
 class ManifestIndex(object):
     _index = dict()
     @property
@@ -637,34 +781,19 @@ class ManifestIndex(object):
 def maniest_from_name(ctx, name=None):
     from kraft.types import break_component_naming_format
 
-    components = list()
     if name is None:
-        return components
+        return list()
 
     type, name, _, _ = break_component_naming_format(name)
 
-    for manifest_origin in ctx.obj.cache.all():
-        manifest = ctx.obj.cache.get(manifest_origin)
-
-        for _, component in manifest.items():
-            if (type is None or \
-                    (type is not None \
-                        and type == component.type)) \
-                    and component.name == name:
-                components.append(component)
-
-    return components
+    return ctx.obj.cache.find_items_by_name(
+        type=type.shortname if type is not None else None,
+        name=name
+    )
 
 @click.pass_context
 def manifest_from_localdir(ctx, localdir=None):
     if localdir is None or not os.path.isdir(localdir):
         return None
 
-    for manifest_origin in ctx.obj.cache.all():
-        manifest = ctx.obj.cache.get(manifest_origin)
-
-        for _, component in manifest.items():
-            if component.localdir == localdir:
-                return component
-
-    return None
+    return ctx.obj.cache.find_item_by_localdir(localdir)
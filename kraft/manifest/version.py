@@ -0,0 +1,325 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import re
+from bisect import bisect_left
+from bisect import bisect_right
+
+import semver
+
+from kraft.error import InvalidVersionConstraint
+
+DATE_VERSION_PATTERN = re.compile(r'^(\d{4})[.-]?(\d{2})[.-]?(\d{2})$')
+
+# Versions of a kind rank above all versions of the kinds before it
+VERSION_RANK_OTHER = 0
+VERSION_RANK_DATE = 1
+VERSION_RANK_SEMVER = 2
+
+
+def parse_semver(version=None):
+    """
+    Parse a semantic version, accounting for the fact that some unikraft
+    releases are not semantic versions, e.g. 0.4 or v0.4.0.
+
+    Returns:
+        semver.VersionInfo: The parsed version or None if it is not one.
+    """
+    if version is None:
+        return None
+
+    if version.startswith("v"):
+        version = version[1:]
+
+    if version.count('.') == 1:
+        version += ".0"
+
+    try:
+        return semver.VersionInfo.parse(version)
+    except ValueError:
+        return None
+
+
+def version_key(version=None, timestamp=None):
+    """
+    Parse a version into a key by which versions are ordered: semantic
+    versions above date tags above anything else, e.g. commit SHAs, which
+    are ordered by the time of the commit, if known.
+
+    Args:
+        version (str):  The version.
+        timestamp (int, datetime):  When the version was made, e.g. in
+            seconds since the epoch.
+
+    Returns:
+        tuple: The key of the version.
+    """
+    parsed = parse_semver(version)
+    if parsed is not None:
+        return (VERSION_RANK_SEMVER, parsed)
+
+    date = DATE_VERSION_PATTERN.match(version or "")
+    if date is not None:
+        return (VERSION_RANK_DATE, tuple(int(g) for g in date.groups()))
+
+    seconds = 0
+    if isinstance(timestamp, (int, float)):
+        seconds = timestamp
+    elif timestamp is not None:
+        try:
+            seconds = timestamp.timestamp()
+        except (AttributeError, OverflowError, ValueError):
+            pass
+
+    return (VERSION_RANK_OTHER, seconds, version or "")
+
+
+class VersionIndex(object):
+    """
+    The versions of a distribution in ascending order of their keys, such
+    that the latest version, the first version at least or after another
+    one and ranges of versions are found by bisection.
+    """
+
+    def __init__(self, key=None):
+        """
+        Args:
+            key (callable):  Returns the key of a version.  Defaults to the
+                key property of ManifestItemVersion.
+        """
+        self._key = key if key is not None else (lambda v: v.key)
+        self._keys = list()
+        self._versions = list()
+
+    def __len__(self):
+        return len(self._versions)
+
+    def __iter__(self):
+        return iter(self._versions)
+
+    def key(self, version=None):
+        """
+        Returns:
+            tuple: The key of the version, see version_key().
+        """
+        return self._key(version)
+
+    def add(self, version=None):
+        key = self._key(version)
+        i = bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._versions.insert(i, version)
+
+    def latest(self):
+        """
+        Returns:
+            The version with the highest key or None if there are none.
+        """
+        if len(self._versions) == 0:
+            return None
+
+        return self._versions[-1]
+
+    def at_least(self, version=None):
+        """
+        Returns:
+            list: The versions at least as high as the provided one.
+        """
+        return self._versions[bisect_left(self._keys, version_key(version)):]
+
+    def after(self, version=None):
+        """
+        Returns:
+            The next version after the provided one or None if there is none.
+        """
+        i = bisect_right(self._keys, version_key(version))
+        if i >= len(self._versions):
+            return None
+
+        return self._versions[i]
+
+    def range(self, lower=None, upper=None, lower_inclusive=True,
+              upper_inclusive=False):
+        """
+        Args:
+            lower (str):  The lower bound, or None if there is none.
+            upper (str):  The upper bound, or None if there is none.
+            lower_inclusive (bool):  Whether the lower bound is included.
+            upper_inclusive (bool):  Whether the upper bound is included.
+
+        Returns:
+            list: The versions within the bounds in ascending order.
+        """
+        start = 0
+        if lower is not None:
+            bisect = bisect_left if lower_inclusive else bisect_right
+            start = bisect(self._keys, version_key(lower))
+
+        end = len(self._versions)
+        if upper is not None:
+            bisect = bisect_right if upper_inclusive else bisect_left
+            end = bisect(self._keys, version_key(upper))
+
+        return self._versions[start:end]
+
+
+# The operators of version constraints, longest first such that e.g. >= is
+# not mistaken for >.  As with ManifestVersionEquality, ^ means >=.
+CONSTRAINT_OPERATORS = (">=", "<=", "==", "!=", ">", "<", "~", "^")
+
+# The bounds set by each operator and whether they are inclusive
+CONSTRAINT_LOWER_BOUNDS = {">=": True, "^": True, "==": True, "~": True, ">": False}
+CONSTRAINT_UPPER_BOUNDS = {"<=": True, "==": True, "<": False}
+
+
+class VersionConstraint(object):
+    """
+    A constraint on semantic versions made of comma-separated clauses, all of
+    which must hold, e.g. ">=0.5,<0.7".  A tilde allows any later version of
+    the same minor release, or of the same major release if only the major
+    version is given, e.g. "~0.6" means ">=0.6,<0.7".
+    """
+
+    _spec = None
+    @property
+    def spec(self): return self._spec
+
+    def __init__(self, spec=None):
+        self._spec = spec
+        self._lower = None
+        self._lower_inclusive = True
+        self._upper = None
+        self._upper_inclusive = True
+        self._excluded = list()
+
+        if spec is None or len(spec.strip()) == 0:
+            raise InvalidVersionConstraint(spec)
+
+        for clause in spec.split(","):
+            self._add_clause(clause.strip(), spec)
+
+    def __str__(self):
+        return self._spec
+
+    @classmethod
+    def is_constraint(cls, spec=None):
+        """
+        Returns:
+            bool: Whether the version is a constraint rather than the name of
+                a version or distribution.
+        """
+        if spec is None:
+            return False
+
+        return "," in spec or spec.strip().startswith(CONSTRAINT_OPERATORS)
+
+    def _add_clause(self, clause=None, spec=None):
+        operator = None
+        for op in CONSTRAINT_OPERATORS:
+            if clause.startswith(op):
+                operator = op
+                break
+
+        version = clause[len(operator):].strip() if operator else clause
+
+        # Allow only the major version to be given, e.g. ~1
+        major_only = version.lstrip("v").isdigit()
+        if major_only:
+            version += ".0"
+
+        parsed = parse_semver(version)
+        if operator is None or parsed is None:
+            raise InvalidVersionConstraint(spec)
+
+        if operator in CONSTRAINT_LOWER_BOUNDS:
+            self._tighten_lower(version, CONSTRAINT_LOWER_BOUNDS[operator])
+        if operator in CONSTRAINT_UPPER_BOUNDS:
+            self._tighten_upper(version, CONSTRAINT_UPPER_BOUNDS[operator])
+        if operator == "!=":
+            self._excluded.append(version_key(version))
+
+        if operator == "~":
+            if major_only:
+                upper = "%d.0.0" % (parsed.major + 1)
+            else:
+                upper = "%d.%d.0" % (parsed.major, parsed.minor + 1)
+
+            self._tighten_upper(upper, False)
+
+    def _tighten_lower(self, version=None, inclusive=True):
+        key = version_key(version)
+        if self._lower is not None:
+            current = version_key(self._lower)
+            if key < current or (key == current and inclusive):
+                return
+
+        self._lower = version
+        self._lower_inclusive = inclusive
+
+    def _tighten_upper(self, version=None, inclusive=True):
+        key = version_key(version)
+        if self._upper is not None:
+            current = version_key(self._upper)
+            if key > current or (key == current and inclusive):
+                return
+
+        self._upper = version
+        self._upper_inclusive = inclusive
+
+    def select(self, index=None):
+        """
+        Select the highest semantic version of the index which satisfies the
+        constraint.
+
+        Args:
+            index (VersionIndex):  The versions to select from.
+
+        Returns:
+            The highest matching version or None if none match.
+        """
+        candidates = index.range(
+            lower=self._lower,
+            upper=self._upper,
+            lower_inclusive=self._lower_inclusive,
+            upper_inclusive=self._upper_inclusive
+        )
+
+        for version in reversed(candidates):
+            key = index.key(version)
+            if key[0] != VERSION_RANK_SEMVER:
+                break
+            if key not in self._excluded:
+                return version
+
+        return None
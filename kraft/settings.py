@@ -39,11 +39,27 @@ import dpath.util
 import toml
 from toml import TomlEncoder
 
+from kraft.const import GIT_FETCH_FULL
+from kraft.const import GITHUB_API_AUTO
 from kraft.const import KRAFTRC_CONFIGURE_ARCHITECTURE
 from kraft.const import KRAFTRC_CONFIGURE_PLATFORM
+from kraft.const import KRAFTRC_FETCH_GIT_MODE
 from kraft.const import KRAFTRC_FETCH_MIRRORS
 from kraft.const import KRAFTRC_FETCH_PRIORITIZE_ORIGIN
+from kraft.const import KRAFTRC_LIST_CONCURRENCY
+from kraft.const import KRAFTRC_LIST_CONCURRENCY_PER_HOST
+from kraft.const import KRAFTRC_LIST_ENGINE
+from kraft.const import KRAFTRC_LIST_GITHUB_API
+from kraft.const import KRAFTRC_LIST_GITHUB_MAX_WAIT
+from kraft.const import KRAFTRC_LIST_MAX_AGE
 from kraft.const import KRAFTRC_LIST_ORIGINS
+from kraft.const import KRAFTRC_LIST_TTL
+from kraft.const import LIST_CONCURRENCY
+from kraft.const import LIST_CONCURRENCY_PER_HOST
+from kraft.const import LIST_ENGINE_THREADS
+from kraft.const import LIST_GITHUB_MAX_WAIT
+from kraft.const import LIST_MAX_AGE
+from kraft.const import LIST_TTL
 from kraft.logger import logger
 
 
@@ -124,6 +140,13 @@ class Settings(object):
             False
         )
 
+    @property
+    def fetch_git_mode(self):
+        return self.get(
+            KRAFTRC_FETCH_GIT_MODE,
+            GIT_FETCH_FULL
+        )
+
     @property
     def configure_platform(self):
         return self.get(
@@ -148,3 +171,52 @@ class Settings(object):
                 "http://github.com/unikraft/lib-*"
             ]
         )
+
+    @property
+    def list_ttl(self):
+        return int(self.get(
+            KRAFTRC_LIST_TTL,
+            LIST_TTL
+        ))
+
+    @property
+    def list_max_age(self):
+        return int(self.get(
+            KRAFTRC_LIST_MAX_AGE,
+            LIST_MAX_AGE
+        ))
+
+    @property
+    def list_concurrency(self):
+        return int(self.get(
+            KRAFTRC_LIST_CONCURRENCY,
+            LIST_CONCURRENCY
+        ))
+
+    @property
+    def list_concurrency_per_host(self):
+        return int(self.get(
+            KRAFTRC_LIST_CONCURRENCY_PER_HOST,
+            LIST_CONCURRENCY_PER_HOST
+        ))
+
+    @property
+    def list_engine(self):
+        return self.get(
+            KRAFTRC_LIST_ENGINE,
+            LIST_ENGINE_THREADS
+        )
+
+    @property
+    def list_github_api(self):
+        return self.get(
+            KRAFTRC_LIST_GITHUB_API,
+            GITHUB_API_AUTO
+        )
+
+    @property
+    def list_github_max_wait(self):
+        return int(self.get(
+            KRAFTRC_LIST_GITHUB_MAX_WAIT,
+            LIST_GITHUB_MAX_WAIT
+        ))
@@ -33,6 +33,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+from .aio import AsyncWorkerPool
 from .cli import ClickOptionMutex
 from .cli import ClickReaderOption
 from .cli import ClickWriterCommand
@@ -42,10 +43,15 @@ from .cli import KraftHelpGroup
 from .dir import delete_resource
 from .dir import is_dir_empty
 from .dir import recursively_copy
+from .lock import atomic_write
+from .lock import FileLock
 from .make import make_list_vars
 from .op import execute
 from .op import make_progressbar
 from .op import merge_dicts
 from .text import pretty_columns
 from .text import prettydate
+from .text import prettysize
 from .threading import ErrorPropagatingThread
+from .threading import WorkerPool
+from .threading import WorkerTask
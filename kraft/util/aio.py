@@ -0,0 +1,124 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .threading import WORKER_POOL_DEFAULT_SIZE
+
+
+class AsyncWorkerPool(object):
+    """
+    The counterpart of WorkerPool for code running in an asyncio event loop.
+    Blocking callables are run on a bounded set of threads, whilst
+    subprocesses are awaited without occupying a thread at all.  Either way,
+    no more than max_workers of them run at once, and no more than
+    max_per_host against the same host.
+
+    The pool must be created from within the event loop which uses it.
+    """
+
+    _max_workers = None
+    @property
+    def max_workers(self): return self._max_workers
+
+    _max_per_host = None
+    @property
+    def max_per_host(self): return self._max_per_host
+
+    def __init__(self, max_workers=None, max_per_host=None):
+        if max_workers is None or max_workers < 1:
+            max_workers = WORKER_POOL_DEFAULT_SIZE
+
+        if max_per_host is None or max_per_host < 1 \
+                or max_per_host > max_workers:
+            max_per_host = max_workers
+
+        self._max_workers = max_workers
+        self._max_per_host = max_per_host
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._hosts = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+    def _host(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self._max_per_host)
+
+        return self._hosts[host]
+
+    async def run(self, host, fn, *args, **kwargs):
+        """
+        Run a blocking callable which contacts the provided host on one of the
+        pool's threads.
+
+        Returns:
+            The result of the callable.
+        """
+        loop = asyncio.get_event_loop()
+
+        async with self._host(host):
+            async with self._semaphore:
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(fn, *args, **kwargs)
+                )
+
+    async def run_process(self, host, *cmd):
+        """
+        Run a subprocess which contacts the provided host.
+
+        Returns:
+            tuple: The return code and standard output of the subprocess.
+        """
+        async with self._host(host):
+            async with self._semaphore:
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await proc.communicate()
+
+        return proc.returncode, stdout.decode("utf-8", errors="replace")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Laboratories GmbH., NEC Corporation.
+#                     All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import contextlib
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class FileLock(object):
+    """
+    A reader/writer lock which is shared between processes by placing an
+    advisory lock on a file.  Any number of readers may hold the lock at the
+    same time whilst a writer holds it exclusively.  Each acquisition opens
+    the lock file anew so that the lock also holds between threads of the
+    same process, and a thread which already holds the lock may re-enter it.
+    """
+
+    _path = None
+    @property
+    def path(self): return self._path
+
+    def __init__(self, path=None):
+        if path is None:
+            raise ValueError("expected path")
+
+        self._path = path
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def _acquire(self, operation):
+        held = getattr(self._local, "held", None)
+
+        # Re-enter a lock which this thread already holds.  A shared lock
+        # cannot be upgraded as this could deadlock with another reader.
+        if held is not None:
+            if operation == "exclusive" and held[0] != "exclusive":
+                raise RuntimeError("cannot upgrade a shared lock: %s" % self._path)
+
+            yield
+            return
+
+        dirname = os.path.dirname(self._path)
+        if len(dirname) > 0 and not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o666)
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if operation == "exclusive"
+                            else fcntl.LOCK_SH)
+
+            self._local.held = (operation, fd)
+            yield
+
+        finally:
+            self._local.held = None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def shared(self):
+        return self._acquire("shared")
+
+    def exclusive(self):
+        return self._acquire("exclusive")
+
+
+@contextlib.contextmanager
+def atomic_write(path=None, mode="wb"):
+    """
+    Open a temporary file next to `path` for writing which replaces `path`
+    only once it has been written completely.  Readers therefore either see
+    the previous or the new contents of the file, never a partial write.
+    """
+    if path is None:
+        raise ValueError("expected path")
+
+    dirname = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(
+        dir=dirname,
+        prefix=".%s." % os.path.basename(path),
+        suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -70,3 +70,18 @@ def prettydate(date=None):
         return '1 hour ago'
     else:
         return '{} hours ago'.format(round(s/3600))
+
+
+def prettysize(size=None):
+    if size is None:
+        return 'unknown'
+
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024 or unit == 'GiB':
+            break
+        size /= 1024.0
+
+    if unit == 'B':
+        return '{} B'.format(int(size))
+
+    return '{:.1f} {}'.format(size, unit)
@@ -33,6 +33,13 @@ from __future__ import absolute_import
 from __future__ import unicode_literals
 
 import threading
+from collections import deque
+from concurrent.futures import CancelledError
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+
+WORKER_POOL_DEFAULT_SIZE = 8
 
 
 class ErrorPropagatingThread(threading.Thread):
@@ -58,3 +65,253 @@ class ErrorPropagatingThread(threading.Thread):
             raise self.exc
 
         return self.ret
+
+
+class WorkerTask(object):
+    """
+    A unit of work submitted to a WorkerPool.  Like ErrorPropagatingThread,
+    joining the task returns its result or raises the error it failed with.
+    """
+
+    _pool = None
+    _future = None
+
+    def __init__(self, pool=None, future=None):
+        self._pool = pool
+        self._future = future
+
+    def done(self):
+        return self._future.done()
+
+    def is_alive(self):
+        return not self._future.done()
+
+    def cancel(self):
+        return self._future.cancel()
+
+    def join(self):
+        try:
+            return self._future.result()
+
+        # Report why the task never ran if the pool was cancelled
+        except CancelledError:
+            if self._pool.fatal is not None:
+                raise self._pool.fatal
+            raise
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of worker threads.  Errors raised by tasks are collected
+    rather than stopping the pool, except for errors of a fatal type: the
+    first fatal error cancels all tasks which have not yet started and is
+    raised when the pool is joined.
+
+    Tasks can additionally be submitted for a host, in which case no more
+    than max_per_host of them run against the same host at once.  Tasks held
+    back for a busy host do not occupy a worker, so other hosts are not
+    starved in the meantime.
+    """
+
+    _max_workers = None
+    @property
+    def max_workers(self): return self._max_workers
+
+    _errors = None
+    @property
+    def errors(self): return list(self._errors)
+
+    _max_per_host = None
+    @property
+    def max_per_host(self): return self._max_per_host
+
+    _fatal = None
+    @property
+    def fatal(self): return self._fatal
+
+    def __init__(self, max_workers=None, fatal=None, max_per_host=None):
+        if max_workers is None or max_workers < 1:
+            max_workers = WORKER_POOL_DEFAULT_SIZE
+
+        if max_per_host is None or max_per_host < 1 \
+                or max_per_host > max_workers:
+            max_per_host = max_workers
+
+        self._max_workers = max_workers
+        self._max_per_host = max_per_host
+        self._fatal_types = tuple(fatal) if fatal is not None else tuple()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._tasks = list()
+        self._errors = list()
+        self._fatal = None
+        self._running = dict()
+        self._pending = dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.cancel()
+        self.shutdown()
+        return False
+
+    def _run(self, fn, args, kwargs):
+        # The task may have been picked up just before the pool was cancelled
+        if self._fatal is not None:
+            raise CancelledError()
+
+        try:
+            return fn(*args, **kwargs)
+
+        except BaseException as e:
+            with self._lock:
+                self._errors.append(e)
+
+                if isinstance(e, self._fatal_types) and self._fatal is None:
+                    self._fatal = e
+                    fatal = True
+                else:
+                    fatal = False
+
+            if fatal:
+                self.cancel()
+
+            raise
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Submit a callable to be run by the pool.
+
+        Returns:
+            WorkerTask: The task, which can be joined for its result.
+        """
+        task = WorkerTask(
+            pool=self,
+            future=self._executor.submit(self._run, fn, args, kwargs)
+        )
+
+        with self._lock:
+            self._tasks.append(task)
+            cancelled = self._fatal is not None
+
+        if cancelled:
+            task.cancel()
+
+        return task
+
+    def submit_to(self, host, fn, *args, **kwargs):
+        """
+        Submit a callable which contacts the provided host to be run by the
+        pool once fewer than max_per_host tasks are running against it.
+
+        Returns:
+            WorkerTask: The task, which can be joined for its result.
+        """
+        future = Future()
+        task = WorkerTask(pool=self, future=future)
+
+        with self._lock:
+            self._tasks.append(task)
+            cancelled = self._fatal is not None
+            if not cancelled:
+                self._pending.setdefault(host, deque()).append(
+                    (future, fn, args, kwargs)
+                )
+
+        if cancelled:
+            task.cancel()
+        else:
+            self._dispatch(host)
+
+        return task
+
+    def _dispatch(self, host):
+        start = list()
+
+        with self._lock:
+            pending = self._pending.get(host, None)
+
+            while pending and self._running.get(host, 0) < self._max_per_host:
+                future, fn, args, kwargs = pending.popleft()
+
+                # Skip tasks which were cancelled whilst held back
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                self._running[host] = self._running.get(host, 0) + 1
+                start.append((future, fn, args, kwargs))
+
+        # Submit outside of the lock as callbacks of futures which are already
+        # done are invoked immediately
+        for future, fn, args, kwargs in start:
+            self._executor.submit(self._run, fn, args, kwargs) \
+                .add_done_callback(
+                    lambda inner, future=future: self._release(
+                        host, future, inner
+                    )
+                )
+
+    def _release(self, host, future, inner):
+        if inner.cancelled():
+            future.set_exception(CancelledError())
+        elif inner.exception() is not None:
+            future.set_exception(inner.exception())
+        else:
+            future.set_result(inner.result())
+
+        with self._lock:
+            self._running[host] -= 1
+
+        self._dispatch(host)
+
+    def cancel(self):
+        """
+        Cancel all tasks which have not started yet.
+        """
+        with self._lock:
+            tasks = list(self._tasks)
+
+        for task in tasks:
+            task.cancel()
+
+    def join(self):
+        """
+        Wait for all submitted tasks to complete.
+
+        Returns:
+            list: The results of the tasks which succeeded.
+
+        Raises:
+            The first fatal error raised by a task, if any.
+        """
+        results = list()
+
+        with self._lock:
+            tasks = list(self._tasks)
+
+        for task in tasks:
+            try:
+                results.append(task.join())
+            except BaseException:
+                pass
+
+        if self._fatal is not None:
+            raise self._fatal
+
+        return results
+
+    def shutdown(self):
+        # Tasks held back for a host are only submitted to the executor as
+        # others complete, so wait for them first
+        with self._lock:
+            tasks = list(self._tasks)
+
+        for task in tasks:
+            try:
+                task._future.result()
+            except BaseException:
+                pass
+
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,111 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import shutil
+import tarfile
+import tempfile
+
+from .. import mock
+from .. import unittest
+from .cache_test import make_manifest
+from kraft.cmd.cache.bundle import bundle_rewrite_item
+from kraft.cmd.cache.bundle import parse_git_member
+from kraft.cmd.cache.bundle import read_bundle
+from kraft.cmd.cache.bundle import write_bundle
+from kraft.error import KraftError
+from kraft.manifest import ManifestItemVersion
+
+
+class BundleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.ctx = mock.Mock()
+        self.ctx.obj.env = {"UK_CACHEDIR": self.tmpdir}
+        self.ctx.obj.workdir = self.tmpdir
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_roundtrip(self):
+        f = io.BytesIO()
+        write_bundle(self.ctx, f, [
+            make_manifest("https://github.com/unikraft/lib-*", ["newlib"])
+        ], sources=False)
+
+        f.seek(0)
+        manifests = read_bundle(self.ctx, f)
+        self.assertEqual(len(manifests), 1)
+        self.assertEqual(manifests[0].get_item("newlib").type.shortname, "lib")
+
+    def test_not_a_bundle(self):
+        f = io.BytesIO()
+        with tarfile.open(fileobj=f, mode="w|gz") as tar:
+            info = tarfile.TarInfo("README")
+            info.size = 0
+            tar.addfile(info, io.BytesIO())
+
+        f.seek(0)
+        with self.assertRaises(KraftError):
+            read_bundle(self.ctx, f)
+
+    def test_parse_git_member(self):
+        def member(name):
+            return tarfile.TarInfo(name)
+
+        type, name = parse_git_member(member("git/lib/newlib.bundle"))
+        self.assertEqual((type.shortname, name), ("lib", "newlib"))
+        self.assertIsNone(parse_git_member(member("git/lib/...bundle/x")))
+        self.assertIsNone(parse_git_member(member("git/foo/newlib.bundle")))
+        self.assertIsNone(parse_git_member(member("git/lib/...bundle")))
+
+    def test_rewrite(self):
+        item = make_manifest("origin", ["newlib"]).get_item("newlib")
+        dist = item.get_distribution("stable")
+        dist.add_version(ManifestItemVersion(
+            version="0.6",
+            tarball="https://github.com/unikraft/lib-newlib/archive/RELEASE-0.6.tar.gz"
+        ))
+
+        bundle_rewrite_item(
+            item,
+            {("lib", "newlib"): "/cache/mirrors/lib/newlib.git"},
+            {"newlib-0.6.tar.gz": "/cache/newlib-0.6.tar.gz"}
+        )
+
+        self.assertEqual(item.git, "/cache/mirrors/lib/newlib.git")
+        self.assertEqual(
+            dist.get_version("0.6").tarball,
+            "file:///cache/newlib-0.6.tar.gz"
+        )
+        self.assertIsNone(dist.get_version("0.5").tarball)
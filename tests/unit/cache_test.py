@@ -0,0 +1,383 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from .. import mock
+from .. import unittest
+from kraft.cache import Cache
+from kraft.cache import CacheIndex
+from kraft.cache import ManifestStore
+from kraft.cache import RemoteCache
+from kraft.manifest import Manifest
+from kraft.manifest import ManifestItem
+from kraft.manifest import ManifestItemDistribution
+from kraft.manifest import ManifestItemVersion
+
+
+def make_manifest(origin, names, type="lib"):
+    manifest = Manifest(manifest=origin)
+
+    for name in names:
+        item = ManifestItem(
+            name=name,
+            type=type,
+            provider="github",
+            git="https://github.com/unikraft/%s-%s.git" % (type, name),
+            manifest=origin,
+            last_checked=datetime(2021, 1, 1, 12, 0, 0),
+            fingerprint="2021-01-01T00:00:00"
+        )
+
+        stable = ManifestItemDistribution(name="stable")
+        stable.add_version([
+            ManifestItemVersion(version="0.4", git_sha="RELEASE-0.4"),
+            ManifestItemVersion(version="0.5", git_sha="RELEASE-0.5",
+                                timestamp=datetime(2020, 12, 1)),
+        ])
+        item.add_distribution(stable)
+
+        staging = ManifestItemDistribution(name="staging")
+        staging.add_version(ManifestItemVersion(
+            version="abcdef0", git_sha="abcdef0123456789"
+        ))
+        item.add_distribution(staging)
+
+        manifest.add_item(item)
+
+    return manifest
+
+
+class ManifestStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ManifestStore(os.path.join(self.tmpdir, "manifests.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_save_and_load(self):
+        origin = "https://github.com/unikraft/lib-*"
+        self.store.save(origin, make_manifest(origin, ["newlib", "lwip"]))
+
+        assert origin in self.store
+        assert self.store.origins() == [origin]
+
+        manifest = self.store.load(origin)
+        item = manifest.get_item("lwip")
+        assert item.type.shortname == "lib"
+        assert item.provider.name == "github"
+        assert item.last_checked == datetime(2021, 1, 1, 12, 0, 0)
+        assert item.fingerprint == "2021-01-01T00:00:00"
+
+        stable = item.get_distribution("stable")
+        assert sorted(stable.versions.keys()) == ["0.4", "0.5"]
+        assert stable.latest.version == "0.5"
+        assert stable.latest.timestamp == datetime(2020, 12, 1)
+        assert item.get_distribution("staging").latest.git_sha \
+            == "abcdef0123456789"
+
+    def test_migrate_timestamps(self):
+        path = os.path.join(self.tmpdir, "manifests.db")
+        self.store.save("a", make_manifest("a", ["newlib"]))
+        self.store.close()
+
+        # Version 3 of the store kept dates as formatted strings
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE items SET last_checked = '2021-01-01 12:00:00'")
+        conn.execute(
+            "UPDATE versions SET timestamp = '2020-12-01 00:00:00' "
+            "WHERE timestamp IS NOT NULL"
+        )
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        conn.close()
+
+        self.store = ManifestStore(path)
+        item = self.store.load("a").get_item("newlib")
+        assert item.last_checked == datetime(2021, 1, 1, 12, 0, 0)
+        assert item.get_distribution("stable").latest.epoch \
+            == int(datetime(2020, 12, 1).timestamp())
+
+        # Manifest objects are compact and keep dates as epoch seconds
+        assert not hasattr(item, "__dict__")
+        assert isinstance(item.last_checked_epoch, int)
+
+    def test_lazy_dists(self):
+        self.store.save("a", make_manifest("a", ["newlib", "lwip"]))
+
+        manifest = self.store.load("a")
+        newlib = manifest.get_item("newlib")
+        assert newlib._dists is None
+        assert newlib.get_distribution("stable").latest.version == "0.5"
+
+        # Items which were never accessed keep their versions when re-saved
+        self.store.save("a", manifest)
+        lwip = self.store.find_items(name="lwip")[0]
+        assert sorted(lwip.dists.keys()) == ["stable", "staging"]
+
+    def test_concurrent_lazy_dists(self):
+        dists = {"stable": ManifestItemDistribution(name="stable")}
+
+        def loader(item):
+            time.sleep(0.05)
+            return dists
+
+        item = ManifestItem(name="newlib", type="lib", dists=None, loader=loader)
+        results = list()
+        threads = [
+            threading.Thread(target=lambda: results.append(item.dists))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # No thread sees the item without its distributions
+        assert all(result is dists for result in results)
+
+    def test_save_replaces_origin(self):
+        origin = "https://github.com/unikraft/lib-*"
+        self.store.save(origin, make_manifest(origin, ["newlib", "lwip"]))
+        self.store.save(origin, make_manifest(origin, ["lwip"]))
+
+        assert [i for i, _ in self.store.load(origin).items()] == ["lwip"]
+        assert len(self.store.find_items(name="newlib")) == 0
+
+    def test_find_items(self):
+        self.store.save("a", make_manifest("a", ["newlib"]))
+        self.store.save("b", make_manifest("b", ["x86_64"], type="arch"))
+
+        assert len(self.store.find_items(type="lib", name="newlib")) == 1
+        assert len(self.store.find_items(type="arch", name="newlib")) == 0
+        assert len(self.store.find_items(
+            git="https://github.com/unikraft/arch-x86_64.git"
+        )) == 1
+
+        with self.assertRaises(ValueError):
+            self.store.find_items(description="newlib")
+
+    def test_clear(self):
+        self.store.save("a", make_manifest("a", ["newlib"]))
+        self.store.clear()
+
+        assert len(self.store) == 0
+        assert self.store.load("a") is None
+
+
+class CacheIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.store = ManifestStore(os.path.join(self.tmpdir, "manifests.db"))
+        self.index = CacheIndex(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_find(self):
+        self.store.save("a", make_manifest("a", ["newlib", "lwip"]))
+        self.store.save("b", make_manifest("b", ["lwip"], type="app"))
+
+        assert len(self.index.find(name="lwip")) == 2
+        assert len(self.index.find(type="lib", name="lwip")) == 1
+        assert len(self.index.find(type="app", name="newlib")) == 0
+
+    def test_invalidate(self):
+        self.store.save("a", make_manifest("a", ["newlib"]))
+        assert len(self.index.find(name="lwip")) == 0
+
+        self.store.save("b", make_manifest("b", ["lwip"]))
+        assert len(self.index.find(name="lwip")) == 0
+
+        self.index.invalidate()
+        assert len(self.index.find(name="lwip")) == 1
+
+    def test_invalidate_concurrent(self):
+        self.store.save("a", make_manifest("a", ["newlib"]))
+        build = self.index._build
+
+        def build_and_invalidate():
+            tables = build()
+            self.index.invalidate()
+            return tables
+
+        # Lookups use the tables which were built even if a save invalidates
+        # the index before they are read
+        with mock.patch.object(self.index, "_build", build_and_invalidate):
+            assert len(self.index.find(name="newlib")) == 1
+            assert len(self.index.find(type="lib", name="newlib")) == 1
+            assert len(self.index.find_by_type("lib")) == 1
+
+
+class CacheFreshnessTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = Cache({'UK_CACHEDIR': self.tmpdir})
+
+    def tearDown(self):
+        self.cache.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_stale_origins(self):
+        now = time.time()
+        self.cache.save("a", make_manifest("a", ["newlib"]), refreshed=now)
+        self.cache.save("b", make_manifest("b", ["lwip"]), refreshed=now - 120)
+
+        assert self.cache.stale_origins(ttl=60) == ["b"]
+        assert self.cache.stale_origins(origins=["a", "c"], ttl=60) == ["c"]
+        assert self.cache.stale_origins(origins=["a", "c"]) == ["c"]
+        assert self.cache.is_stale(ttl=60)
+        assert not self.cache.is_stale(ttl=600)
+
+    def test_mark_refreshing(self):
+        self.cache.save("a", make_manifest("a", ["newlib"]), refreshed=0)
+        self.cache.mark_refreshing(["a"])
+
+        assert self.cache.stale_origins(ttl=60) == ["a"]
+        assert self.cache.stale_origins(ttl=60, retry=60) == []
+
+
+class CacheBatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = Cache({'UK_CACHEDIR': self.tmpdir})
+
+    def tearDown(self):
+        self.cache.cache.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_commit(self):
+        items = make_manifest("a", ["newlib", "lwip"]).items()
+
+        with self.cache.batch("a") as batch:
+            for _, item in items:
+                batch.add_item(item)
+            assert self.cache.get("a") is None
+
+        assert len(self.cache.get("a").items()) == 2
+        assert self.cache.last_refreshed("a") is not None
+
+    def test_flush_on_error(self):
+        items = make_manifest("a", ["newlib", "lwip"]).items()
+
+        with self.assertRaises(ValueError):
+            with self.cache.batch("a") as batch:
+                for _, item in items:
+                    batch.add_item(item)
+                raise ValueError()
+
+        assert len(self.cache.get("a").items()) == 2
+        assert self.cache.last_refreshed("a") is None
+
+    def test_flush_interval(self):
+        items = make_manifest("a", ["newlib", "lwip"]).items()
+
+        with self.cache.batch("a", flush_interval=0) as batch:
+            for _, item in items:
+                batch.add_item(item)
+                assert len(self.cache.get("a").items()) > 0
+            assert self.cache.last_refreshed("a") is None
+
+    def test_concurrent_get_save(self):
+        manifest = make_manifest("a", ["newlib", "lwip"])
+        self.cache.save("a", manifest)
+
+        def read():
+            for _ in range(50):
+                self.cache.get("a")
+                self.cache.all()
+
+        def write():
+            for _ in range(50):
+                self.cache.save("a", manifest)
+                self.cache.mark_refreshing(["a"])
+
+        threads = [threading.Thread(target=target, daemon=True)
+                   for target in [read, read, write, write]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert len(self.cache.get("a").items()) == 2
+
+
+class RemoteCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "remotes.json")
+        self.now = 1000
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def remotes(self):
+        return RemoteCache(
+            self.path,
+            provider_ttl=60,
+            refs_ttl=10,
+            clock=lambda: self.now
+        )
+
+    def test_provider(self):
+        self.remotes().set_provider("list", "/tmp/lib-newlib", "git")
+
+        # Other processes share the providers found
+        remotes = self.remotes()
+        assert remotes.provider("list", "/tmp/lib-newlib") == "git"
+        assert remotes.provider("lib", "/tmp/lib-newlib") is None
+
+        self.now += 61
+        assert remotes.provider("list", "/tmp/lib-newlib") is None
+
+    def test_refs(self):
+        remotes = self.remotes()
+        remotes.set_refs("/tmp/lib-newlib", "abcdef\trefs/heads/staging")
+        assert remotes.ls_remote("/tmp/lib-newlib") == \
+            "abcdef\trefs/heads/staging"
+
+        # Refs are neither shared nor kept for long
+        assert self.remotes().refs("/tmp/lib-newlib") is None
+
+        self.now += 11
+        assert remotes.refs("/tmp/lib-newlib") is None
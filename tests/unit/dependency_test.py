@@ -0,0 +1,148 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+import click
+
+from .. import mock
+from .. import unittest
+from kraft.dependency import component_dependencies
+from kraft.dependency import DependencyGraph
+from kraft.dependency import library_symbol
+from kraft.dependency import LibrarySymbols
+from kraft.manifest import ManifestItem
+
+
+def make_item(name, type="lib"):
+    return ManifestItem(type=type, name=name)
+
+
+class DependencyGraphTestCase(unittest.TestCase):
+    def test_waves(self):
+        graph = DependencyGraph()
+        for name in ["lwip", "newlib", "pthread-embedded", "python3"]:
+            assert graph.add(make_item(name))
+        assert not graph.add(make_item("newlib"))
+
+        graph.depend(("lib", "python3"), ("lib", "newlib"))
+        graph.depend(("lib", "python3"), ("lib", "pthread-embedded"))
+        graph.depend(("lib", "pthread-embedded"), ("lib", "newlib"))
+
+        assert graph.waves() == [
+            [("lib", "lwip"), ("lib", "newlib")],
+            [("lib", "pthread-embedded")],
+            [("lib", "python3")],
+        ]
+
+    def test_cycle(self):
+        graph = DependencyGraph()
+        graph.add(make_item("a"))
+        graph.add(make_item("b"))
+        graph.depend(("lib", "a"), ("lib", "b"))
+        graph.depend(("lib", "b"), ("lib", "a"))
+
+        assert graph.waves() == [[("lib", "a"), ("lib", "b")]]
+
+
+class LibrarySymbolsTestCase(unittest.TestCase):
+    def test_lockfile(self):
+        pinned = ManifestItem(type="lib", name="newlib", localdir="/newlib")
+        cached = ManifestItem(type="lib", name="newlib", localdir="/newlib")
+        lwip = ManifestItem(type="lib", name="lwip", localdir="/lwip")
+
+        lockfile = mock.Mock()
+        lockfile.items.return_value = [pinned]
+        obj = mock.Mock()
+        obj.cache.find_items_by_type.return_value = [cached, lwip]
+
+        # Libraries pinned by the lockfile are preferred over the cache's
+        with click.Context(click.Command("pull"), obj=obj):
+            symbols = LibrarySymbols(DependencyGraph(), lockfile)
+            assert symbols.find(library_symbol("newlib")) is pinned
+            assert symbols.find(library_symbol("lwip")) is lwip
+
+
+class ComponentDependenciesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_kconfig(self):
+        with open(os.path.join(self.tmpdir, "Config.uk"), "w") as f:
+            f.write(
+                "menuconfig LIBPYTHON3\n"
+                "\tbool \"python3\"\n"
+                "\tselect LIBNEWLIBC\n"
+                "\tselect LIBUKDEBUG\n"
+                "\tselect LIBUKSCHED if HAVE_SCHED\n"
+                "\tdepends on LIBPTHREAD_EMBEDDED && !LIBLWIP\n"
+                "\tdepends on (LIBMUSL || LIBNEWLIBC)\n"
+                "if LIBPYTHON3\n"
+                "config LIBPYTHON3_MAIN\n"
+                "\tdepends on LIBPYTHON3 && LIBZLIB\n"
+                "\tselect LIBSQLITE\n"
+                "endif\n"
+            )
+
+        # Conditional selects, alternatives and the dependencies of options
+        # which are not enabled by default are not required
+        known = {
+            "LIBNEWLIBC": make_item("newlib"),
+            library_symbol("pthread-embedded"): make_item("pthread-embedded"),
+            "LIBLWIP": make_item("lwip"),
+            "LIBUKSCHED": make_item("uksched"),
+            "LIBMUSL": make_item("musl"),
+            "LIBZLIB": make_item("zlib"),
+            "LIBSQLITE": make_item("sqlite"),
+        }
+
+        dependencies = component_dependencies(
+            manifest=make_item("python3"),
+            localdir=self.tmpdir,
+            find_symbol=known.get
+        )
+
+        assert sorted(d[0].name for d in dependencies) \
+            == ["newlib", "pthread-embedded"]
+
+    def test_not_downloaded(self):
+        assert component_dependencies(
+            manifest=make_item("python3"),
+            localdir=os.path.join(self.tmpdir, "python3"),
+            find_symbol=lambda symbol: None
+        ) == list()
@@ -0,0 +1,213 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .. import mock
+from .. import unittest
+from kraft.cache import GitMirrors
+from kraft.const import DOWNLOAD_FETCHED
+from kraft.const import DOWNLOAD_HIT
+from kraft.const import GIT_FETCH_FULL
+from kraft.const import GIT_FETCH_PARTIAL
+from kraft.const import GIT_FETCH_SHALLOW
+from kraft.cmd.list.provider.git import get_component_from_git_repo
+from kraft.cmd.list.provider.git import GitListProvider
+
+
+class GitListProviderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.env = dict(os.environ,
+                        GIT_AUTHOR_NAME="kraft",
+                        GIT_AUTHOR_EMAIL="kraft@unikraft.org",
+                        GIT_COMMITTER_NAME="kraft",
+                        GIT_COMMITTER_EMAIL="kraft@unikraft.org")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def git(self, path, *args):
+        return subprocess.check_output(
+            ["git", "-C", path] + list(args), env=self.env
+        ).decode().strip()
+
+    def test_refs(self):
+        upstream = os.path.join(self.tmpdir, "lib-upstream")
+        os.makedirs(upstream)
+        self.git(upstream, "init", "-q")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "1")
+        self.git(upstream, "tag", "RELEASE-0.1")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "2")
+        self.git(upstream, "tag", "-a", "RELEASE-0.2", "-m", "0.2")
+        self.git(upstream, "branch", "staging")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "3")
+        self.git(upstream, "branch", "feature")
+
+        clone = os.path.join(self.tmpdir, "lib-clone")
+        self.git(self.tmpdir, "clone", "-q", upstream, clone)
+
+        item = get_component_from_git_repo(None, clone, fingerprint="-")
+        assert item.name == "clone"
+
+        # Annotated tags are peeled to the commit they point at
+        stable = item.get_distribution("stable")
+        assert sorted(stable.versions.keys()) == ["0.1", "0.2"]
+        assert stable.versions["0.2"].git_sha == \
+            self.git(upstream, "rev-parse", "RELEASE-0.2^{commit}")
+
+        # Branches which only exist on the remote are listed, too
+        feature = self.git(upstream, "rev-parse", "feature")
+        assert item.get_distribution("feature").latest.git_sha == feature
+        assert item.get_distribution("staging").latest.version == \
+            self.git(upstream, "rev-parse", "staging")[:7]
+
+    def test_download_from_mirror(self):
+        upstream = os.path.join(self.tmpdir, "lib-upstream")
+        os.makedirs(upstream)
+        self.git(upstream, "init", "-q")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "1")
+        sha = self.git(upstream, "rev-parse", "HEAD")
+
+        mirrors = GitMirrors(os.path.join(self.tmpdir, "mirrors"))
+        manifest = mock.Mock(git=upstream)
+        version = mock.Mock(git_sha=sha, version="0.1")
+
+        with mock.patch("kraft.cmd.list.provider.git.git_mirrors",
+                        return_value=mirrors), \
+                mock.patch.object(mirrors, "_fetch", wraps=mirrors._fetch) as fetch:
+            for name in ["app1", "app2"]:
+                GitListProvider.download(
+                    manifest=manifest,
+                    localdir=os.path.join(self.tmpdir, name),
+                    version=version
+                )
+
+        # The remote is only fetched once into its mirror, whose objects
+        # both checkouts borrow
+        assert fetch.call_count == 1
+        mirror = mirrors.mirror_path(upstream)
+        for name in ["app1", "app2"]:
+            localdir = os.path.join(self.tmpdir, name)
+            assert self.git(localdir, "rev-parse", "HEAD") == sha
+            assert self.git(localdir, "count-objects") == "0 objects, 0 kilobytes"
+            with open(os.path.join(localdir, ".git/objects/info/alternates")) as f:
+                assert f.read().strip() == os.path.join(mirror, "objects")
+
+        # Git never prunes the objects which the checkouts borrow, even once
+        # they are unreachable from the mirror
+        assert self.git(mirror, "config", "gc.auto") == "0"
+        assert self.git(mirror, "config", "gc.pruneExpire") == "never"
+
+        self.git(upstream, "commit", "-q", "--amend", "--allow-empty", "-m", "2")
+        GitMirrors(mirrors.path).update(upstream)
+        self.git(mirror, "gc", "--quiet")
+        assert self.git(os.path.join(self.tmpdir, "app1"), "cat-file", "-t", sha) \
+            == "commit"
+
+    def test_download_shallow(self):
+        upstream = os.path.join(self.tmpdir, "lib-upstream")
+        os.makedirs(upstream)
+        self.git(upstream, "init", "-q")
+        for message in ["1", "2", "3"]:
+            self.git(upstream, "commit", "-q", "--allow-empty", "-m", message)
+
+        localdir = os.path.join(self.tmpdir, "app")
+        manifest = mock.Mock(git=upstream)
+
+        def download(rev, fetch_mode, git_sha=None):
+            sha = self.git(upstream, "rev-parse", "%s^{commit}" % rev)
+            GitListProvider.download(
+                manifest=manifest,
+                localdir=localdir,
+                version=mock.Mock(git_sha=git_sha or sha, version=rev),
+                fetch_mode=fetch_mode
+            )
+            assert self.git(localdir, "rev-parse", "HEAD") == sha
+
+        with mock.patch("kraft.cmd.list.provider.git.git_mirrors",
+                        return_value=GitMirrors(None)):
+            download("HEAD", GIT_FETCH_SHALLOW)
+            assert self.git(localdir, "rev-list", "--count", "HEAD") == "1"
+
+            # An older commit is fetched by itself, too
+            download("HEAD~2", GIT_FETCH_SHALLOW)
+            assert self.git(localdir, "rev-parse", "--is-shallow-repository") == "true"
+
+            # Stable versions are checked out by the name of their tag
+            self.git(upstream, "tag", "RELEASE-0.1", "HEAD~1")
+            self.git(upstream, "tag", "-a", "RELEASE-0.2", "-m", "0.2", "HEAD~1")
+            download("RELEASE-0.1", GIT_FETCH_SHALLOW, "RELEASE-0.1")
+            download("RELEASE-0.2", GIT_FETCH_PARTIAL, "RELEASE-0.2")
+
+            # A full fetch deepens the checkout to the whole history
+            download("HEAD", GIT_FETCH_FULL)
+            assert self.git(localdir, "rev-list", "--count", "HEAD") == "3"
+            assert self.git(localdir, "rev-parse", "--is-shallow-repository") == "false"
+
+    def test_download_hit(self):
+        upstream = os.path.join(self.tmpdir, "lib-upstream")
+        os.makedirs(upstream)
+        self.git(upstream, "init", "-q")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "1")
+        self.git(upstream, "commit", "-q", "--allow-empty", "-m", "2")
+
+        localdir = os.path.join(self.tmpdir, "app")
+        mirrors = mock.Mock()
+        mirrors.update.return_value = None
+
+        def download(rev, **kwargs):
+            return GitListProvider.download(
+                manifest=mock.Mock(git=upstream),
+                localdir=localdir,
+                version=mock.Mock(
+                    git_sha=self.git(upstream, "rev-parse", rev), version=rev
+                ),
+                **kwargs
+            )
+
+        with mock.patch("kraft.cmd.list.provider.git.git_mirrors",
+                        return_value=mirrors):
+            assert download("HEAD") == DOWNLOAD_FETCHED
+            assert mirrors.update.call_count == 1
+
+            # Commits which are already here are checked out without fetching
+            assert download("HEAD~1") == DOWNLOAD_HIT
+            assert mirrors.update.call_count == 1
+            assert self.git(localdir, "log", "-1", "--format=%s") == "1"
+
+            assert download("HEAD", override_existing=True) == DOWNLOAD_FETCHED
+            assert mirrors.update.call_count == 2
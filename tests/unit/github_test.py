@@ -0,0 +1,335 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+
+import click
+
+from .. import mock
+from .. import unittest
+from kraft.cmd.list.provider import github
+from kraft.manifest import Manifest
+
+
+def page(nodes):
+    return {
+        "pageInfo": {"hasNextPage": False, "endCursor": None},
+        "nodes": nodes
+    }
+
+
+def repository(name, branches=[], tags=[], releases=[]):
+    return {
+        "name": name,
+        "description": "The %s repository" % name,
+        "pushedAt": "2021-02-01T10:00:00Z",
+        "url": "https://github.com/unikraft/%s" % name,
+        "sshUrl": "git@github.com:unikraft/%s.git" % name,
+        "owner": {"login": "unikraft"},
+        "branches": page([
+            {"name": b, "target": {"oid": sha}} for b, sha in branches
+        ]),
+        "tags": page([{"name": t} for t in tags]),
+        "releases": page([
+            {"tagName": t, "isDraft": d, "publishedAt": "2021-01-01T00:00:00Z"}
+            for t, d in releases
+        ]),
+    }
+
+
+class GitHubGraphQLTestCase(unittest.TestCase):
+    def probe(self, origin, repo, data, manifest=None):
+        with mock.patch.object(github, "github_graphql", return_value=data):
+            return github.get_components_from_github_graphql(
+                None, origin, "unikraft", repo, "token", manifest
+            )
+
+    def test_organization(self):
+        items = self.probe("https://github.com/unikraft/lib-*", "lib-*", {
+            "organization": {"repositories": page([
+                repository(
+                    "lib-newlib",
+                    branches=[("stable", "a" * 40), ("staging", "b" * 40)],
+                    tags=["RELEASE-0.4"],
+                    releases=[("RELEASE-0.5", False), ("RELEASE-0.6", True)]
+                ),
+                repository("lib-lwip", branches=[("staging", "c" * 40)]),
+                repository("app-helloworld", branches=[("stable", "d" * 40)]),
+                repository(".github", branches=[("main", "e" * 40)]),
+            ])}
+        })
+
+        assert [item.name for item in items] == ["newlib", "lwip"]
+
+        newlib = items[0]
+        assert newlib.type.shortname == "lib"
+        assert newlib.git == "https://github.com/unikraft/lib-newlib"
+
+        stable = newlib.get_distribution("stable")
+        assert sorted(stable.versions.keys()) == ["0.4", "0.5"]
+        assert stable.latest.version == "0.5"
+        assert stable.latest.epoch == 1609459200
+        assert stable.latest.tarball == \
+            "https://github.com/unikraft/lib-newlib/archive/RELEASE-0.5.tar.gz"
+
+        staging = newlib.get_distribution("staging")
+        assert staging.latest.git_sha == "b" * 40
+        assert staging.latest.version == "b" * 7
+        assert staging.latest.epoch == 1612173600
+
+    def test_repository(self):
+        items = self.probe("git@github.com:unikraft/unikraft.git",
+                           "unikraft.git", {
+                               "repository": repository(
+                                   "unikraft",
+                                   branches=[("stable", "a" * 40)]
+                               )
+                           })
+
+        assert len(items) == 1
+        assert items[0].type.shortname == "core"
+        assert items[0].git == "git@github.com:unikraft/unikraft.git"
+        assert items[0].get_distribution("stable").latest.git_sha == "a" * 40
+
+    def test_unchanged(self):
+        origin = "https://github.com/unikraft/lib-*"
+        data = {"organization": {"repositories": page([
+            repository("lib-newlib", branches=[("staging", "a" * 40)]),
+        ])}}
+
+        manifest = Manifest(manifest=origin)
+        manifest.add_item(self.probe(origin, "lib-*", data))
+        cached = manifest.get_item("newlib")
+        cached.touch(datetime(2021, 1, 1))
+
+        item = self.probe(origin, "lib-*", data, manifest)[0]
+        assert item is cached
+        assert item.last_checked > datetime(2021, 1, 1)
+
+        data["organization"]["repositories"]["nodes"][0]["pushedAt"] = \
+            "2021-03-01T10:00:00Z"
+        assert self.probe(origin, "lib-*", data, manifest)[0] is not cached
+
+    def test_fingerprint(self):
+        # Both APIs agree on the fingerprint, whether PyGithub provides aware
+        # or, as older releases do, naive datetimes in UTC
+        fingerprint = github.github_fingerprint(
+            github.github_datetime("2021-02-01T10:00:00Z")
+        )
+        assert fingerprint == "1612173600"
+        assert github.github_fingerprint(
+            datetime(2021, 2, 1, 10, tzinfo=timezone.utc)
+        ) == fingerprint
+        assert github.github_fingerprint(datetime(2021, 2, 1, 10)) == fingerprint
+
+
+class GitHubRESTTestCase(unittest.TestCase):
+    def test_unknown_type(self):
+        repo = mock.Mock(spec=github.Repository)
+        repo.name = "docs"
+
+        # Repositories which are not components are skipped
+        assert github.get_component_from_github(
+            None, "https://github.com/unikraft/*", "unikraft", repo
+        ) is None
+
+
+class GitHubClientTestCase(unittest.TestCase):
+    def test_scheduled(self):
+        responses = [
+            (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1"}),
+            (200, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "41",
+                   "X-RateLimit-Reset": "1"}),
+        ]
+
+        class Connection(object):
+            def __init__(self, host, port=None, **kwargs):
+                self.host = host
+                self.port = port
+
+            def request(self, verb, url, input, headers, stream=False):
+                pass
+
+            def getresponse(self):
+                status, headers = responses.pop(0)
+                return mock.Mock(
+                    status=status,
+                    getheaders=lambda: list(headers.items()),
+                    read=lambda: '{"login": "unikraft"}'
+                )
+
+            def close(self):
+                pass
+
+        ctx = mock.Mock()
+        ctx.obj.settings.list_github_max_wait = 60
+        scheduler = github.github_scheduler(ctx, "scheduled-token")
+
+        with mock.patch.object(github.ScheduledConnection, "connection_class",
+                               Connection), \
+                mock.patch.object(scheduler, "_sleep") as sleep:
+            client = github.github_client(ctx, "scheduled-token")
+            assert client.get_organization("unikraft").login == "unikraft"
+
+        # The rejected request is retried once the limit has been reset
+        assert sleep.call_count == 1
+        assert scheduler.requests == 2
+        assert scheduler.remaining == 41
+
+    def test_shared_connection(self):
+        class Connection(object):
+            def __init__(self, host, port=None, **kwargs):
+                self.url = None
+
+            def request(self, verb, url, input, headers, stream=False):
+                self.url = url
+
+            def getresponse(self):
+                return mock.Mock(
+                    status=200, getheaders=lambda: [], read=lambda: self.url
+                )
+
+        # Pacing a request must not let another request replace it before it
+        # is sent
+        scheduler = mock.Mock(acquire=lambda: time.sleep(0.05))
+        connection_class = type(str("Connection"), (github.ScheduledConnection,), {
+            "scheduler": scheduler,
+            "connection_class": Connection
+        })
+        connection = connection_class("api.github.com")
+        responses = dict()
+
+        def get(url):
+            connection.request("GET", url, None, dict())
+            responses[url] = connection.getresponse().read()
+
+        threads = [
+            threading.Thread(target=get, args=(url,)) for url in ["/a", "/b"]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert responses == {"/a": "/a", "/b": "/b"}
+
+    def test_probe_pool(self):
+        obj = mock.Mock()
+        obj.env = dict()
+        obj.cache.get.return_value = None
+        obj.settings.list_github_api = "rest"
+        obj.settings.list_concurrency = 2
+        obj.settings.list_concurrency_per_host = 2
+        ctx = click.Context(click.Command("update"), obj=obj)
+
+        shutdown = mock.Mock(wraps=github.WorkerPool.shutdown)
+        with ctx, mock.patch.object(github, "github_client"), \
+                mock.patch.object(github, "GITHUB_CLIENTS", threading.local()), \
+                mock.patch.object(github, "get_component_from_github",
+                                  side_effect=lambda *args: args[3]), \
+                mock.patch.object(github.WorkerPool, "shutdown",
+                                  lambda pool: shutdown(pool)):
+            items, threads = github.GitHubListProvider().probe(
+                origin="https://github.com/unikraft/lib-newlib",
+                return_threads=True
+            )
+
+        # The pool which the provider created itself is shut down
+        assert shutdown.call_count == 1
+        assert all(thread.done() for thread in threads)
+        assert items.get_nowait() == "lib-newlib"
+
+    def test_concurrent_probes(self):
+        class Connection(object):
+            # Like PyGithub's, the request is only sent once its response is
+            # retrieved
+            def __init__(self, host, port=None, **kwargs):
+                self.host = host
+                self.port = port
+                self.url = None
+
+            def request(self, verb, url, input, headers, stream=False):
+                self.url = url
+
+            def getresponse(self):
+                time.sleep(0.05)
+                name = self.url.split("/")[3]
+                data = [] if self.url.endswith("/branches") else {
+                    "name": name,
+                    "full_name": "unikraft/%s" % name,
+                    "description": None,
+                    "pushed_at": "2021-02-01T10:00:00Z",
+                    "html_url": "https://github.com/unikraft/%s" % name,
+                    "ssh_url": "git@github.com:unikraft/%s.git" % name,
+                    "owner": {"login": "unikraft"},
+                }
+                return mock.Mock(
+                    status=200,
+                    getheaders=lambda: [],
+                    read=lambda: json.dumps(data)
+                )
+
+            def close(self):
+                pass
+
+        obj = mock.Mock()
+        obj.env = {"UK_KRAFT_GITHUB_TOKEN": "concurrent-token"}
+        obj.cache.get.return_value = None
+        obj.settings.list_github_api = "rest"
+        obj.settings.list_github_max_wait = 60
+        ctx = click.Context(click.Command("update"), obj=obj)
+
+        names = ["lib-a", "lib-b", "lib-c", "lib-d"]
+        with ctx, github.WorkerPool(max_workers=4) as pool, \
+                mock.patch.object(github.ScheduledConnection,
+                                  "connection_class", Connection), \
+                mock.patch.object(github, "GITHUB_CLIENTS", threading.local()):
+            results = [github.GitHubListProvider().probe(
+                origin="https://github.com/unikraft/%s" % name,
+                return_threads=True,
+                pool=pool
+            ) for name in names]
+
+            for _, threads in results:
+                for thread in threads:
+                    thread.join()
+
+        # Each probe retrieves its own repository
+        for name, (items, _) in zip(names, results):
+            item = items.get_nowait()
+            assert item.name == name[4:]
+            assert item.git == "https://github.com/unikraft/%s" % name
@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+from datetime import datetime
+
+from .. import unittest
+from .cache_test import make_manifest
+from kraft.cmd.list.provider.index import dump_index
+from kraft.cmd.list.provider.index import index_from_manifests
+from kraft.cmd.list.provider.index import IndexListProvider
+from kraft.cmd.list.provider.index import load_index
+from kraft.cmd.list.provider.index import manifests_from_index
+
+
+class IndexTestCase(unittest.TestCase):
+    def roundtrip(self, compress):
+        f = io.BytesIO()
+        dump_index(index_from_manifests([
+            make_manifest("https://github.com/unikraft/lib-*", ["newlib", "lwip"]),
+            make_manifest("https://github.com/unikraft/app-*", ["newlib"], type="app"),
+        ], generated=1600000000.0), f, compress=compress)
+
+        index = load_index(f.getvalue())
+        self.assertEqual(index["meta"]["generated"], 1600000000.0)
+
+        return f.getvalue(), manifests_from_index(index)
+
+    def test_roundtrip(self):
+        _, manifests = self.roundtrip(compress=False)
+        self.assertEqual(
+            [m.manifest for m in manifests],
+            ["https://github.com/unikraft/lib-*", "https://github.com/unikraft/app-*"]
+        )
+
+        # Items of the same name in different origins are kept apart
+        lib = manifests[0].get_item("newlib")
+        app = manifests[1].get_item("newlib")
+        self.assertEqual(lib.type.shortname, "lib")
+        self.assertEqual(app.type.shortname, "app")
+
+        self.assertEqual(lib.provider.name, "github")
+        self.assertEqual(lib.fingerprint, "2021-01-01T00:00:00")
+        self.assertEqual(lib.last_checked, datetime(2021, 1, 1, 12, 0, 0))
+
+        stable = lib.get_distribution("stable")
+        self.assertEqual(stable.latest.version, "0.5")
+        self.assertEqual(stable.latest.timestamp, datetime(2020, 12, 1))
+        self.assertIsNone(stable.get_version("0.4").timestamp)
+
+    def test_compressed(self):
+        data, manifests = self.roundtrip(compress=True)
+        self.assertEqual(data[:2], b"\x1f\x8b")
+
+        # Neither a file name nor a modification time is recorded
+        self.assertEqual(data[3:8], b"\x00" * 5)
+        self.assertEqual(len(manifests[0].items()), 2)
+
+    def test_unknown_version(self):
+        with self.assertRaises(ValueError):
+            manifests_from_index({"meta": {"version": 0}, "manifests": []})
+
+    def test_is_type(self):
+        self.assertTrue(IndexListProvider.is_type("/srv/kraft/index.json"))
+        self.assertTrue(IndexListProvider.is_type("https://example.com/index.json.gz?v=1"))
+        self.assertFalse(IndexListProvider.is_type("https://github.com/unikraft/lib-*"))
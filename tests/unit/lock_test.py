@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from .. import unittest
+from kraft.util import atomic_write
+from kraft.util import FileLock
+
+
+class FileLockTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.lock = FileLock(os.path.join(self.tmpdir, "test.lock"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_reentrant(self):
+        with self.lock.exclusive():
+            with self.lock.exclusive():
+                pass
+            with self.lock.shared():
+                pass
+
+    def test_no_upgrade(self):
+        with self.lock.shared():
+            with self.assertRaises(RuntimeError):
+                with self.lock.exclusive():
+                    pass
+
+
+class AtomicWriteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "file")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_write(self):
+        with atomic_write(self.path, "w") as f:
+            f.write("new")
+            assert not os.path.exists(self.path)
+
+        with open(self.path) as f:
+            assert f.read() == "new"
+
+    def test_failed_write(self):
+        with open(self.path, "w") as f:
+            f.write("old")
+
+        with self.assertRaises(ValueError):
+            with atomic_write(self.path, "w") as f:
+                f.write("partial")
+                raise ValueError()
+
+        with open(self.path) as f:
+            assert f.read() == "old"
+
+        assert os.listdir(self.tmpdir) == ["file"]
@@ -0,0 +1,174 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .. import mock
+from .. import unittest
+from kraft.app import lock
+from kraft.app.lock import kraftfile_digest
+from kraft.app.lock import Lockfile
+from kraft.manifest import ManifestItem
+from kraft.manifest import ManifestItemDistribution
+from kraft.manifest import ManifestItemVersion
+from kraft.types import ComponentType
+
+
+class LockfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def component(self, type, name, version, git_sha="b" * 40,
+                  localdir=None):
+        dist = ManifestItemDistribution(name="stable")
+        dist.add_version(ManifestItemVersion(version="0.4", git_sha="a" * 40))
+        dist.add_version(ManifestItemVersion(version=version, git_sha=git_sha))
+        item = ManifestItem(type=type, name=name, git="https://git/%s" % name)
+        item.add_distribution(dist)
+
+        component = mock.Mock()
+        component.type = type
+        component.manifest = item
+        component.version = dist.get_version(version)
+        component.localdir = localdir
+        return component
+
+    def test_roundtrip(self):
+        internal = mock.Mock(type=ComponentType.PLAT, manifest=None)
+        lockfile = Lockfile.from_components([
+            self.component(ComponentType.CORE, "unikraft", "0.5"),
+            self.component(ComponentType.LIB, "newlib", "0.5"),
+            internal
+        ], "digest")
+
+        path = os.path.join(self.tmpdir, "kraft.lock")
+        lockfile.save(path)
+        lockfile = Lockfile.load(path)
+
+        self.assertTrue(lockfile.is_valid("digest"))
+        self.assertFalse(lockfile.is_valid("other"))
+        self.assertEqual(len(lockfile.components), 2)
+
+        item = lockfile.item("lib", "newlib")
+        self.assertEqual(item.type, ComponentType.LIB)
+        self.assertEqual(item.git, "https://git/newlib")
+        self.assertEqual(item.get_version("stable").git_sha, "b" * 40)
+        self.assertIsNone(lockfile.item("lib", "musl"))
+
+    def test_unresolved(self):
+        component = self.component(ComponentType.LIB, "newlib", "0.5")
+        component.version = None
+        self.assertIsNone(Lockfile.from_components([component], "digest"))
+
+    def test_tag(self):
+        localdir = os.path.join(self.tmpdir, "newlib")
+        env = dict(os.environ,
+                   GIT_AUTHOR_NAME="kraft",
+                   GIT_AUTHOR_EMAIL="kraft@unikraft.org",
+                   GIT_COMMITTER_NAME="kraft",
+                   GIT_COMMITTER_EMAIL="kraft@unikraft.org")
+
+        def git(*args):
+            return subprocess.check_output(
+                ["git", "-C", localdir] + list(args), env=env
+            ).decode().strip()
+
+        os.makedirs(localdir)
+        git("init", "-q")
+        git("commit", "-q", "--allow-empty", "-m", "1")
+        git("tag", "-a", "-m", "0.5", "RELEASE-0.5")
+        sha = git("rev-parse", "HEAD")
+
+        # Tags are pinned to the commit they point to, whether the component
+        # is on disk or only listed by its remote
+        lockfile = Lockfile.from_components([self.component(
+            ComponentType.LIB, "newlib", "0.5", "RELEASE-0.5", localdir
+        )], "digest")
+        self.assertEqual(lockfile.components[0]["git_sha"], sha)
+
+        refs = "%s\trefs/tags/RELEASE-0.5\n%s\trefs/tags/RELEASE-0.5^{}" % (
+            "c" * 40, "d" * 40
+        )
+        with mock.patch.object(lock, "remote_cache") as remote_cache:
+            remote_cache.return_value.ls_remote.return_value = refs
+            lockfile = Lockfile.from_components([self.component(
+                ComponentType.LIB, "newlib", "0.5", "RELEASE-0.5"
+            )], "digest")
+            self.assertEqual(lockfile.components[0]["git_sha"], "d" * 40)
+
+            # Versions which cannot be pinned are not written
+            self.assertIsNone(Lockfile.from_components([self.component(
+                ComponentType.LIB, "newlib", "0.5", "RELEASE-0.6"
+            )], "digest"))
+
+    def test_dependencies(self):
+        newlib = self.component(ComponentType.LIB, "newlib", "0.5")
+        pthreads = self.component(ComponentType.LIB, "pthread-embedded", "0.5")
+
+        lockfile = Lockfile.from_components([newlib], "digest", [
+            (newlib.manifest, newlib.version, None),
+            (pthreads.manifest, pthreads.version, None)
+        ])
+
+        self.assertEqual(
+            [entry["name"] for entry in lockfile.components],
+            ["newlib", "pthread-embedded"]
+        )
+        self.assertEqual(
+            [item.name for item in lockfile.items("lib")],
+            ["newlib", "pthread-embedded"]
+        )
+
+    def test_digest(self):
+        path = os.path.join(self.tmpdir, "kraft.yaml")
+        with open(path, "w") as f:
+            f.write("specification: '0.5'\n")
+
+        digest = kraftfile_digest([path])
+        with open(path, "a") as f:
+            f.write("unikraft: stable\n")
+
+        self.assertNotEqual(digest, kraftfile_digest([path]))
+
+    def test_unsupported(self):
+        path = os.path.join(self.tmpdir, "kraft.lock")
+        with open(path, "w") as f:
+            f.write("version: 99\n")
+
+        self.assertIsNone(Lockfile.load(path))
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+
+import click
+
+from .. import mock
+from .. import unittest
+from kraft.cmd.list.pull import kraft_download_manifests
+from kraft.manifest import ManifestItem
+
+
+class DownloadManifestsTestCase(unittest.TestCase):
+    def setUp(self):
+        obj = mock.Mock()
+        obj.verbose = False
+        obj.settings.list_concurrency = 4
+        obj.settings.list_concurrency_per_host = 4
+        self.ctx = click.Context(click.Command("pull"), obj=obj)
+
+        self.manifests = [(ManifestItem(
+            type="lib",
+            name=name,
+            git="https://github.com/unikraft/lib-%s.git" % name
+        ), None, None) for name in ["newlib", "lwip", "pthread-embedded"]]
+
+    def test_concurrent(self):
+        running = set()
+        concurrent = list()
+        lock = threading.Lock()
+
+        def download(localdir=None, manifest=None, **kwargs):
+            with lock:
+                running.add(manifest.name)
+                concurrent.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(manifest.name)
+
+            if manifest.name == "lwip":
+                raise RuntimeError("could not fetch")
+
+        with self.ctx, mock.patch(
+                "kraft.cmd.list.pull.kraft_download_component", download):
+            failed = kraft_download_manifests(
+                workdir="/tmp/workdir",
+                manifests=self.manifests + self.manifests[:1]
+            )
+
+        assert max(concurrent) > 1
+        assert len(concurrent) == 3
+        assert [m.name for m in failed] == ["lwip"]
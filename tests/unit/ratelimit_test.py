@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+
+from github.GithubException import RateLimitExceededException
+
+from .. import unittest
+from kraft.cmd.list.provider.ratelimit import RateLimitScheduler
+
+
+class FakeClock(object):
+    def __init__(self, now=1000):
+        self.now = now
+        self.slept = list()
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def headers(limit=5000, remaining=5000, reset=4600):
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(reset),
+    }
+
+
+class RateLimitSchedulerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = RateLimitScheduler(
+            name="GitHub REST API",
+            reserve=10,
+            max_wait=3600,
+            clock=self.clock.time,
+            sleep=self.clock.sleep
+        )
+
+    def test_plentiful(self):
+        self.scheduler.update(headers(remaining=4000))
+
+        for _ in range(5):
+            self.scheduler.acquire()
+
+        assert self.clock.slept == []
+        assert self.scheduler.requests == 5
+        assert self.scheduler.remaining == 3995
+
+    def test_paced(self):
+        # 100 requests left for the 3600 seconds until the reset
+        self.scheduler.update(headers(remaining=100))
+
+        for _ in range(3):
+            self.scheduler.acquire()
+
+        assert self.clock.slept[0] == 36
+        assert len(self.clock.slept) == 2
+
+    def test_exhausted(self):
+        self.scheduler.update(headers(remaining=10, reset=1600))
+        self.scheduler.acquire()
+
+        assert self.clock.slept == [600]
+
+    def test_exhausted_concurrent(self):
+        slept = list()
+        self.scheduler._sleep = slept.append
+        self.scheduler.update(headers(remaining=10, reset=1600))
+
+        threads = [threading.Thread(target=self.scheduler.acquire)
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # All requests wait for the reset, not just the first one
+        assert slept == [600, 600, 600]
+
+    def test_exceeded(self):
+        self.scheduler = RateLimitScheduler(
+            reserve=10,
+            max_wait=60,
+            clock=self.clock.time,
+            sleep=self.clock.sleep
+        )
+        self.scheduler.update(headers(remaining=10, reset=1600))
+
+        with self.assertRaises(RateLimitExceededException):
+            self.scheduler.acquire()
+
+        assert self.scheduler.backoff() is False
+
+    def test_out_of_order(self):
+        self.scheduler.update(headers(remaining=50))
+        self.scheduler.update(headers(remaining=60))
+        assert self.scheduler.remaining == 50
+
+        # A new window replaces the budget of the previous one
+        self.scheduler.update(headers(remaining=4999, reset=8200))
+        assert self.scheduler.remaining == 4999
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from .. import unittest
+from kraft.util import WorkerPool
+
+
+class FatalError(Exception):
+    pass
+
+
+class WorkerPoolTestCase(unittest.TestCase):
+    def test_results(self):
+        with WorkerPool(max_workers=4) as pool:
+            tasks = [pool.submit(lambda x: x * 2, i) for i in range(10)]
+            assert [task.join() for task in tasks] == list(range(0, 20, 2))
+            assert sorted(pool.join()) == list(range(0, 20, 2))
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def work():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        with WorkerPool(max_workers=2) as pool:
+            for _ in range(10):
+                pool.submit(work)
+            pool.join()
+
+        assert running[1] <= 2
+
+    def test_errors(self):
+        def work(i):
+            if i % 2:
+                raise ValueError(i)
+            return i
+
+        with WorkerPool(max_workers=2) as pool:
+            tasks = [pool.submit(work, i) for i in range(4)]
+            assert pool.join() == [0, 2]
+            assert len(pool.errors) == 2
+
+            with self.assertRaises(ValueError):
+                tasks[1].join()
+
+    def test_fatal(self):
+        started = threading.Event()
+
+        def fail():
+            started.wait()
+            raise FatalError()
+
+        with WorkerPool(max_workers=1, fatal=(FatalError,)) as pool:
+            pool.submit(fail)
+            tasks = [pool.submit(lambda: None) for _ in range(5)]
+            started.set()
+
+            with self.assertRaises(FatalError):
+                pool.join()
+
+            # Tasks queued behind the fatal error never run
+            with self.assertRaises(FatalError):
+                tasks[-1].join()
+
+            assert pool.fatal is not None
+
+    def test_per_host(self):
+        lock = threading.Lock()
+        running = dict()
+        highest = dict()
+
+        def work(host):
+            with lock:
+                running[host] = running.get(host, 0) + 1
+                highest[host] = max(highest.get(host, 0), running[host])
+            time.sleep(0.01)
+            with lock:
+                running[host] -= 1
+            return host
+
+        with WorkerPool(max_workers=4, max_per_host=1) as pool:
+            tasks = [
+                pool.submit_to(host, work, host)
+                for host in ["a", "b"] * 5
+            ]
+            assert [task.join() for task in tasks] == ["a", "b"] * 5
+
+        assert highest == {"a": 1, "b": 1}
+
+    def test_per_host_fatal(self):
+        def fail():
+            raise FatalError()
+
+        with WorkerPool(max_workers=2, max_per_host=1,
+                        fatal=(FatalError,)) as pool:
+            pool.submit_to("a", fail)
+            tasks = [pool.submit_to("a", lambda: None) for _ in range(5)]
+
+            with self.assertRaises(FatalError):
+                pool.join()
+
+            with self.assertRaises(FatalError):
+                tasks[-1].join()
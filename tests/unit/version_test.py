@@ -0,0 +1,166 @@
+# SPDX-License-Identifier: BSD-3-Clause
+#
+# Authors: Alexander Jung <alexander.jung@neclab.eu>
+#
+# Copyright (c) 2020, NEC Europe Ltd., NEC Corporation. All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# 1. Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+# 2. Redistributions in binary form must reproduce the above copyright
+#    notice, this list of conditions and the following disclaimer in the
+#    documentation and/or other materials provided with the distribution.
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from datetime import datetime
+
+from .. import unittest
+from kraft.error import InvalidVersionConstraint
+from kraft.error import UnknownVersionError
+from kraft.manifest import ManifestItem
+from kraft.manifest import ManifestItemDistribution
+from kraft.manifest import ManifestItemVersion
+from kraft.manifest import ManifestVersionEquality
+from kraft.manifest import resolve_version
+from kraft.manifest import version_key
+from kraft.manifest import VersionConstraint
+from kraft.manifest import VersionIndex
+from kraft.types import break_component_naming_format
+
+
+class VersionKeyTestCase(unittest.TestCase):
+    def test_order(self):
+        versions = ["0.10", "0.9", "v0.9.1", "1.0.0-rc1", "1.0.0", "2021.01.02", "abcdef0"]
+        self.assertEqual(sorted(versions, key=version_key), [
+            "abcdef0", "2021.01.02", "0.9", "v0.9.1", "0.10", "1.0.0-rc1", "1.0.0"
+        ])
+
+    def test_commits_by_time(self):
+        self.assertLess(
+            version_key("fedcba9", datetime(2020, 1, 1)),
+            version_key("abcdef0", datetime(2021, 1, 1))
+        )
+
+
+class VersionIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = VersionIndex(key=version_key)
+        for version in ["0.5", "0.10.0", "0.4", "0.9", "0.6.1"]:
+            self.index.add(version)
+
+    def test_sorted(self):
+        self.assertEqual(list(self.index), ["0.4", "0.5", "0.6.1", "0.9", "0.10.0"])
+        self.assertEqual(self.index.latest(), "0.10.0")
+
+    def test_queries(self):
+        self.assertEqual(self.index.at_least("0.9.0"), ["0.9", "0.10.0"])
+        self.assertEqual(self.index.after("0.5"), "0.6.1")
+        self.assertEqual(self.index.after("0.7"), "0.9")
+        self.assertIsNone(self.index.after("0.10"))
+        self.assertEqual(self.index.range("0.5", "0.9"), ["0.5", "0.6.1"])
+        self.assertEqual(
+            self.index.range("0.5", "0.9", lower_inclusive=False, upper_inclusive=True),
+            ["0.6.1", "0.9"]
+        )
+
+
+class DistributionTestCase(unittest.TestCase):
+    def test_latest(self):
+        dist = ManifestItemDistribution(name="stable")
+        dist.add_version([
+            ManifestItemVersion(version="0.9"),
+            ManifestItemVersion(version="0.10"),
+            ManifestItemVersion(version="0.4"),
+        ])
+        self.assertEqual(dist.latest.version, "0.10")
+
+    def test_latest_from_state(self):
+        dist = ManifestItemDistribution()
+        dist.__setstate__({
+            "meta": {"name": "stable"},
+            "data": {"versions": {
+                v: {"meta": {"name": v}, "data": {}} for v in ["0.9", "0.10"]
+            }}
+        })
+        self.assertEqual(dist.latest.version, "0.10")
+
+
+class VersionConstraintTestCase(unittest.TestCase):
+    def setUp(self):
+        self.index = VersionIndex(key=version_key)
+        for version in ["abcdef0", "0.4", "0.5", "0.5.1", "0.6", "0.6.2", "0.7", "1.0.0"]:
+            self.index.add(version)
+
+    def select(self, spec):
+        return VersionConstraint(spec).select(self.index)
+
+    def test_select(self):
+        self.assertEqual(self.select(">=0.5,<0.7"), "0.6.2")
+        self.assertEqual(self.select("~0.6"), "0.6.2")
+        self.assertEqual(self.select("~0"), "0.7")
+        self.assertEqual(self.select("<=0.6"), "0.6")
+        self.assertEqual(self.select(">0.4,<0.6,!=0.5.1"), "0.5")
+        self.assertEqual(self.select("^0.5"), "1.0.0")
+        self.assertEqual(self.select("==0.5"), "0.5")
+        self.assertIsNone(self.select(">=2.0"))
+        self.assertIsNone(self.select("<0.4"))
+
+    def test_invalid(self):
+        for spec in ["", ">=", ">=stable", "0.5,latest"]:
+            with self.assertRaises(InvalidVersionConstraint):
+                VersionConstraint(spec)
+
+
+class ResolveVersionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.item = ManifestItem(name="newlib", type="lib")
+
+        stable = ManifestItemDistribution(name="stable")
+        stable.add_version([ManifestItemVersion(version=v) for v in ["0.4", "0.5", "0.6"]])
+        self.item.add_distribution(stable)
+
+        staging = ManifestItemDistribution(name="staging")
+        staging.add_version([ManifestItemVersion(version=v) for v in ["0.6.1", "0.7"]])
+        self.item.add_distribution(staging)
+
+    def resolve(self, version=None, equality=ManifestVersionEquality.EQ):
+        dist, version = resolve_version(self.item, version, equality)
+        return dist.name, version.version
+
+    def test_resolve(self):
+        self.assertEqual(self.resolve(), ("stable", "0.6"))
+        self.assertEqual(self.resolve("staging"), ("staging", "0.7"))
+        self.assertEqual(self.resolve("0.6.1"), ("staging", "0.6.1"))
+
+        # Stable is preferred as long as it has a matching version
+        self.assertEqual(self.resolve(">=0.5,<0.7"), ("stable", "0.6"))
+        self.assertEqual(self.resolve(">=0.6.1"), ("staging", "0.7"))
+
+        with self.assertRaises(UnknownVersionError):
+            self.resolve(">=1.0")
+
+    def test_naming_format(self):
+        _, _, eq, version = break_component_naming_format("lib/newlib>=0.5,<0.6")
+        self.assertEqual(self.resolve(version, eq), ("stable", "0.5"))
+
+        _, _, eq, version = break_component_naming_format("lib/newlib~0.6")
+        self.assertEqual(self.resolve(version, eq), ("stable", "0.6"))